@@ -0,0 +1 @@
+"""Stand-alone micro-benchmarks for the tracker package (run with ``python -m benchmarks.<name>``)."""
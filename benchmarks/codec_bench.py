@@ -0,0 +1,89 @@
+"""Schema codec vs. the previous recursive ``_process_datetime_fields`` + ``deepcopy`` encode/decode.
+
+Also reports the memory held by the decoded document: plain dicts (previous) vs. ``tracker.models`` records.
+
+    python -m benchmarks.codec_bench [--chapters 2000] [--todos 500] [--repeat 5]
+"""
+import argparse
+import copy
+import datetime
+import json
+import timeit
+import tracemalloc
+from typing import Dict, Any
+
+from benchmarks.synthetic import make_document
+from tracker import codec
+
+
+# ---------------------------- PREVIOUS IMPLEMENTATION (reference) ----------------------------
+def _process_datetime_fields(data_node: Any, to_iso: bool) -> Any:
+    if isinstance(data_node, dict):
+        new_dict = {}
+        for k, v in data_node.items():
+            if isinstance(v, datetime.datetime):
+                new_dict[k] = v.isoformat() if to_iso else datetime.datetime.fromisoformat(v) if isinstance(v, str) else v
+            elif k in ["entry_datetime", "timestamp", "time"] and isinstance(v, str) and not to_iso:
+                try:
+                    new_dict[k] = datetime.datetime.fromisoformat(v)
+                except ValueError:
+                    new_dict[k] = v
+            else:
+                new_dict[k] = _process_datetime_fields(v, to_iso)
+        return new_dict
+    elif isinstance(data_node, list):
+        return [_process_datetime_fields(item, to_iso) for item in data_node]
+    return data_node
+
+def legacy_encode(data: Dict[str, Any]) -> Dict[str, Any]:
+    return _process_datetime_fields(copy.deepcopy(data), to_iso=True)
+
+def legacy_decode(data: Dict[str, Any]) -> Dict[str, Any]:
+    return _process_datetime_fields(data, to_iso=False)
+
+
+def _best_ms(fn, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) * 1000
+
+
+def _held_mb(build) -> float:
+    """Memory still allocated by ``build()``'s result once it returns."""
+    tracemalloc.start()
+    result = build()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return held / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chapters", type=int, default=2000)
+    parser.add_argument("--todos", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    document = make_document(args.chapters, args.todos)
+    stored = json.dumps(legacy_encode(document))
+    records = codec.decode_document(json.loads(stored))
+    assert json.dumps({k: v for k, v in codec.encode_document(records).items() if k != codec.SCHEMA_VERSION_KEY}) == stored
+    assert legacy_decode(json.loads(stored)) == document
+
+    rows = [
+        ("encode", _best_ms(lambda: legacy_encode(document), args.repeat),
+         _best_ms(lambda: codec.encode_document(records), args.repeat)),
+        # json.loads is included on both sides: decode_document works in place on a fresh record.
+        ("decode", _best_ms(lambda: legacy_decode(json.loads(stored)), args.repeat),
+         _best_ms(lambda: codec.decode_document(json.loads(stored)), args.repeat)),
+    ]
+    print(f"{args.chapters} chapters ({args.chapters * 3} reminders), {args.todos} todos, best of {args.repeat}")
+    print(f"{'':8}{'legacy ms':>12}{'codec ms':>12}{'speedup':>10}")
+    for name, legacy_ms, codec_ms in rows:
+        print(f"{name:8}{legacy_ms:12.1f}{codec_ms:12.1f}{legacy_ms / codec_ms:9.1f}x")
+
+    dict_mb, record_mb = _held_mb(lambda: legacy_decode(json.loads(stored))), _held_mb(lambda: codec.decode_document(json.loads(stored)))
+    print(f"{'memory':8}{dict_mb:11.1f}M{record_mb:11.1f}M{dict_mb / record_mb:9.1f}x  (decoded document)")
+
+
+if __name__ == "__main__":
+    main()
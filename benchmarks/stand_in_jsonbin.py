@@ -0,0 +1,93 @@
+"""Local stand-in for the JSONBin v3 endpoints ``JsonBinBackend`` uses, for offline tests and save/load timings.
+
+Serves ``GET <bin>/latest``, ``GET <bin>/versions/count`` and ``PUT <bin>``
+from memory; every PUT bumps the bin's version count. Point the backend at
+``base_url`` (or the app at it through the ``[jsonbin] base_url`` secret).
+``fail`` makes the next GETs or PUTs of a bin answer with an error status,
+for retry tests; ``requests`` lists every request served, as ``(method, path)``.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Tuple
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "StandInJsonBin"
+
+    def log_message(self, format, *args):
+        pass # Keep test and benchmark output clean
+
+    def _send(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _bin_path(self) -> Tuple[str, list]:
+        parts = self.path.strip("/").split("/") # v3 / b / <bin_id> / ...
+        return parts[2], parts[3:]
+
+    def _injected_failure(self, bin_id: str) -> bool:
+        with self.server.lock:
+            self.server.requests.append((self.command, self.path))
+            statuses = self.server.failures.get((self.command, bin_id))
+            status = statuses.pop(0) if statuses else None
+        if status is not None:
+            self._send(status, {"message": "Injected failure"})
+        return status is not None
+
+    def do_GET(self):
+        bin_id, rest = self._bin_path()
+        if self._injected_failure(bin_id):
+            return
+        with self.server.lock:
+            stored = self.server.bins.get(bin_id)
+        if stored is None:
+            return self._send(404, {"message": "Bin not found or it doesn't belong to your account"})
+        record, version = stored
+        if rest == ["versions", "count"]:
+            return self._send(200, {"metadata": {"id": bin_id, "versionCount": version}})
+        self._send(200, {"record": record, "metadata": {"id": bin_id, "version": version}})
+
+    def do_PUT(self):
+        bin_id, _ = self._bin_path()
+        record = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        if self._injected_failure(bin_id):
+            return
+        with self.server.lock:
+            version = self.server.bins.get(bin_id, (None, 0))[1] + 1
+            self.server.bins[bin_id] = (record, version)
+        self._send(200, {"record": record, "metadata": {"parentId": bin_id, "version": version}})
+
+
+class StandInJsonBin(ThreadingHTTPServer):
+    """Serves on a free localhost port from a background thread; use as a context manager."""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.bins: Dict[str, Tuple[Any, int]] = {} # bin id -> (record, version count)
+        self.requests: List[Tuple[str, str]] = []
+        self.failures: Dict[Tuple[str, str], List[int]] = {} # (method, bin id) -> statuses to answer the next requests with
+        self.lock = threading.Lock()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    def fail(self, bin_id: str, status: int, times: int = 1, method: str = "PUT"):
+        """Answers the next ``times`` ``method`` requests to ``bin_id`` with ``status`` instead of serving them."""
+        with self.lock:
+            self.failures.setdefault((method, bin_id), []).extend([status] * times)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}/v3/b"
+
+    def __enter__(self) -> "StandInJsonBin":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,136 @@
+"""Cold start: time to first paint of the passcode screen and of the first views, with an import-time report.
+
+    python -m benchmarks.startup_bench [--chapters 1000] [--todos 200] [--repeat 3] [--top 8] [--target-ms 600]
+
+Every scenario runs in a fresh interpreter started with ``-X importtime``, so
+nothing the script needs is imported yet:
+
+- ``login``: the passcode screen of a new session.
+- ``first_view``: a logged-in session's first run, loading a seeded SQLite file
+  and drawing the default view.
+- ``productivity``: after that, the first switch to Productivity Tracking, the
+  first view that builds DataFrames and charts.
+
+Time to first paint is the wall time of the script run being measured.
+Streamlit and AppTest are imported before the clock starts, as they are in a
+running server. For each scenario the report lists the heavy libraries loaded
+by the end of it, and the top-level imports that took longest during the
+measured run. The best of ``--repeat`` cold starts is reported. The run exits
+with status 1 when the passcode screen misses ``--target-ms``.
+"""
+import argparse
+import datetime
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Any, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_SCRIPT = os.path.join(REPO_ROOT, "main.py")
+SCENARIOS = ["login", "first_view", "productivity"]
+HEAVY_MODULES = ["pandas", "numpy", "plotly.express", "requests", "pyarrow"]
+TARGET_LOGIN_MS = 600 # Passcode screen of a cold process, Streamlit already imported (~1050 ms with eager imports)
+RUN_START, RUN_END = "## startup_bench run start", "## startup_bench run end"
+
+
+# ---------------------------- CHILD (one cold start) ----------------------------
+def run_child(scenario: str, db_path: str):
+    import time
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_SCRIPT, default_timeout=600)
+    at.secrets["app"] = {"passcode": "bench", "archive_after_days": 0}
+    at.secrets["storage"] = {"backend": "sqlite", "sqlite_path": db_path}
+    if scenario != "login":
+        at.session_state["password_correct"] = True
+    if scenario == "productivity":
+        at.run()
+        at.radio(key="active_view").set_value("Productivity Tracking")
+
+    print(RUN_START, file=sys.stderr, flush=True)
+    start = time.perf_counter()
+    at.run()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(RUN_END, file=sys.stderr, flush=True)
+    if at.exception:
+        raise RuntimeError(f"App raised: {at.exception[0].value}")
+    print(json.dumps({"scenario": scenario, "first_paint_ms": elapsed_ms,
+                      "loaded": [name for name in HEAVY_MODULES if name in sys.modules]}))
+
+
+# ---------------------------- PARENT ----------------------------
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """Cumulative milliseconds of each top-level import made between the run markers."""
+    imports: Dict[str, float] = {}
+    inside = False
+    for line in stderr.splitlines():
+        if line == RUN_START:
+            inside = True
+        elif line == RUN_END:
+            break
+        elif inside and line.startswith("import time:") and not line.startswith("import time: self"):
+            _, cumulative, name = line[len("import time:"):].split("|", 2)
+            if not name[1:].startswith(" "): # Nested imports are indented under their importer
+                imports[name.strip()] = imports.get(name.strip(), 0.0) + int(cumulative) / 1000
+    return imports
+
+
+def cold_start(scenario: str, db_path: str) -> Dict[str, Any]:
+    process = subprocess.run([sys.executable, "-X", "importtime", "-m", "benchmarks.startup_bench", "--child", scenario,
+                              "--db", db_path], cwd=REPO_ROOT, capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"{scenario} failed:\n{process.stderr[-2000:]}")
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    result["imports_ms"] = parse_importtime(process.stderr)
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chapters", type=int, default=1000)
+    parser.add_argument("--todos", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3, help="Cold starts per scenario; the fastest is reported")
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports listed per scenario")
+    parser.add_argument("--target-ms", type=float, default=TARGET_LOGIN_MS, help="Time to first paint of the passcode screen")
+    parser.add_argument("--output", help="Also write the results as JSON")
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        run_child(args.child, args.db)
+        return 0
+
+    from benchmarks.synthetic import make_app_data
+    from tracker import codec
+    from tracker.storage import SqliteBackend
+
+    work_dir = tempfile.mkdtemp(prefix="bench_startup_")
+    try:
+        db_path = os.path.join(work_dir, "bench.db")
+        SqliteBackend(db_path).save_snapshot(codec.encode_document(make_app_data(args.chapters, args.todos, today=datetime.date.today())))
+        results = []
+        for scenario in SCENARIOS:
+            runs = [cold_start(scenario, db_path) for _ in range(args.repeat)]
+            best = min(runs, key=lambda run: run["first_paint_ms"])
+            results.append(best)
+            print(f"{scenario:<13} first paint {best['first_paint_ms']:8.1f} ms   loaded: {', '.join(best['loaded']) or '-'}")
+            for name, ms in sorted(best["imports_ms"].items(), key=lambda item: -item[1])[:args.top]:
+                print(f"{'':<15}{ms:8.1f} ms  import {name}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"chapters": args.chapters, "todos": args.todos, "target_ms": args.target_ms, "results": results}, f, indent=2)
+    login_ms = results[0]["first_paint_ms"]
+    if login_ms > args.target_ms:
+        print(f"Passcode screen took {login_ms:.1f} ms; target is {args.target_ms:.0f} ms.")
+        return 1
+    print(f"Passcode screen within the {args.target_ms:.0f} ms target.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""Benchmark suite: hot paths at several history sizes, storage round trips and full-script AppTest reruns.
+
+    python -m benchmarks.suite [--sizes 100,1000,10000,50000] [--todos 2000] [--apptest-sizes 100,1000,10000]
+                               [--output benchmarks/results.json] [--baseline old.json [--tolerance 0.25]]
+
+The helpers in ``main.py`` cannot be imported without running the app, and
+are thin wrappers over the classes timed here: ``get_revisions_for_date`` is
+``ReminderIndex.entries_for_date``, ``_aggregate_productivity_data`` is
+``ReminderTable.daily_counts``, the productivity view's ``get_period_series`` is
+``analytics.period_series`` over a ``DailyRollup``, ``calculate_subject_progress`` is
+``ReminderTable.subject_progress``, the CSV export is
+``tracker.export.write_export`` and datetime (de)serialisation is
+``tracker.codec`` (the previous ``_process_datetime_fields`` is timed too, as a
+reference). Save/load round trips run against SQLite in a temporary directory
+and against a local JSONBin stand-in. AppTest runs the real script against a
+seeded SQLite file and times the first run plus reruns of every main view.
+
+Every result is written to ``--output`` as JSON. With ``--baseline`` the run is
+compared against an earlier file and exits with status 1 if any result got
+slower than ``--tolerance`` allows.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+from typing import Callable, Dict, List, Any, Optional
+
+from benchmarks.codec_bench import legacy_decode, legacy_encode
+from benchmarks.stand_in_jsonbin import StandInJsonBin
+from benchmarks.synthetic import SUBJECTS, make_app_data, make_document
+from tracker import codec
+from tracker.analytics import DailyRollup, ReminderTable, period_series
+from tracker.export import write_export
+from tracker.reminder_index import ReminderIndex
+from tracker.storage import JsonBinBackend, SqliteBackend
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_SCRIPT = os.path.join(REPO_ROOT, "main.py")
+TODAY = datetime.date(2024, 12, 31) # Fixed, so the same arguments build the same histories
+
+
+def _timed(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Best and median milliseconds per call; fast calls are looped so one sample lasts at least ~0.2 s."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    samples = [t / number * 1000 for t in timer.repeat(repeat=repeat, number=number)]
+    return {"best_ms": min(samples), "median_ms": statistics.median(samples), "number": number, "repeat": repeat}
+
+
+def _timed_once(fn: Callable[[], Any]) -> Dict[str, float]:
+    elapsed = timeit.timeit(fn, number=1) * 1000
+    return {"best_ms": elapsed, "median_ms": elapsed, "number": 1, "repeat": 1}
+
+
+class Results:
+    def __init__(self):
+        self.rows: List[Dict[str, Any]] = []
+
+    def add(self, group: str, name: str, chapters: int, todos: int, timing: Dict[str, Any]):
+        row = {"group": group, "name": name, "chapters": chapters, "todos": todos, **timing}
+        self.rows.append(row)
+        print(f"{group:10}{name:32}{chapters:>8}{row['best_ms']:>12.3f}{row['median_ms']:>12.3f}", flush=True)
+
+
+# ---------------------------- HOT PATHS ----------------------------
+def bench_hot_paths(results: Results, chapters: int, todos: int, repeat: int):
+    app_data = make_app_data(chapters, todos, today=TODAY)
+    subject_chapters_data = app_data["subject_chapters_data"]
+    index = ReminderIndex.build(subject_chapters_data, SUBJECTS)
+    table = ReminderTable.build(subject_chapters_data, SUBJECTS)
+    month_ago = TODAY - datetime.timedelta(days=30)
+
+    def add(name: str, fn: Callable[[], Any]):
+        results.add("hot_path", name, chapters, todos, _timed(fn, repeat))
+
+    add("reminder_index.build", lambda: ReminderIndex.build(subject_chapters_data, SUBJECTS))
+    add("get_revisions_for_date", lambda: index.entries_for_date(TODAY))
+    add("reminder_table.build", lambda: ReminderTable.build(subject_chapters_data, SUBJECTS))
+    add("aggregate_productivity.all", lambda: table.daily_counts())
+    add("aggregate_productivity.month", lambda: table.daily_counts(month_ago))
+    rollup = DailyRollup.build(table)
+    add("daily_rollup.build", lambda: DailyRollup.build(table))
+    add("period_series.all.daily", lambda: period_series([rollup], None, None, "Daily", SUBJECTS))
+    add("period_series.month.weekly", lambda: period_series([rollup], month_ago, TODAY, "Weekly", SUBJECTS))
+    add("calculate_subject_progress", table.subject_progress)
+
+    export_dir = tempfile.mkdtemp(prefix="bench_export_")
+    try:
+        add("export.csv", lambda: write_export(subject_chapters_data, "CSV", os.path.join(export_dir, "export.csv")))
+    finally:
+        shutil.rmtree(export_dir, ignore_errors=True)
+
+    stored_json = json.dumps(codec.encode_document(app_data))
+    add("codec.encode_document", lambda: codec.encode_document(app_data))
+    add("codec.decode_document", lambda: codec.decode_document(json.loads(stored_json))) # json.loads included
+    legacy_document = make_document(chapters, todos, today=TODAY)
+    legacy_json = json.dumps(legacy_encode(legacy_document))
+    add("legacy.process_datetime.encode", lambda: legacy_encode(legacy_document))
+    add("legacy.process_datetime.decode", lambda: legacy_decode(json.loads(legacy_json)))
+
+
+# ---------------------------- STORAGE ROUND TRIPS ----------------------------
+def bench_storage(results: Results, chapters: int, todos: int, repeat: int):
+    app_data = make_app_data(chapters, todos, today=TODAY)
+
+    def add(name: str, fn: Callable[[], Any]):
+        results.add("storage", name, chapters, todos, _timed(fn, repeat))
+
+    work_dir = tempfile.mkdtemp(prefix="bench_sqlite_")
+    try:
+        sqlite = SqliteBackend(os.path.join(work_dir, "bench.db"))
+        add("sqlite.save", lambda: sqlite.save_snapshot(codec.encode_document(app_data)))
+        add("sqlite.load", lambda: codec.decode_document(sqlite.load()))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    with StandInJsonBin() as server:
+        jsonbin = JsonBinBackend("bench-key", "bench", base_url=server.base_url)
+        add("jsonbin.save", lambda: jsonbin.save_snapshot(codec.encode_document(app_data)))
+        # A fresh backend has no cached body, so this is a version-count request plus a full download.
+        add("jsonbin.load", lambda: codec.decode_document(JsonBinBackend("bench-key", "bench", base_url=server.base_url).load()))
+        jsonbin.load()
+        add("jsonbin.load.unchanged", lambda: codec.decode_document(jsonbin.load()))
+
+
+# ---------------------------- APPTEST RERUNS ----------------------------
+def bench_apptest(results: Results, chapters: int, todos: int, repeat: int):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    work_dir = tempfile.mkdtemp(prefix="bench_apptest_")
+    try:
+        db_path = os.path.join(work_dir, "bench.db")
+        # Dated around the real today: the app's revision views look up datetime.date.today()
+        SqliteBackend(db_path).save_snapshot(codec.encode_document(make_app_data(chapters, todos, today=datetime.date.today())))
+        st.cache_data.clear()
+        at = AppTest.from_file(APP_SCRIPT, default_timeout=600)
+        at.secrets["app"] = {"passcode": "bench"}
+        at.secrets["storage"] = {"backend": "sqlite", "sqlite_path": db_path}
+        at.session_state["password_correct"] = True
+
+        def run():
+            at.run()
+            if at.exception:
+                raise RuntimeError(f"App raised: {at.exception[0].value}")
+
+        # The first run loads, decodes and indexes the history, so it is timed once.
+        results.add("apptest", "first_run", chapters, todos, _timed_once(run))
+        for view in at.radio(key="active_view").options:
+            at.radio(key="active_view").set_value(view)
+            run()
+            samples = [_timed_once(run)["best_ms"] for _ in range(repeat)]
+            results.add("apptest", f"rerun[{view}]", chapters, todos,
+                        {"best_ms": min(samples), "median_ms": statistics.median(samples), "number": 1, "repeat": repeat})
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+# ---------------------------- OUTPUT ----------------------------
+def _environment() -> Dict[str, Any]:
+    versions = {}
+    for module in ("numpy", "pandas", "streamlit", "requests"):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            versions[module] = None
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"python": platform.python_version(), "platform": platform.platform(), "git_commit": commit, "packages": versions}
+
+
+def compare(rows: List[Dict[str, Any]], baseline_rows: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Lines describing results whose best time grew by more than ``tolerance`` over the baseline."""
+    baseline = {(r["group"], r["name"], r["chapters"], r["todos"]): r for r in baseline_rows}
+    regressions = []
+    for row in rows:
+        before = baseline.get((row["group"], row["name"], row["chapters"], row["todos"]))
+        if before and row["best_ms"] > before["best_ms"] * (1 + tolerance):
+            regressions.append(f"{row['group']} {row['name']} @ {row['chapters']} chapters: "
+                               f"{before['best_ms']:.3f} -> {row['best_ms']:.3f} ms ({row['best_ms'] / before['best_ms']:.2f}x)")
+    return regressions
+
+
+def _sizes(text: str) -> List[int]:
+    return [int(part) for part in text.split(",") if part.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=_sizes, default=[100, 1000, 10000, 50000], help="Chapter counts (3 reminders each)")
+    parser.add_argument("--todos", type=int, default=2000)
+    parser.add_argument("--apptest-sizes", type=_sizes, default=[100, 1000, 10000], help="Empty to skip the AppTest runs")
+    parser.add_argument("--no-storage", action="store_true", help="Skip the save/load round trips")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=os.path.join(REPO_ROOT, "benchmarks", "results.json"))
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before a result counts as a regression")
+    args = parser.parse_args(argv)
+
+    results = Results()
+    print(f"{'group':10}{'name':32}{'chapters':>8}{'best ms':>12}{'median ms':>12}")
+    for chapters in args.sizes:
+        bench_hot_paths(results, chapters, args.todos, args.repeat)
+        if not args.no_storage:
+            bench_storage(results, chapters, args.todos, args.repeat)
+    for chapters in args.apptest_sizes:
+        bench_apptest(results, chapters, args.todos, args.repeat)
+
+    report = {"created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+              "environment": _environment(), "settings": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+              "results": results.rows}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results.rows)} results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results.rows, json.load(f)["results"], args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""Seeded synthetic study histories for the benchmarks.
+
+The same ``(chapters, todos, seed, today)`` always yields the same document.
+Entry dates spread over the year before ``today`` (reminders run up to five
+days past it), so date lookups and the revision views see realistic per-day
+volumes at every size.
+"""
+import datetime
+import json
+import random
+from typing import Dict, Any, Optional
+
+from tracker import codec, records
+
+SUBJECTS = ["Botany", "Zoology", "Physics", "Chemistry"]
+REMINDER_OFFSETS = [("12 hour Reminder", datetime.timedelta(hours=12)),
+                    ("3 days Reminder", datetime.timedelta(days=3)),
+                    ("5 days Reminder", datetime.timedelta(days=5))]
+HISTORY_DAYS = 365
+
+
+def make_document(chapters: int, todos: int, seed: int = 0, today: Optional[datetime.date] = None) -> Dict[str, Any]:
+    """The document in its previous in-memory form: plain dicts holding ``datetime`` objects."""
+    rng = random.Random(seed)
+    today = today or datetime.date(2024, 12, 31)
+    start = datetime.datetime.combine(today - datetime.timedelta(days=HISTORY_DAYS), datetime.time(8, 0))
+    data = {"subject_chapters_data": {s: [] for s in SUBJECTS}, "todo_data": []}
+    for i in range(chapters):
+        entry = start + datetime.timedelta(minutes=rng.randrange(0, 60 * 24 * HISTORY_DAYS))
+        data["subject_chapters_data"][rng.choice(SUBJECTS)].append({
+            "chapter_name": f"Chapter {i}", "entry_datetime": entry,
+            "reminders": [{"reminder_id": n + 1, "type": label, "time": entry + delta, "status": rng.choice(["Pending", "Revised"])}
+                          for n, (label, delta) in enumerate(REMINDER_OFFSETS)],
+            "exams_appeared": rng.randrange(0, 5), "exam_status": "Not Appeared", "time_spent": rng.randrange(0, 240)})
+    for i in range(todos):
+        data["todo_data"].append({"task": f"Task {i}", "status": rng.choice(["Pending", "Completed"]),
+                                  "timestamp": start + datetime.timedelta(hours=i)})
+    return data
+
+
+def make_app_data(chapters: int, todos: int, seed: int = 0, today: Optional[datetime.date] = None) -> Dict[str, Any]:
+    """The document as the app holds it in session state: ``tracker.models`` records with IDs."""
+    document = make_document(chapters, todos, seed, today)
+    stored = json.loads(json.dumps(document, default=lambda value: value.isoformat()))
+    app_data = codec.decode_document(stored)
+    records.ensure_ids(app_data)
+    return app_data
+
+
+def stored_document(chapters: int, todos: int, seed: int = 0, today: Optional[datetime.date] = None) -> Dict[str, Any]:
+    """JSON-ready form, as the storage backends hold it (with record IDs)."""
+    return codec.encode_document(make_app_data(chapters, todos, seed, today))
@@ -1,12 +1,22 @@
+from __future__ import annotations # Annotations naming pandas types must not import pandas
+
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 import datetime
-import pandas as pd
-import plotly.express as px
 import random
 import json
-import requests
 import copy
-from typing import Dict, List, Any, Optional, Tuple
+import functools
+import re
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from tracker.lazy import LazyModule
+
+# Only Streamlit and the standard library are imported before the passcode screen. The storage stack is
+# imported right after login, the rest of the tracker package while the data is being fetched, and
+# pandas and plotly the first time a view builds a DataFrame or a chart.
+pd = LazyModule("pandas")
+px = LazyModule("plotly.express")
 
 # ---------------------------- CONFIGURATION & CONSTANTS ----------------------------
 # --- App Passcode Configuration ---
@@ -16,15 +26,105 @@ APP_PASSCODE_CONFIG = {
     "section": "app"
 }
 
+# --- Per-user Login Configuration ---
+USERS_CONFIG = {
+    "section": "users", # Optional: one [users.<name>] table per user; replaces the shared passcode
+    "passcode_key_name": "passcode",
+    "name_pattern": r"[A-Za-z0-9_-]+"  # Also used in the user's default database and log file names
+}
+
 # --- JSONBin.io Configuration ---
 JSONBIN_CONFIG = {
     "api_key_name": "api_key",
     "bin_id_name": "bin_id",
+    "journal_bin_id_name": "journal_bin_id", # Optional: enables patch-based saves
+    "archive_bin_id_name": "archive_bin_id", # Optional: enables the archive tier on JSONBin
+    "shard_bin_ids_name": "shard_bin_ids", # Optional table: one bin per subject plus "todos"
     "api_key_placeholder": "YOUR_NEW_SECURE_X_MASTER_KEY",
     "bin_id_placeholder": "YOUR_JSONBIN_BIN_ID",
     "section": "jsonbin",
+    "base_url_name": "base_url", # Optional: point at a local stand-in server for testing
     "base_url": "https://api.jsonbin.io/v3/b",
-    "request_timeout": 15  # Seconds
+    "connect_timeout": 5,  # Seconds
+    "read_timeout": 15,  # Seconds
+    "max_retries": 3,  # Retries for connection errors, timeouts, 429 and 5xx responses
+    "retry_backoff": 0.5,  # Seconds; doubled on every retry, plus random jitter
+    "conditional_fetch": True,  # Re-download a bin only when its version count changed
+    "compact_every": 50  # Journal patches before a full snapshot is written
+}
+
+# --- Storage Backend Configuration ---
+STORAGE_CONFIG = {
+    "section": "storage",
+    "backend_key_name": "backend", # "jsonbin", "sqlite" or "auto" (JSONBin when its secrets are set, else SQLite)
+    "sqlite_path_key_name": "sqlite_path",
+    "default_sqlite_path": "neet_prep.db",
+    "offline_first_key_name": "offline_first", # Optional: false turns the local write-ahead log off for JSONBin
+    "wal_path_key_name": "wal_path",
+    "default_wal_path": "neet_prep.wal",
+    "wal_compact_every": 200,  # Synced batches kept in the log file before it is rewritten
+    "record_cache_mb_key_name": "record_cache_mb",
+    "default_record_cache_mb": 256,  # Loaded documents kept for all sessions, by serialized size
+    "record_cache_ttl_seconds": 300,  # Reload after this long, to pick up writes made elsewhere
+    "prefetch_workers": 4  # Threads fetching data for sessions that have just logged in
+}
+
+# --- Write-behind Save Configuration ---
+WRITE_BEHIND_CONFIG = {
+    "key_name": "write_behind", # Optional secret: default state of background saving
+    "section": "app",
+    "debounce_seconds": 2.0,  # Quiet period before queued edits are flushed
+    "retry_seconds": 10.0,  # Delay before retrying a failed flush
+    "max_failures": 5,  # Same non-network error this many times in a row: stop retrying until the user asks
+    "disable_flush_timeout": 30,  # Seconds to wait for pending edits when switching the mode off
+    "status_refresh_seconds": 2  # How often the sidebar save status refreshes itself
+}
+
+# --- Data Export Configuration ---
+EXPORT_CONFIG = {
+    "file_stem": "neet_prep_data",
+    "chunk_rows": 5000  # Rows formatted and written per chunk
+}
+
+# --- Bulk Import Configuration ---
+IMPORT_CONFIG = {
+    "errors_shown": 200  # Rejected rows listed before an import
+}
+
+# --- Long List Configuration ---
+LIST_PAGE_CONFIG = {
+    "page_size_options": [10, 25, 50, 100],
+    "default_page_size": 25  # Rows rendered per page of the To Do and revision lists
+}
+
+# --- Revision Scheduling Configuration ---
+SCHEDULER_CONFIG = {
+    "default": "fixed", # Key of tracker.scheduling.SCHEDULERS preselected in "Add New Chapter"
+    "fixed_intervals_hours": [12, 72, 120],  # Offsets from the entry time offered for fixed schedules
+    "overdue_list_limit": 50  # Overdue revisions listed in Today's Revisions
+}
+
+# --- Archive Tier Configuration ---
+ARCHIVE_CONFIG = {
+    "key_name": "archive_after_days", # Optional secret; 0 turns archiving off
+    "section": "app",
+    "default_after_days": 60  # Finished chapters and completed tasks older than this leave the live data
+}
+
+# --- Rerun Profiler Configuration ---
+PROFILING_CONFIG = {
+    "key_name": "profiling", # Optional secret: default state of the timing panel
+    "section": "app",
+    "history_runs": 50  # Completed reruns kept for the history chart and exports
+}
+
+# --- Chart Configuration ---
+CHART_CONFIG = {
+    "key_name": "light_charts", # Optional secret: default state of the lightweight (Vega-Lite) renderer
+    "section": "app",
+    "light_after_days": 120,  # Longer productivity trends always use the lightweight renderer
+    "bucket_label_formats": {"Daily": "%d/%m/%y", "Weekly": "Week of %d/%m/%y", "Monthly": "%b %Y"},
+    "default_custom_range_days": 30
 }
 
 # --- App Constants ---
@@ -43,7 +143,7 @@ COLOR_WARNING = "#DC3545" # Often used for pending/errors
 
 
 # ---------------------------- SECRETS LOADING & VALIDATION ----------------------------
-def load_secret(section: str, key_name: str, placeholder: Optional[str] = None) -> Optional[str]:
+def load_secret(section: str, key_name: str, placeholder: Optional[str] = None, required: bool = True) -> Optional[str]:
     """Safely loads a secret, provides feedback, and checks against placeholder."""
     try:
         value = st.secrets[section][key_name]
@@ -55,18 +155,29 @@ def load_secret(section: str, key_name: str, placeholder: Optional[str] = None)
             return None # Treat placeholder as invalid for critical secrets
         return value
     except KeyError:
-        st.error(f"Missing secret '{key_name}' under '[{section}]' section in Streamlit secrets.")
+        if required:
+            st.error(f"Missing secret '{key_name}' under '[{section}]' section in Streamlit secrets.")
         return None
     except Exception as e:
         st.error(f"Error loading secret '{key_name}': {e}")
         return None
 
-APP_PASSCODE = load_secret(APP_PASSCODE_CONFIG["section"], APP_PASSCODE_CONFIG["key_name"], APP_PASSCODE_CONFIG["placeholder"])
-JSONBIN_API_KEY = load_secret(JSONBIN_CONFIG["section"], JSONBIN_CONFIG["api_key_name"], JSONBIN_CONFIG["api_key_placeholder"])
-JSONBIN_BIN_ID = load_secret(JSONBIN_CONFIG["section"], JSONBIN_CONFIG["bin_id_name"], JSONBIN_CONFIG["bin_id_placeholder"])
+def load_users() -> Dict[str, Dict[str, Any]]:
+    """Per-user logins from the optional ``[users.<name>]`` tables; empty when everyone shares the app passcode."""
+    users = {}
+    for name, settings in st.secrets.get(USERS_CONFIG["section"], {}).items():
+        if not re.fullmatch(USERS_CONFIG["name_pattern"], name):
+            st.error(f"User name '{name}' under '[{USERS_CONFIG['section']}]' may only use letters, digits, '-' and '_'.")
+        elif not settings.get(USERS_CONFIG["passcode_key_name"]):
+            st.error(f"User '{name}' under '[{USERS_CONFIG['section']}]' has no passcode and cannot log in.")
+        else:
+            users[name] = dict(settings)
+    return users
 
-PASSCODE_CONFIGURED = bool(APP_PASSCODE)
-JSONBIN_SECRETS_CONFIGURED = bool(JSONBIN_API_KEY and JSONBIN_BIN_ID)
+USERS = load_users()
+APP_PASSCODE = load_secret(APP_PASSCODE_CONFIG["section"], APP_PASSCODE_CONFIG["key_name"], APP_PASSCODE_CONFIG["placeholder"],
+                           required=not USERS)
+PASSCODE_CONFIGURED = bool(APP_PASSCODE or USERS)
 
 # ---------------- Set Page Config (MUST be the first Streamlit command) ----------------
 st.set_page_config(
@@ -82,32 +193,164 @@ def check_password():
         st.error("App passcode not configured correctly by the administrator. Access denied.")
         return False
 
-    if st.session_state.get("password_correct", False):
+    if st.session_state.get("password_correct", False) and (not USERS or get_user() in USERS):
         return True
 
     st.title("🔒 Enter Passcode")
-    st.write("Please enter the passcode to access the application.")
+    if USERS:
+        st.write("Please enter your name and passcode to access the application.")
+        user_attempt = st.text_input("Name", key="user_attempt_input").strip()
+    else:
+        st.write("Please enter the passcode to access the application.")
+        user_attempt = None
     password_attempt = st.text_input("Passcode", type="password", key="password_attempt_input")
 
     if st.button("Login", key="password_submit_button"):
-        if password_attempt == APP_PASSCODE:
+        if USERS:
+            passcode_ok = user_attempt in USERS and password_attempt == USERS[user_attempt][USERS_CONFIG["passcode_key_name"]]
+        else:
+            passcode_ok = password_attempt == APP_PASSCODE
+        if passcode_ok:
             st.session_state["password_correct"] = True
+            st.session_state["user"] = user_attempt
             st.rerun()
         else:
-            st.error("😕 Incorrect passcode. Please try again.")
+            st.error("😕 Incorrect name or passcode. Please try again." if USERS else "😕 Incorrect passcode. Please try again.")
             st.session_state["password_correct"] = False
     return False
 
+def get_user() -> Optional[str]:
+    """The logged-in user, or ``None`` when everyone shares the app passcode."""
+    return st.session_state.get("user")
+
+def log_out():
+    """Ends the login. Everything the session held (its data, indexes and save queue) is dropped, so edits
+    still queued in this session are saved first."""
+    queue = st.session_state.get('write_behind_queue')
+    if queue is not None:
+        queue.flush(WRITE_BEHIND_CONFIG['disable_flush_timeout'])
+    st.session_state.clear()
+    st.rerun()
+
+def get_storage_location() -> Dict[str, Any]:
+    user = get_user()
+    return USER_LOCATIONS[user] if user is not None else _storage_location(None)
+
 if "password_correct" not in st.session_state:
     st.session_state["password_correct"] = False
 
 if not check_password():
     st.stop()
 
-# --- Post-Password Check: Verify JSONBin Secrets ---
-if not JSONBIN_SECRETS_CONFIGURED:
+# ---------------------------- STORAGE IMPORTS & SECRETS (after login) ----------------------------
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from tracker import codec, profiling, records
+from tracker.http_client import create_session, is_transient_error
+from tracker.record_cache import RecordCache
+from tracker.storage import TODO_SHARD, JsonBinBackend, ShardedJsonBinBackend, SqliteBackend, StorageBackend
+from tracker.wal import WriteAheadLog
+from tracker.write_behind import WriteBehindQueue, flush_offline_batch
+
+STORAGE_BACKEND = (load_secret(STORAGE_CONFIG["section"], STORAGE_CONFIG["backend_key_name"], required=False) or "auto").lower()
+STORAGE_SQLITE_PATH = load_secret(STORAGE_CONFIG["section"], STORAGE_CONFIG["sqlite_path_key_name"], required=False) \
+    or STORAGE_CONFIG["default_sqlite_path"]
+_jsonbin_required = STORAGE_BACKEND != "sqlite" # No JSONBin complaints when SQLite is chosen explicitly
+JSONBIN_API_KEY = load_secret(JSONBIN_CONFIG["section"], JSONBIN_CONFIG["api_key_name"], JSONBIN_CONFIG["api_key_placeholder"], _jsonbin_required)
+JSONBIN_BIN_ID = load_secret(JSONBIN_CONFIG["section"], JSONBIN_CONFIG["bin_id_name"], JSONBIN_CONFIG["bin_id_placeholder"],
+                             _jsonbin_required and not USERS) # With per-user logins every user names their own bins
+JSONBIN_JOURNAL_BIN_ID = load_secret(JSONBIN_CONFIG["section"], JSONBIN_CONFIG["journal_bin_id_name"], required=False)
+JSONBIN_ARCHIVE_BIN_ID = load_secret(JSONBIN_CONFIG["section"], JSONBIN_CONFIG["archive_bin_id_name"], required=False)
+def load_shard_bin_ids(shard_bins: Optional[Dict[str, str]], table_name: str) -> Optional[Tuple[Tuple[str, str], ...]]:
+    """``(shard, bin id)`` pairs from an optional ``shard_bin_ids`` table, or ``None`` for the single-bin layout."""
+    if not shard_bins:
+        return None
+    shard_names = SUBJECT_CHOICES + [TODO_SHARD]
+    missing = [name for name in shard_names if not shard_bins.get(name)]
+    if missing:
+        st.error(f"Secret '[{table_name}]' has no bin for: {', '.join(missing)}. Using the single-bin layout.")
+        return None
+    return tuple((name, shard_bins[name]) for name in shard_names)
+
+JSONBIN_SHARD_BIN_IDS = load_shard_bin_ids(load_secret(JSONBIN_CONFIG["section"], JSONBIN_CONFIG["shard_bin_ids_name"], required=False),
+                                           f"{JSONBIN_CONFIG['section']}.{JSONBIN_CONFIG['shard_bin_ids_name']}")
+JSONBIN_BASE_URL = load_secret(JSONBIN_CONFIG["section"], JSONBIN_CONFIG["base_url_name"], required=False) or JSONBIN_CONFIG["base_url"]
+
+JSONBIN_SECRETS_CONFIGURED = bool(JSONBIN_API_KEY and (JSONBIN_BIN_ID or USERS))
+if STORAGE_BACKEND == "auto":
+    STORAGE_BACKEND = "jsonbin" if JSONBIN_SECRETS_CONFIGURED else "sqlite"
+STORAGE_CONFIGURED = STORAGE_BACKEND == "sqlite" or (STORAGE_BACKEND == "jsonbin" and JSONBIN_SECRETS_CONFIGURED)
+# Offline-first: saves to a remote store are logged on this machine first and synced in the background.
+OFFLINE_FIRST = STORAGE_BACKEND == "jsonbin" and STORAGE_CONFIGURED \
+    and bool(st.secrets.get(STORAGE_CONFIG["section"], {}).get(STORAGE_CONFIG["offline_first_key_name"], True))
+STORAGE_WAL_PATH = load_secret(STORAGE_CONFIG["section"], STORAGE_CONFIG["wal_path_key_name"], required=False) \
+    or STORAGE_CONFIG["default_wal_path"]
+RECORD_CACHE_MB = st.secrets.get(STORAGE_CONFIG["section"], {}).get(STORAGE_CONFIG["record_cache_mb_key_name"],
+                                                                    STORAGE_CONFIG["default_record_cache_mb"])
+
+def _user_file(path: str, user: str) -> str:
+    """``neet_prep.db`` -> ``neet_prep-<user>.db``: the shared file name, made per user."""
+    stem, dot, extension = path.rpartition(".")
+    return f"{stem}-{user}.{extension}" if dot else f"{path}-{user}"
+
+def _storage_location(user: Optional[str]) -> Dict[str, Any]:
+    """Where a user's data lives: their own bins, or a database and log file named after them.
+    ``None`` is the single-user setup, the shared ``[storage]`` and ``[jsonbin]`` settings."""
+    if user is None:
+        return {"sqlite_path": STORAGE_SQLITE_PATH, "wal_path": STORAGE_WAL_PATH, "bin_id": JSONBIN_BIN_ID,
+                "journal_bin_id": JSONBIN_JOURNAL_BIN_ID, "archive_bin_id": JSONBIN_ARCHIVE_BIN_ID,
+                "shard_bin_ids": JSONBIN_SHARD_BIN_IDS}
+    settings = USERS[user]
+    return {"sqlite_path": settings.get(STORAGE_CONFIG["sqlite_path_key_name"]) or _user_file(STORAGE_SQLITE_PATH, user),
+            "wal_path": settings.get(STORAGE_CONFIG["wal_path_key_name"]) or _user_file(STORAGE_WAL_PATH, user),
+            "bin_id": settings.get(JSONBIN_CONFIG["bin_id_name"]),
+            "journal_bin_id": settings.get(JSONBIN_CONFIG["journal_bin_id_name"]),
+            "archive_bin_id": settings.get(JSONBIN_CONFIG["archive_bin_id_name"]),
+            "shard_bin_ids": load_shard_bin_ids(settings.get(JSONBIN_CONFIG["shard_bin_ids_name"]),
+                                                f"{USERS_CONFIG['section']}.{user}.{JSONBIN_CONFIG['shard_bin_ids_name']}")}
+
+USER_LOCATIONS = {user: _storage_location(user) for user in USERS}
+if STORAGE_BACKEND == "jsonbin":
+    for user in [user for user, location in USER_LOCATIONS.items() if not location["bin_id"]]:
+        st.error(f"User '{user}' has no '{JSONBIN_CONFIG['bin_id_name']}' under '[{USERS_CONFIG['section']}.{user}]' and cannot log in.")
+        del USERS[user], USER_LOCATIONS[user]
+if get_user() is not None and get_user() not in USER_LOCATIONS:
+    st.stop() # Logged in, but the storage settings are incomplete (reported above)
+
+# ---------------------------- RERUN PROFILER ----------------------------
+def get_profiler() -> Optional[profiling.Profiler]:
+    """The session's profiler, or ``None`` while profiling is switched off."""
+    if not st.session_state.get('profiling_enabled'):
+        return None
+    profiler = st.session_state.get('profiler')
+    if profiler is None:
+        profiler = st.session_state['profiler'] = profiling.Profiler(PROFILING_CONFIG['history_runs'])
+    return profiler
+
+def _span(name: str):
+    return profiling.span(get_profiler(), name)
+
+def _profiled(name: str):
+    """Decorator form of ``_span``."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+if 'profiling_enabled' not in st.session_state:
+    st.session_state['profiling_enabled'] = bool(st.secrets.get(PROFILING_CONFIG["section"], {}).get(PROFILING_CONFIG["key_name"], False))
+if get_profiler() is not None:
+    get_profiler().start_run() # Ended at the bottom of the script
+
+# --- Post-Password Check: Verify Storage Configuration ---
+if STORAGE_BACKEND == "jsonbin" and not JSONBIN_SECRETS_CONFIGURED:
     st.warning("JSONBin Secrets are not (or incorrectly) configured. Online data saving/loading will fail. The app will use temporary local data.")
     # App can continue with local data, but persistence is disabled.
+elif not STORAGE_CONFIGURED:
+    st.error(f"Unknown storage backend '{STORAGE_BACKEND}'. The app will use temporary local data.")
 
 # ---------------------------- CSS STYLING ----------------------------
 def get_app_css(theme: str) -> str:
@@ -175,78 +418,134 @@ def display_current_time():
 
 display_current_time() # Initial display
 
-# ---------------------------- JSONBIN.IO PERSISTENCE ----------------------------
-def _get_jsonbin_headers() -> Optional[Dict[str, str]]:
-    if not JSONBIN_SECRETS_CONFIGURED: # Relies on global check
-        return None
-    return {
-        'Content-Type': 'application/json',
-        'X-Master-Key': JSONBIN_API_KEY
-    }
-
-def _process_datetime_fields(data_node: Any, to_iso: bool) -> Any:
-    """Recursively processes datetime fields to/from ISO format."""
-    if isinstance(data_node, dict):
-        new_dict = {}
-        for k, v in data_node.items():
-            if isinstance(v, datetime.datetime):
-                new_dict[k] = v.isoformat() if to_iso else datetime.datetime.fromisoformat(v) if isinstance(v, str) else v
-            elif k in ["entry_datetime", "timestamp", "time"] and isinstance(v, str) and not to_iso: # Specific keys for loading
-                try:
-                    new_dict[k] = datetime.datetime.fromisoformat(v)
-                except ValueError:
-                    new_dict[k] = v # Keep as string if invalid
-            else:
-                new_dict[k] = _process_datetime_fields(v, to_iso)
-        return new_dict
-    elif isinstance(data_node, list):
-        return [_process_datetime_fields(item, to_iso) for item in data_node]
-    return data_node
-
-def _prepare_data_for_saving(data: Dict[str, Any]) -> Dict[str, Any]:
-    """Converts datetime objects to ISO strings before saving to JSON."""
-    return _process_datetime_fields(copy.deepcopy(data), to_iso=True)
-
-def _process_loaded_data(data: Dict[str, Any]) -> Dict[str, Any]:
-    """Converts ISO string dates/times back to datetime objects after loading."""
-    return _process_datetime_fields(data, to_iso=False)
-
-
-@st.cache_data(ttl=300) # Cache data for 5 minutes
-def load_data_from_jsonbin() -> Optional[Dict[str, Any]]:
-    if not JSONBIN_SECRETS_CONFIGURED:
-        st.warning("Cannot load data: JSONBin secrets not configured.")
+# ---------------------------- STORAGE PERSISTENCE ----------------------------
+def _jsonbin_timeout() -> Tuple[float, float]:
+    return (JSONBIN_CONFIG['connect_timeout'], JSONBIN_CONFIG['read_timeout'])
+
+def _timeout_message(action: str) -> str:
+    return f"Error {action} data: Request timed out (connect {JSONBIN_CONFIG['connect_timeout']}s / read {JSONBIN_CONFIG['read_timeout']}s, {JSONBIN_CONFIG['max_retries']} retries)."
+
+@st.cache_resource
+def _create_storage_backend(backend_name: str, sqlite_path: str, api_key: Optional[str], bin_id: Optional[str],
+                            journal_bin_id: Optional[str], base_url: str, archive_bin_id: Optional[str],
+                            shard_bin_ids: Optional[Tuple[Tuple[str, str], ...]]) -> Optional[StorageBackend]:
+    """One backend per process and configuration, so the JSONBin journal, HTTP connection pool
+    and SQLite connection are shared by all sessions."""
+    if backend_name == "jsonbin":
+        if shard_bin_ids: # Shards replace the journal: a patch save uploads only the shards it touches
+            session = create_session(JSONBIN_CONFIG['max_retries'], JSONBIN_CONFIG['retry_backoff'],
+                                     pool_maxsize=ShardedJsonBinBackend.pool_size(dict(shard_bin_ids)))
+            return ShardedJsonBinBackend(api_key, bin_id, dict(shard_bin_ids), base_url, _jsonbin_timeout(), session,
+                                         JSONBIN_CONFIG['conditional_fetch'], archive_bin_id)
+        session = create_session(JSONBIN_CONFIG['max_retries'], JSONBIN_CONFIG['retry_backoff'])
+        return JsonBinBackend(api_key, bin_id, journal_bin_id, base_url, _jsonbin_timeout(), JSONBIN_CONFIG['compact_every'],
+                              session, JSONBIN_CONFIG['conditional_fetch'], archive_bin_id)
+    if backend_name == "sqlite":
+        return SqliteBackend(sqlite_path)
+    return None
+
+def get_storage_backend() -> Optional[StorageBackend]:
+    if not STORAGE_CONFIGURED:
         return None
-
-    headers = _get_jsonbin_headers()
-    if headers is None: # Should be caught by JSONBIN_SECRETS_CONFIGURED, but as a safeguard
-        st.error("Cannot load data: API Key issue (should not happen if secrets configured).")
+    location = get_storage_location()
+    return _create_storage_backend(STORAGE_BACKEND, location["sqlite_path"], JSONBIN_API_KEY, location["bin_id"], location["journal_bin_id"],
+                                   JSONBIN_BASE_URL, location["archive_bin_id"], location["shard_bin_ids"])
+
+
+@st.cache_resource
+def get_record_cache() -> RecordCache:
+    """Loaded documents for every session of this process (see ``tracker.record_cache``)."""
+    return RecordCache(int(RECORD_CACHE_MB * 1024 * 1024), STORAGE_CONFIG['record_cache_ttl_seconds'])
+
+@_profiled("load")
+def load_data_from_storage() -> Optional[Dict[str, Any]]:
+    """Loads the stored document. Cached per storage location and backend write revision, so a save
+    makes only the next load of *that* record miss. The document returned is shared by every session
+    reading the same record and must not be modified (see ``get_writable_app_data``)."""
+    backend = get_storage_backend()
+    if backend is None:
+        st.warning("Cannot load data: storage backend not configured.")
         return None
-
-    url = f"{JSONBIN_CONFIG['base_url']}/{JSONBIN_BIN_ID}/latest"
+    wal = get_write_behind_queue().wal if OFFLINE_FIRST else None
+    key, version = _storage_key(), _load_version(backend, wal)
+    load_raw = backend.load
+    prefetch = st.session_state.pop('data_prefetch', None)
+    if prefetch is not None and prefetch[0] == (key, version): # Started at login; usually done by now
+        load_raw = prefetch[1].result
+    return get_record_cache().get_or_load(key, version, lambda: _fetch_data_from_storage(backend, wal, load_raw))
+
+def _load_version(backend: StorageBackend, wal: Optional[WriteAheadLog]) -> Tuple:
+    return (backend.revision, wal.revision if wal is not None else None)
+
+@st.cache_resource
+def _get_prefetch_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=STORAGE_CONFIG['prefetch_workers'], thread_name_prefix="prefetch")
+
+def prefetch_data():
+    """Starts fetching the stored document on a worker thread as soon as the session is logged in, so the
+    request overlaps the imports and setup of the first rerun. ``load_data_from_storage`` waits for the
+    result (and reports its errors). Nothing is fetched when the session has its data or the cache has it."""
+    if 'app_data' in st.session_state or 'data_prefetch' in st.session_state or not STORAGE_CONFIGURED:
+        return
+    backend = get_storage_backend()
+    wal = get_write_behind_queue().wal if OFFLINE_FIRST else None
+    key, version = _storage_key(), _load_version(backend, wal)
+    if get_record_cache().get(key, version) is None:
+        st.session_state['data_prefetch'] = ((key, version), _get_prefetch_pool().submit(backend.load))
+
+def _storage_key() -> Tuple:
+    location = get_storage_location()
+    return (STORAGE_BACKEND, location["sqlite_path"], location["bin_id"], location["journal_bin_id"], JSONBIN_BASE_URL,
+            location["shard_bin_ids"])
+
+def _empty_record() -> Dict[str, Any]:
+    """``DEFAULT_APP_DATA`` as stored, for replaying logged edits onto an empty or missing bin."""
+    return codec.encode_document(copy.deepcopy(DEFAULT_APP_DATA))
+
+def _decode_record(backend: StorageBackend, raw_data: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], int]:
+    if not raw_data:
+        st.warning(f"{backend.name} storage is empty. Initializing with default structure.")
+        return copy.deepcopy(DEFAULT_APP_DATA), 0
+    if isinstance(raw_data, dict) and "subject_chapters_data" in raw_data and "todo_data" in raw_data:
+        size = len(json.dumps(raw_data, default=str))
+        with _span("codec.decode"):
+            loaded_data = codec.decode_document(raw_data)
+        for subject in SUBJECT_CHOICES:
+            loaded_data["subject_chapters_data"].setdefault(subject, [])
+        if records.ensure_ids(loaded_data): # One-time: data stored before records had IDs
+            loaded_data[codec.IDS_UNSAVED_KEY] = True
+        return loaded_data, size
+    st.error(f"Loaded data structure from {backend.name} is unexpected. Using default empty structure.")
+    st.json(raw_data) # Show problematic data
+    return copy.deepcopy(DEFAULT_APP_DATA), 0
+
+def _fetch_data_from_storage(backend: StorageBackend, wal: Optional[WriteAheadLog],
+                             load_raw: Callable[[], Optional[Dict[str, Any]]]) -> Tuple[Optional[Dict[str, Any]], int]:
+    """``(document, serialized size)``, or ``(None, 0)`` on failure. ``load_raw`` is ``backend.load``, or waits for
+    the fetch started at login. Offline-first, batches not yet synced are applied
+    on top of the remote data. Records stored before they had IDs are given them here, before any session
+    shares the document; the document is flagged so that its first save stores them with a snapshot (patches
+    address records by ID)."""
     try:
-        with st.spinner("Fetching latest data from JSONBin..."):
-            response = requests.get(url, headers=headers, timeout=JSONBIN_CONFIG['request_timeout'])
-            response.raise_for_status()
-            raw_data = response.json().get("record")
-
-            if not raw_data:
-                st.warning("JSONBin bin is empty. Initializing with default structure.")
-                return copy.deepcopy(DEFAULT_APP_DATA)
-            if isinstance(raw_data, dict) and "subject_chapters_data" in raw_data and "todo_data" in raw_data:
-                return _process_loaded_data(raw_data)
-            else:
-                st.error("Loaded data structure from JSONBin is unexpected. Using default empty structure.")
-                st.json(raw_data) # Show problematic data
-                return copy.deepcopy(DEFAULT_APP_DATA)
+        with st.spinner(f"Fetching latest data from {backend.name}..."):
+            with _span("storage.load"):
+                raw_data = load_raw()
+            if wal is not None and wal.pending():
+                with _span("wal.reconcile"):
+                    raw_data = wal.reconcile(raw_data or _empty_record())
+            return _decode_record(backend, raw_data)
 
     except requests.exceptions.Timeout:
-        st.error(f"Error loading data: Request timed out after {JSONBIN_CONFIG['request_timeout']}s.")
+        st.error(_timeout_message("loading"))
+    except requests.exceptions.ConnectionError as e: # Also raised once retries on read timeouts run out
+        st.error(f"Error loading data: could not reach {backend.name} after {JSONBIN_CONFIG['max_retries']} retries: {e}")
     except requests.exceptions.HTTPError as e:
         st.error(f"Error loading data from JSONBin (HTTP {e.response.status_code}): {e}")
         if e.response.status_code == 404:
-            st.error(f"Bin ID '{JSONBIN_BIN_ID}' not found. Please create the bin or check the Bin ID.")
-            return copy.deepcopy(DEFAULT_APP_DATA) # Return default if bin not found
+            st.error(f"Bin ID '{get_storage_location()['bin_id']}' not found. Please create the bin or check the Bin ID.")
+            if wal is not None and wal.pending(): # Logged edits stay visible; their flush writes the bin
+                return _decode_record(backend, wal.reconcile(_empty_record()))
+            return copy.deepcopy(DEFAULT_APP_DATA), 0 # Return default if bin not found
         elif e.response.status_code == 401:
             st.error("Unauthorized (401). Check your JSONBin API Key.")
         try: st.json({"error_details": e.response.json()})
@@ -255,32 +554,18 @@ def load_data_from_jsonbin() -> Optional[Dict[str, Any]]:
         st.error("Error: Could not decode JSON response from JSONBin.")
     except Exception as e:
         st.error(f"An unexpected error occurred during loading: {e}")
-    return None # Indicate failure for most errors except specific cases like 404
+    return None, 0 # Indicate failure for most errors except specific cases like 404
 
-def save_data_to_jsonbin(data_to_save: Dict[str, Any]) -> bool:
-    if not JSONBIN_SECRETS_CONFIGURED:
-        st.error("Cannot save data: JSONBin secrets not configured.")
-        return False
-
-    headers = _get_jsonbin_headers()
-    if headers is None:
-        st.error("Cannot save data: API Key issue.")
-        return False
-    if data_to_save is None:
-        st.warning("Attempted to save 'None' data. Aborting save.")
-        return False
-
-    prepared_data = _prepare_data_for_saving(data_to_save)
-    url = f"{JSONBIN_CONFIG['base_url']}/{JSONBIN_BIN_ID}"
+def _run_storage_save(save_fn: Callable[[], None], spinner_text: str) -> bool:
+    """Runs one backend write behind a spinner and reports failures in the UI."""
     try:
-        with st.spinner("Saving data to JSONBin..."):
-            response = requests.put(url, headers=headers, json=prepared_data, timeout=JSONBIN_CONFIG['request_timeout'])
-            response.raise_for_status()
-
-        st.cache_data.clear() # IMPORTANT: Clear cache after successful save
+        with st.spinner(spinner_text):
+            save_fn() # The backend's revision moves on, so the next load_data_from_storage() misses
         return True
     except requests.exceptions.Timeout:
-        st.error(f"Error saving data: Request timed out after {JSONBIN_CONFIG['request_timeout']}s.")
+        st.error(_timeout_message("saving"))
+    except requests.exceptions.ConnectionError as e: # Also raised once retries on read timeouts run out
+        st.error(f"Error saving data: could not reach the server after {JSONBIN_CONFIG['max_retries']} retries: {e}")
     except requests.exceptions.HTTPError as e:
         st.error(f"Error saving data to JSONBin (HTTP {e.response.status_code}): {e}")
         if e.response.status_code == 401:
@@ -291,35 +576,409 @@ def save_data_to_jsonbin(data_to_save: Dict[str, Any]) -> bool:
         st.error(f"An unexpected error occurred during saving: {e}")
     return False
 
+@_profiled("save")
+def save_patches_to_storage(app_data: Dict[str, Any], patch_list: List[Dict[str, Any]]) -> bool:
+    """Persists only the given patches. The full document is encoded and sent only when the backend
+    asks for a snapshot (JSONBin compaction, or JSONBin without a journal bin).
+    In write-behind mode the patches are queued and this returns immediately; offline-first, once they
+    are in the local write-ahead log."""
+    bump_data_revision()
+    if is_write_behind_enabled():
+        return _enqueue_write_behind(app_data, patch_list)
+    backend = get_storage_backend()
+    if backend is None:
+        st.error("Cannot save data: storage backend not configured.")
+        return False
+
+    with _span("codec.encode"):
+        needs_snapshot = app_data.get(codec.IDS_UNSAVED_KEY) or backend.wants_snapshot(len(patch_list))
+        snapshot = codec.encode_document(app_data) if needs_snapshot else None
+        encoded_patches = [codec.encode_patch(p) for p in patch_list]
+    if not patch_list and snapshot is None:
+        return True
+    with _span("storage.save"):
+        saved = _run_storage_save(lambda: backend.save_patches(encoded_patches, snapshot), f"Saving changes to {backend.name}...")
+    if saved:
+        app_data.pop(codec.IDS_UNSAVED_KEY, None)
+    return saved
+
+# ---------------------------- WRITE-BEHIND SAVING ----------------------------
+def _flush_write_behind_batch(backend: StorageBackend, patch_list: List[Dict[str, Any]], snapshot: Optional[Dict[str, Any]], *_):
+    """Runs on the write-behind worker thread; raises so the queue can retry the batch. Without a
+    write-ahead log there is no ``last_seq`` to use."""
+    backend.save_patches(patch_list, snapshot)
+
+@st.cache_resource
+def _create_offline_queue(storage_key: Tuple, wal_path: str) -> WriteBehindQueue:
+    """One queue per process and storage location in offline-first mode, as all sessions share the log file.
+    Creating it starts syncing whatever an earlier run left unsynced."""
+    wal = WriteAheadLog(wal_path, STORAGE_CONFIG['wal_compact_every'])
+    return WriteBehindQueue(functools.partial(flush_offline_batch, get_storage_backend(), wal, _empty_record()),
+                            WRITE_BEHIND_CONFIG['debounce_seconds'], WRITE_BEHIND_CONFIG['retry_seconds'], wal,
+                            WRITE_BEHIND_CONFIG['max_failures'], is_transient_error)
+
+def get_write_behind_queue() -> WriteBehindQueue:
+    if OFFLINE_FIRST:
+        return _create_offline_queue(_storage_key(), get_storage_location()["wal_path"])
+    queue = st.session_state.get('write_behind_queue')
+    if queue is None:
+        queue = WriteBehindQueue(functools.partial(_flush_write_behind_batch, get_storage_backend()),
+                                 WRITE_BEHIND_CONFIG['debounce_seconds'], WRITE_BEHIND_CONFIG['retry_seconds'],
+                                 max_failures=WRITE_BEHIND_CONFIG['max_failures'], is_transient=is_transient_error)
+        st.session_state['write_behind_queue'] = queue
+    return queue
+
+def is_write_behind_enabled() -> bool:
+    return STORAGE_CONFIGURED and (OFFLINE_FIRST or st.session_state.get('write_behind_enabled', False))
+
+@_profiled("write_behind.enqueue")
+def _enqueue_write_behind(app_data: Dict[str, Any], patch_list: List[Dict[str, Any]]) -> bool:
+    """Encodes on the script thread (the worker never reads live session data) and queues the result.
+    Offline-first only the patches are logged, as a snapshot per edit would grow the log by the whole
+    document each time; ``flush_offline_batch`` rebuilds the snapshot when the backend needs one. The
+    exception is the first save of a document whose record IDs were assigned on load.
+    False only when the write-ahead log could not be written."""
+    queue = get_write_behind_queue()
+    needs_snapshot = app_data.get(codec.IDS_UNSAVED_KEY) or \
+        (queue.wal is None and get_storage_backend().wants_snapshot(queue.pending_count() + len(patch_list)))
+    snapshot = codec.encode_document(app_data) if needs_snapshot else None
+    try:
+        queue.submit([codec.encode_patch(p) for p in patch_list], snapshot)
+    except OSError as e:
+        st.error(f"Could not write the change to the local log ({queue.wal.path}): {e}")
+        return False
+    app_data.pop(codec.IDS_UNSAVED_KEY, None)
+    return True
+
+def set_write_behind_enabled(enabled: bool) -> bool:
+    if not enabled and st.session_state.get('write_behind_queue') is not None:
+        with st.spinner("Saving queued changes..."):
+            if not get_write_behind_queue().flush(timeout=WRITE_BEHIND_CONFIG['disable_flush_timeout']):
+                st.error("Queued changes could not be saved yet. Background saving stays on until they are.")
+                return False
+    st.session_state['write_behind_enabled'] = enabled
+    return True
+
+def _rerun_fragment():
+    """After a save that only the calling fragment displays: reruns just that fragment."""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException: # Not inside a fragment rerun (e.g. the fragment ran as part of a full run)
+        pass
+    st.rerun()
+
+@st.fragment(run_every=WRITE_BEHIND_CONFIG['status_refresh_seconds'])
+def display_write_behind_status():
+    queue = get_write_behind_queue()
+    status = queue.status()
+    if status["state"] == "stalled":
+        kept = "saved on this device" if queue.wal is not None else "kept in this session"
+        st.error(f"⛔ {status['pending']} change(s) {kept} keep failing to sync with the same error: {status['last_error']}. "
+                 "Automatic retries have stopped.")
+        if st.button("Retry Sync", key="write_behind_retry_btn"):
+            queue.retry()
+    elif status["state"] == "error" and queue.wal is not None:
+        st.warning(f"📴 {status['pending']} change(s) saved on this device, not yet synced: {status['last_error']}. "
+                   "Retrying automatically.")
+    elif status["state"] == "error":
+        st.error(f"⚠️ {status['pending']} change(s) not saved: {status['last_error']}. Retrying automatically.")
+    elif status["state"] in ("pending", "flushing"):
+        st.caption(f"⏳ Saving {status['pending']} change(s) in the background...")
+    elif status["last_flush_at"] is not None:
+        st.caption(f"✅ All changes saved ({status['last_flush_at'].strftime('%I:%M:%S %p')})")
+    else:
+        st.caption("✅ No unsaved changes")
+
+prefetch_data()
+
+# ---------------------------- REMAINING IMPORTS (while the data is fetched) ----------------------------
+from tracker import archive, charts, patches, revision_calendar, scheduling
+from tracker.analytics import GRANULARITIES, DailyRollup, PeriodSeries, ReminderTable, period_series
+from tracker.bulk_import import IMPORT_FILE_TYPES, IMPORT_TEMPLATE_CSV, ImportResult, load_import
+from tracker.export import EXPORT_FORMATS, ExportCache, available_formats
+from tracker.models import Chapter, Reminder, ReminderStatus, Todo, TodoStatus
+from tracker.records import RecordIndex
+from tracker.reminder_index import ReminderIndex
+from tracker.revision_calendar import RevisionCalendar
+
 # ---------------------------- SESSION STATE INITIALIZATION & HELPERS ----------------------------
 def get_app_data() -> Dict[str, Any]:
+    """The session's document, for reading; it may be shared with other sessions of the same user."""
     return st.session_state.get('app_data', copy.deepcopy(DEFAULT_APP_DATA))
 
-def get_subject_chapters_data() -> Dict[str, List[Dict]]:
+def get_writable_app_data() -> Dict[str, Any]:
+    """The session's document, for editing. Sessions reading the same record share one loaded copy; the
+    first edit gives the session its own (copy-on-write), with the indexes rebuilt over it. Every edit
+    calls this before it looks records up, so it changes the session's copy and not the shared one."""
+    if st.session_state.pop('app_data_shared', False):
+        with _span("session.copy_on_write"):
+            st.session_state['app_data'] = copy.deepcopy(st.session_state['app_data'])
+        st.session_state.pop('derived_cache', None) # May hold records of the shared copy
+        _rebuild_derived_data()
+    return get_app_data()
+
+def get_subject_chapters_data() -> Dict[str, List[Chapter]]:
     app_data = get_app_data()
     return app_data.get("subject_chapters_data", {})
 
-def get_todo_data() -> List[Dict]:
+def get_todo_data() -> List[Todo]:
     app_data = get_app_data()
     return app_data.get("todo_data", [])
 
+# ---------------------------- DERIVED DATA (INDEX & ANALYTICS TABLE) ----------------------------
+def get_data_revision() -> int:
+    """Edit counter carried on ``app_data``; derived values (progress, aggregates, chart data, exports) are keyed on it."""
+    return get_app_data().get(codec.DATA_REVISION_KEY, 0)
+
+def bump_data_revision():
+    """Called before every save, i.e. after every local edit (reverts follow a failed save in the same run)."""
+    app_data = get_app_data()
+    app_data[codec.DATA_REVISION_KEY] = app_data.get(codec.DATA_REVISION_KEY, 0) + 1
+
+def cached_by_revision(key: Tuple, compute: Callable[[], Any]) -> Any:
+    """Per-session memo for derived values; every entry is dropped once the data revision moves on."""
+    revision = get_data_revision()
+    cache = st.session_state.get('derived_cache')
+    if cache is None or cache['revision'] != revision:
+        cache = st.session_state['derived_cache'] = {'revision': revision, 'values': {}}
+    if key not in cache['values']:
+        cache['values'][key] = compute()
+    return cache['values'][key]
+
+@_profiled("index.reminders.build")
+def _rebuild_reminder_index() -> ReminderIndex:
+    """Full rebuild of the date index; only needed on load or after a bulk revert."""
+    index = ReminderIndex.build(get_subject_chapters_data(), SUBJECT_CHOICES)
+    st.session_state['reminder_index'] = index
+    return index
+
+def get_reminder_index() -> ReminderIndex:
+    index = st.session_state.get('reminder_index')
+    return index if index is not None else _rebuild_reminder_index()
+
+def get_reminder_table() -> ReminderTable:
+    """Columnar reminder table for the dashboard aggregates; kept current by the same hooks as the reminder index."""
+    table = st.session_state.get('reminder_table')
+    if table is None:
+        with _span("index.reminder_table.build"):
+            table = st.session_state['reminder_table'] = ReminderTable.build(get_subject_chapters_data(), SUBJECT_CHOICES)
+    return table
+
+@_profiled("index.records.build")
+def _rebuild_record_index() -> RecordIndex:
+    index = RecordIndex.build(get_app_data())
+    st.session_state['record_index'] = index
+    return index
+
+def get_record_index() -> RecordIndex:
+    """uid -> chapter / todo hash maps for O(1) lookups by durable ID."""
+    index = st.session_state.get('record_index')
+    return index if index is not None else _rebuild_record_index()
+
+def get_reminder_rollup() -> DailyRollup:
+    """Per-subject, per-day counts with running totals for the productivity view; patched in place on every edit."""
+    rollup = st.session_state.get('reminder_rollup')
+    if rollup is None:
+        table = get_reminder_table()
+        with _span("index.reminder_rollup.build"):
+            rollup = st.session_state['reminder_rollup'] = DailyRollup.build(table)
+    return rollup
+
+def get_revision_calendar() -> RevisionCalendar:
+    """Revisions per subject and day over the last year; kept current by the same hooks as the reminder index."""
+    calendar = st.session_state.get('revision_calendar')
+    if calendar is None or not calendar.covers(datetime.date.today()):
+        with _span("index.revision_calendar.build"):
+            calendar = st.session_state['revision_calendar'] = RevisionCalendar.build(get_subject_chapters_data(), SUBJECT_CHOICES)
+    return calendar
+
+def _rebuild_derived_data():
+    """After the document was replaced: the indexes are rebuilt now, the analytics views on next use."""
+    _rebuild_reminder_index()
+    _rebuild_record_index()
+    for key in ('reminder_table', 'reminder_rollup', 'revision_calendar'):
+        st.session_state.pop(key, None)
+
+def _derived_reminder_views() -> List[Any]:
+    """The analytics table, rollup and revision calendar, where this session has built them."""
+    return [view for view in (st.session_state.get(key) for key in ('reminder_table', 'reminder_rollup', 'revision_calendar'))
+            if view is not None]
+
+def _on_chapter_added(subject: str, chapter: Chapter):
+    get_reminder_index().chapter_added(subject, chapter)
+    get_record_index().chapter_added(subject, chapter)
+    for view in _derived_reminder_views():
+        view.chapter_added(subject, chapter)
+
+def _on_chapter_deleted(subject: str, chapter: Chapter):
+    get_reminder_index().chapter_deleted(chapter)
+    get_record_index().chapter_removed(chapter.uid)
+    for view in _derived_reminder_views():
+        view.chapter_deleted(subject, chapter)
+
+def _on_reminder_added(subject: str, chapter: Chapter, reminder: Reminder):
+    get_reminder_index().reminder_added(subject, chapter, reminder)
+    for view in _derived_reminder_views():
+        view.reminder_added(subject, reminder)
+
+def _on_reminder_removed(subject: str, reminder: Reminder):
+    get_reminder_index().reminder_removed(reminder)
+    for view in _derived_reminder_views():
+        view.reminder_removed(subject, reminder)
+
+def _set_reminder_status(subject: str, reminder: Reminder, status: ReminderStatus, revised_at: Optional[datetime.datetime] = None):
+    """Sets a reminder's status (and when it was revised) and patches the index, analytics table, rollup and
+    revision calendar in place."""
+    old_status, old_revised_at = reminder.status, reminder.revised_at
+    reminder.status = status
+    reminder.revised_at = revised_at if status == ReminderStatus.REVISED else None
+    get_reminder_index().status_changed(reminder, old_status, status)
+    calendar = st.session_state.get('revision_calendar')
+    if calendar is not None:
+        calendar.status_changed(subject, reminder, old_status, old_revised_at)
+    table = st.session_state.get('reminder_table')
+    if table is not None:
+        table.set_status(reminder, status)
+        rollup = st.session_state.get('reminder_rollup') # Only ever built from the current table
+        if rollup is not None:
+            rollup.status_changed(table.subject_code_of(reminder), reminder.time, old_status, status)
+
+def _set_todo_status(todo: Todo, status: TodoStatus):
+    """Sets a todo's status and moves it between the record index's status lists."""
+    old_status = todo.status
+    todo.status = status
+    get_record_index().todo_status_changed(todo, old_status)
+
+# ---------------------------- ARCHIVE TIER ----------------------------
+def get_archive_after_days() -> int:
+    after_days = st.secrets.get(ARCHIVE_CONFIG["section"], {}).get(ARCHIVE_CONFIG["key_name"], ARCHIVE_CONFIG["default_after_days"])
+    return max(int(after_days), 0)
+
+def get_archive_summary() -> Dict[str, Any]:
+    """Archived counts kept in the hot document (see ``tracker.archive``)."""
+    return get_app_data().get(archive.ARCHIVE_SUMMARY_KEY) or archive.empty_summary()
+
+def has_archive() -> bool:
+    summary = get_archive_summary()
+    return archive.archived_chapter_count(summary) > 0 or summary.get("todos", 0) > 0
+
+def archive_covers(start_date: Optional[datetime.date]) -> bool:
+    """Whether archived records can fall on or after ``start_date`` (``None``: all time). Everything archived
+    was older than the archive age when it moved, so shorter windows never need the archive."""
+    if not has_archive():
+        return False
+    return start_date is None or start_date < datetime.date.today() - datetime.timedelta(days=get_archive_after_days())
+
+@_profiled("load.archive")
+def get_archive_data() -> Dict[str, Any]:
+    """The archive tier, read on first use and kept for the session (dropped when more records are archived)."""
+    archive_data = st.session_state.get('archive_data')
+    if archive_data is None:
+        backend = get_storage_backend()
+        try:
+            with st.spinner("Loading archived records..."):
+                with _span("storage.load_archive"):
+                    raw_archive = backend.load_archive() if backend is not None else None
+                with _span("codec.decode"):
+                    archive_data = codec.decode_document(raw_archive) if raw_archive else archive.empty_archive()
+        except Exception as e:
+            st.error(f"Could not load archived records: {e}")
+            return archive.empty_archive()
+        live_chapter_uids = {chapter.uid for chapters in get_subject_chapters_data().values() for chapter in chapters}
+        archive.drop_live_records(archive_data, live_chapter_uids, {todo.uid for todo in get_todo_data()})
+        st.session_state['archive_data'] = archive_data
+    return archive_data
+
+def get_archive_table() -> ReminderTable:
+    table = st.session_state.get('archive_table')
+    if table is None:
+        with _span("index.archive_table.build"):
+            table = st.session_state['archive_table'] = ReminderTable.build(get_archive_data()['subject_chapters_data'], SUBJECT_CHOICES)
+    return table
+
+def get_archive_calendar() -> RevisionCalendar:
+    calendar = st.session_state.get('archive_calendar')
+    if calendar is None or not calendar.covers(datetime.date.today()):
+        with _span("index.archive_calendar.build"):
+            calendar = st.session_state['archive_calendar'] = RevisionCalendar.build(get_archive_data()['subject_chapters_data'], SUBJECT_CHOICES)
+    return calendar
+
+def get_archive_rollup() -> DailyRollup:
+    rollup = st.session_state.get('archive_rollup')
+    if rollup is None:
+        table = get_archive_table()
+        with _span("index.archive_rollup.build"):
+            rollup = st.session_state['archive_rollup'] = DailyRollup.build(table)
+    return rollup
+
+def archive_old_records() -> int:
+    """Moves finished chapters and completed tasks older than the archive age out of the live data in one save.
+    Returns how many records moved."""
+    after_days = get_archive_after_days()
+    backend = get_storage_backend()
+    if not after_days or backend is None or not backend.supports_archive:
+        return 0
+    cutoff = datetime.datetime.combine(datetime.date.today() - datetime.timedelta(days=after_days), datetime.time.min)
+    chapters, todos = archive.select_archivable(get_subject_chapters_data(), get_todo_data(), cutoff)
+    if not chapters and not todos:
+        return 0
+    app_data = get_writable_app_data() # Select again: the records found above may belong to the shared copy
+    chapters, todos = archive.select_archivable(app_data['subject_chapters_data'], app_data['todo_data'], cutoff)
+    archive_patch = patches.archive_records(chapters, todos)
+    original_lists = {subject: list(chapter_list) for subject, chapter_list in app_data['subject_chapters_data'].items()}
+    original_todos = list(app_data['todo_data'])
+    original_summary = app_data.get(archive.ARCHIVE_SUMMARY_KEY)
+    moved = {id(chapter) for _, chapter in chapters} | {id(todo) for todo in todos}
+    for chapter_list in app_data['subject_chapters_data'].values():
+        chapter_list[:] = [chapter for chapter in chapter_list if id(chapter) not in moved]
+    app_data['todo_data'][:] = [todo for todo in app_data['todo_data'] if id(todo) not in moved]
+    summary = copy.deepcopy(original_summary) if original_summary else archive.empty_summary()
+    archive.add_summary(summary, archive.summarize_patch(codec.encode_patch(archive_patch)))
+    app_data[archive.ARCHIVE_SUMMARY_KEY] = summary
+    _rebuild_derived_data()
+    st.session_state.pop('archive_data', None)
+    st.session_state.pop('archive_table', None)
+    st.session_state.pop('archive_rollup', None)
+    st.session_state.pop('archive_calendar', None)
+    if save_patches_to_storage(app_data, [archive_patch]):
+        return len(chapters) + len(todos)
+    st.error("Failed to archive old records. They stay in the live data for now.")
+    for subject, chapter_list in original_lists.items(): # Revert
+        app_data['subject_chapters_data'][subject][:] = chapter_list
+    app_data['todo_data'][:] = original_todos
+    if original_summary is None:
+        app_data.pop(archive.ARCHIVE_SUMMARY_KEY, None)
+    else:
+        app_data[archive.ARCHIVE_SUMMARY_KEY] = original_summary
+    _rebuild_derived_data()
+    return 0
+
+@_profiled("session.init")
 def initialize_session_state():
     if 'app_data' not in st.session_state:
-        if JSONBIN_SECRETS_CONFIGURED:
-            loaded_data = load_data_from_jsonbin()
+        if STORAGE_CONFIGURED:
+            loaded_data = load_data_from_storage()
             if loaded_data is None:
                 st.error("CRITICAL: Failed to load data after login. Using temporary empty structure.")
                 st.session_state['app_data'] = copy.deepcopy(DEFAULT_APP_DATA)
             else:
                 st.session_state['app_data'] = loaded_data
-                st.success("Data loaded successfully from JSONBin.")
+                st.session_state['app_data_shared'] = True # Copied on the first edit
+                st.success(f"Data loaded successfully from {get_storage_backend().name}.")
         else:
-            st.warning("Using temporary empty local data as JSONBin is not configured. Changes will not be saved online.")
+            st.warning("Using temporary empty local data as storage is not configured. Changes will not be saved.")
             st.session_state['app_data'] = copy.deepcopy(DEFAULT_APP_DATA)
 
     if 'app_theme' not in st.session_state:
         st.session_state['app_theme'] = "Light Mode"
 
+    if 'write_behind_enabled' not in st.session_state:
+        default_mode = st.secrets.get(WRITE_BEHIND_CONFIG["section"], {}).get(WRITE_BEHIND_CONFIG["key_name"], False)
+        st.session_state['write_behind_enabled'] = bool(default_mode)
+
+    if 'light_charts_enabled' not in st.session_state:
+        st.session_state['light_charts_enabled'] = bool(st.secrets.get(CHART_CONFIG["section"], {}).get(CHART_CONFIG["key_name"], False))
+
     # Ensure data structure integrity (defensive programming)
     app_data = st.session_state.get('app_data')
     if not isinstance(app_data, dict) \
@@ -333,6 +992,18 @@ def initialize_session_state():
         if subject not in st.session_state['app_data']['subject_chapters_data']:
             st.session_state['app_data']['subject_chapters_data'][subject] = []
 
+    if 'record_index' not in st.session_state:
+        records.ensure_ids(st.session_state['app_data'])
+        _rebuild_record_index()
+    if 'reminder_index' not in st.session_state:
+        _rebuild_reminder_index()
+
+    if STORAGE_CONFIGURED and 'archive_checked' not in st.session_state: # Once per session, after the first load
+        st.session_state['archive_checked'] = True
+        archived_count = archive_old_records()
+        if archived_count:
+            st.info(f"Archived {archived_count} finished chapter(s) and completed task(s) older than {get_archive_after_days()} days.")
+
 
 initialize_session_state()
 
@@ -349,141 +1020,316 @@ study_tips = [
 ]
 
 # ---------------------------- HELPER & CORE FUNCTIONS ----------------------------
-def _create_default_reminders(entry_datetime: datetime.datetime) -> List[Dict]:
-    return [
-        {"reminder_id": 1, "type": "12 hour Reminder", "time": entry_datetime + datetime.timedelta(hours=12), "status": "Pending"},
-        {"reminder_id": 2, "type": "3 days Reminder", "time": entry_datetime + datetime.timedelta(days=3), "status": "Pending"},
-        {"reminder_id": 3, "type": "5 days Reminder", "time": entry_datetime + datetime.timedelta(days=5), "status": "Pending"},
-    ]
-
-def _prepare_csv_data() -> bytes:
-    subject_data = get_subject_chapters_data()
-    all_data = []
-    for subject, chapters in subject_data.items():
-        for chapter in chapters:
-            for reminder in chapter.get('reminders', []):
-                all_data.append({
-                    "Subject": subject,
-                    "Chapter Name": chapter.get('chapter_name', 'N/A'),
-                    "Entry Date": chapter.get('entry_datetime', 'N/A').strftime("%d/%m/%y %I:%M %p") if isinstance(chapter.get('entry_datetime'), datetime.datetime) else 'N/A',
-                    "Reminder Time": reminder.get('time', 'N/A').strftime("%d/%m/%y %I:%M %p") if isinstance(reminder.get('time'), datetime.datetime) else 'N/A',
-                    "Status": reminder.get('status', 'N/A'),
-                    "Exams Appeared": chapter.get('exams_appeared', 0),
-                    "Exam Status": chapter.get('exam_status', 'Not Appeared'),
-                    "Time Spent (minutes)": chapter.get('time_spent', 0)
-                })
-    return pd.DataFrame(all_data).to_csv(index=False).encode('utf-8')
-
-def _aggregate_productivity_data(start_date: Optional[datetime.date] = None) -> Dict:
-    subject_data = get_subject_chapters_data()
-    aggregated = {}
-    for chapters in subject_data.values():
-        for chapter in chapters:
-            for reminder in chapter.get("reminders", []):
-                reminder_time_obj = reminder.get("time")
-                if isinstance(reminder_time_obj, datetime.datetime):
-                    r_date = reminder_time_obj.date()
-                    if start_date and r_date < start_date:
-                        continue
-                    aggregated.setdefault(r_date, {"total": 0, "revised": 0})
-                    aggregated[r_date]["total"] += 1
-                    if reminder.get("status") == "Revised":
-                        aggregated[r_date]["revised"] += 1
-    return aggregated
-
-def add_chapter_and_reminders(subject: str, chapter_name: str, entry_datetime: datetime.datetime, custom_reminders: Optional[List[Dict]] = None):
-    app_data = get_app_data()
-    reminders = custom_reminders if custom_reminders else _create_default_reminders(entry_datetime)
-    new_chapter = {
-        "chapter_name": chapter_name, "entry_datetime": entry_datetime, "reminders": reminders,
-        "exams_appeared": 0, "exam_status": "Not Appeared", "time_spent": 0
-    }
-    app_data['subject_chapters_data'][subject].append(new_chapter)
-    if save_data_to_jsonbin(app_data):
+def _default_schedule() -> Dict[str, Any]:
+    if SCHEDULER_CONFIG['default'] == scheduling.FixedIntervalScheduler.name:
+        return scheduling.FixedIntervalScheduler(SCHEDULER_CONFIG['fixed_intervals_hours']).to_schedule()
+    return scheduling.SCHEDULERS[SCHEDULER_CONFIG['default']]().to_schedule()
+
+def get_export_cache() -> ExportCache:
+    cache = st.session_state.get('export_cache')
+    if cache is None:
+        cache = st.session_state['export_cache'] = ExportCache(EXPORT_CONFIG['chunk_rows'])
+    return cache
+
+def get_export_chapters_data() -> Dict[str, List[Chapter]]:
+    """Live chapters, preceded by the archived ones when there are any."""
+    if not has_archive():
+        return get_subject_chapters_data()
+    archived = get_archive_data()['subject_chapters_data']
+    live = get_subject_chapters_data()
+    return {subject: archived.get(subject, []) + live.get(subject, []) for subject in {**archived, **live}}
+
+def display_data_export():
+    """Builds the export file only when asked for, and reuses it until the data revision changes."""
+    export_format = st.selectbox("Format:", available_formats(), key="export_format_select")
+    extension, mime = EXPORT_FORMATS[export_format]
+    revision = get_data_revision()
+    cache = get_export_cache()
+    export_path = cache.get(revision, export_format)
+    if export_path is None and st.button(f"Prepare {export_format} Export", key="prepare_export_btn"):
+        with st.spinner("Preparing export..."):
+            try:
+                export_path = cache.build(revision, export_format, get_export_chapters_data())
+            except (OSError, ValueError) as e:
+                st.error(f"Could not prepare the export: {e}")
+    if export_path is not None:
+        with open(export_path, "rb") as export_file:
+            st.download_button(label=f"Download Study Data ({export_format})", data=export_file.read(),
+                               file_name=f"{EXPORT_CONFIG['file_stem']}.{extension}", mime=mime, key="download_export_btn")
+
+@_profiled("aggregate.period_series")
+def get_period_series(start_date: Optional[datetime.date], end_date: Optional[datetime.date], granularity: str,
+                      subjects: List[str]) -> PeriodSeries:
+    """Reminder counts per day, week or month of the period from the rollups, plus the archive's when the
+    period reaches back that far. Recomputed only when the query changes or a rollup is edited."""
+    rollups = [get_reminder_rollup()] + ([get_archive_rollup()] if archive_covers(start_date) else [])
+    inputs = (start_date, end_date, granularity, tuple(subjects)) + tuple((rollup, rollup.version) for rollup in rollups)
+    return memoize_chart("productivity_series", inputs, lambda: period_series(rollups, start_date, end_date, granularity, subjects))
+
+@_profiled("aggregate.productivity_chart_data")
+def _productivity_chart_data(series: PeriodSeries) -> pd.DataFrame:
+    """Display-ready productivity rows, one per bucket, for the trend chart and table."""
+    label_format = CHART_CONFIG["bucket_label_formats"][series.granularity]
+    def build() -> pd.DataFrame:
+        return pd.DataFrame({
+            "Date": [start.strftime(label_format) for start in series.starts.astype(object)], "Total Reminders": series.total,
+            "Revised": series.revised, "Productivity (%)": series.productivity()
+        })
+    return memoize_chart("productivity_table", (series,), build)
+
+# ---------------------------- CHARTS ----------------------------
+def memoize_chart(name: str, inputs: Tuple, build: Callable[[], Any]) -> Any:
+    """Per-session memo of chart figures, specs and their data, one entry per ``name``. It is rebuilt only when
+    ``inputs`` (what the chart is drawn from: its counts, or a series and its version) differ from the last build."""
+    chart_cache = st.session_state.setdefault('chart_cache', {})
+    cached = chart_cache.get(name)
+    if cached is None or cached[0] != inputs:
+        cached = chart_cache[name] = (inputs, build())
+    return cached[1]
+
+def use_light_charts(points: int = 0) -> bool:
+    """Vega-Lite instead of Plotly: when switched on, or for a trend with more than ``light_after_days`` points."""
+    return st.session_state['light_charts_enabled'] or points > CHART_CONFIG["light_after_days"]
+
+def display_status_pie(name: str, counts: Dict[str, int], colors: Dict[str, str], title: str, **trace_options):
+    """Pie of ``counts`` with one slice per status in ``colors`` order."""
+    inputs = tuple(counts.get(status, 0) for status in colors)
+    if use_light_charts():
+        spec = memoize_chart(f"{name}.light", inputs, lambda: charts.pie_spec(counts, colors, title))
+        with _span(f"vega.render[{name}]"):
+            st.vega_lite_chart(spec, use_container_width=True)
+        return
+
+    def build():
+        df_status = pd.DataFrame({"Status": list(colors), "Count": list(inputs)})
+        df_status['Status'] = pd.Categorical(df_status['Status'], categories=list(colors), ordered=True)
+        fig_pie = px.pie(df_status, names="Status", values="Count", title=title, color="Status", color_discrete_map=colors)
+        fig_pie.update_traces(**trace_options)
+        return fig_pie
+    with _span(f"plotly.figure[{name}]"):
+        fig_pie = memoize_chart(name, inputs, build)
+    with _span(f"plotly.render[{name}]"):
+        st.plotly_chart(fig_pie, use_container_width=True)
+
+def display_productivity_trend(series: PeriodSeries, df_prod_display: pd.DataFrame):
+    title = f"{series.granularity} Productivity Trend"
+    if use_light_charts(len(series)):
+        spec = memoize_chart("productivity_trend.light", (series,), lambda: charts.line_spec(
+            series.starts.astype(object), series.productivity(), "Productivity (%)", title))
+        with _span("vega.render[productivity_trend]"):
+            st.vega_lite_chart(spec, use_container_width=True)
+        return
+    with _span("plotly.figure[productivity_trend]"):
+        fig_line = memoize_chart("productivity_trend", (series,), lambda: px.line(
+            df_prod_display, x="Date", y="Productivity (%)", markers=True, title=title))
+    with _span("plotly.render[productivity_trend]"):
+        st.plotly_chart(fig_line, use_container_width=True)
+
+def add_chapter_and_reminders(subject: str, chapter_name: str, entry_datetime: datetime.datetime, schedule: Optional[Dict[str, Any]] = None):
+    """Adds a chapter holding only its first reminder; the scheduler adds each later one as the previous is revised."""
+    app_data = get_writable_app_data()
+    new_chapter = Chapter(chapter_name, entry_datetime, uid=records.new_uid(), schedule=schedule or _default_schedule())
+    scheduling.sync_chapter(new_chapter)
+    chapters_list = app_data['subject_chapters_data'][subject]
+    chapters_list.append(new_chapter)
+    _on_chapter_added(subject, new_chapter)
+    if save_patches_to_storage(app_data, [patches.append_chapter(subject, new_chapter)]):
         st.success(f"Chapter '{chapter_name}' added to {subject} and saved.")
         st.rerun()
     else:
         st.error("Failed to save chapter online. Reverting local change.")
-        app_data['subject_chapters_data'][subject].pop() # Revert
-
-def delete_chapter(subject: str, chapter_index: int):
-    app_data = get_app_data()
+        chapters_list.pop() # Revert
+        _on_chapter_deleted(subject, new_chapter)
+
+def import_records(result: ImportResult):
+    """Adds every validated chapter and todo of an import and saves them in one batch (one SQLite transaction
+    or one JSONBin write); on failure all of them are taken out again."""
+    app_data = get_writable_app_data()
+    subject_chapters = app_data['subject_chapters_data']
+    original_lengths = {subject: len(chapters) for subject, chapters in subject_chapters.items()}
+    original_todo_count = len(app_data['todo_data'])
+    import_patches = []
+    record_index = get_record_index()
+    for subject, chapter in result.chapters:
+        subject_chapters[subject].append(chapter)
+        _on_chapter_added(subject, chapter)
+        import_patches.append(patches.append_chapter(subject, chapter))
+    for todo in result.todos:
+        app_data['todo_data'].append(todo)
+        record_index.todo_added(todo)
+        import_patches.append(patches.append_todo(todo))
+    if save_patches_to_storage(app_data, import_patches):
+        st.session_state['bulk_import_nonce'] = st.session_state.get('bulk_import_nonce', 0) + 1 # Clears the uploader
+        st.session_state.pop('bulk_import_parsed', None)
+        st.success(f"Imported {len(result.chapters)} chapters and {len(result.todos)} tasks.")
+        st.rerun()
+    else:
+        st.error("Failed to save the import. Reverting local changes.")
+        for subject, length in original_lengths.items(): # Revert
+            del subject_chapters[subject][length:]
+        for subject, chapter in result.chapters:
+            _on_chapter_deleted(subject, chapter)
+        del app_data['todo_data'][original_todo_count:]
+        for todo in result.todos:
+            record_index.todo_removed(todo.uid)
+
+def display_bulk_import():
+    """Validates an uploaded CSV/JSON file once, lists the rows it rejects and imports the rest on request."""
+    st.download_button("Download CSV Template", data=IMPORT_TEMPLATE_CSV, file_name="import_template.csv",
+                       mime="text/csv", key="import_template_btn")
+    uploaded = st.file_uploader("Chapters and tasks (CSV or JSON):", type=IMPORT_FILE_TYPES,
+                                key=f"bulk_import_file_{st.session_state.get('bulk_import_nonce', 0)}")
+    if uploaded is None:
+        st.session_state.pop('bulk_import_parsed', None)
+        return
+    parsed = st.session_state.get('bulk_import_parsed')
+    if parsed is None or parsed[0] != (uploaded.file_id, get_data_revision()):
+        existing = {(subject, chapter.chapter_name.lower()) for subject, chapters in get_subject_chapters_data().items()
+                    for chapter in chapters if isinstance(chapter.chapter_name, str)}
+        try:
+            result = load_import(uploaded.getvalue(), uploaded.name, SUBJECT_CHOICES, _default_schedule(), existing)
+        except ValueError as e:
+            st.error(f"Could not read {uploaded.name}: {e}")
+            return
+        parsed = st.session_state['bulk_import_parsed'] = ((uploaded.file_id, get_data_revision()), result)
+    result = parsed[1]
+    st.caption(f"{len(result.chapters)} chapters and {len(result.todos)} tasks ready; {len(result.errors)} rows rejected.")
+    if result.errors:
+        shown = result.errors[:IMPORT_CONFIG['errors_shown']]
+        st.dataframe(pd.DataFrame(shown, columns=["Row", "Problem"]), hide_index=True, use_container_width=True)
+        if len(result.errors) > len(shown):
+            st.caption(f"... and {len(result.errors) - len(shown)} more.")
+    if result.rows_ok and st.button(f"Import {result.rows_ok} rows", key="bulk_import_btn"):
+        import_records(result)
+
+def delete_chapter(subject: str, chapter_uid: str):
+    app_data = get_writable_app_data()
     chapters_list = app_data['subject_chapters_data'][subject]
-    if 0 <= chapter_index < len(chapters_list):
-        chapter_name = chapters_list[chapter_index].get('chapter_name', 'this chapter')
-        original_chapter_data = copy.deepcopy(chapters_list[chapter_index]) # For revert
-        del chapters_list[chapter_index]
-        if save_data_to_jsonbin(app_data):
+    removed_chapter = get_record_index().chapter(chapter_uid) # Kept for revert
+    if removed_chapter is not None:
+        chapter_name = removed_chapter.chapter_name or 'this chapter'
+        chapter_position = records.remove_by_identity(chapters_list, removed_chapter)
+        _on_chapter_deleted(subject, removed_chapter)
+        if save_patches_to_storage(app_data, [patches.delete_chapter(subject, chapter_uid)]):
             st.success(f"Chapter '{chapter_name}' deleted successfully!")
             st.rerun()
         else:
             st.error("Failed to save deletion online. Reverting local change.")
-            chapters_list.insert(chapter_index, original_chapter_data) # Revert
+            chapters_list.insert(chapter_position, removed_chapter) # Revert
+            _on_chapter_added(subject, removed_chapter)
     else:
-        st.error("Invalid chapter index for deletion.")
-
-def update_reminder_statuses(subject: str, chapter_index: int, updated_statuses: List[bool]):
-    """Updates multiple reminder statuses and saves once."""
-    app_data = get_app_data()
-    chapter = app_data['subject_chapters_data'][subject][chapter_index]
-    original_reminders = copy.deepcopy(chapter['reminders'])
-    changed = False
-    for i, new_status_is_revised in enumerate(updated_statuses):
-        current_status = chapter['reminders'][i]['status']
-        target_status = "Revised" if new_status_is_revised else "Pending"
-        if current_status != target_status:
-            chapter['reminders'][i]['status'] = target_status
-            changed = True
+        st.error("Chapter not found for deletion.")
+
+def update_reminder_statuses(subject: str, chapter_uid: str, updated_statuses: Dict[int, bool]):
+    """Updates multiple reminder statuses (keyed by ``reminder_id``) and saves once."""
+    app_data = get_writable_app_data()
+    chapter = get_record_index().chapter(chapter_uid)
+    targets = [(subject, chapter, records.find_reminder(chapter, reminder_id),
+                ReminderStatus.REVISED if new_status_is_revised else ReminderStatus.PENDING)
+               for reminder_id, new_status_is_revised in updated_statuses.items()]
+    status_patches, revert = apply_reminder_statuses(targets)
     
-    if changed:
-        if save_data_to_jsonbin(app_data):
+    if status_patches:
+        if save_patches_to_storage(app_data, status_patches):
             st.success("Reminder statuses updated successfully.")
             st.rerun()
         else:
             st.error("Failed to save reminder status updates. Reverting local changes.")
-            chapter['reminders'] = original_reminders # Revert
+            revert()
     else:
         st.info("No changes in reminder statuses to save.")
 
-
+def apply_reminder_statuses(targets: List[Tuple[str, Chapter, Reminder, ReminderStatus]]) -> Tuple[List[Dict[str, Any]], Callable[[], None]]:
+    """Sets each ``(subject, chapter, reminder, status)``, then lets every touched chapter's scheduler add its
+    next reminder (or withdraw one whose predecessor is pending again). Returns the patches to save and a
+    function that undoes everything if the save fails."""
+    revised_at = datetime.datetime.now()
+    status_patches = []
+    changes = [] # (subject, reminder, original_status, original_revised_at) for revert
+    touched: Dict[str, Tuple[str, Chapter]] = {} # chapter uid -> (subject, chapter)
+    for subject, chapter, reminder, target_status in targets:
+        if reminder is None or reminder.status == target_status:
+            continue
+        changes.append((subject, reminder, reminder.status, reminder.revised_at))
+        _set_reminder_status(subject, reminder, target_status, revised_at)
+        status_patches.append(patches.set_reminder_status(subject, chapter.uid, reminder.reminder_id, target_status, reminder.revised_at))
+        touched[chapter.uid] = (subject, chapter)
+
+    structure = [] # (subject, chapter, original_reminders, added, removed) for revert
+    for chapter_uid, (subject, chapter) in touched.items():
+        original_reminders = list(chapter.reminders)
+        added, removed = scheduling.sync_chapter(chapter)
+        for reminder in removed:
+            _on_reminder_removed(subject, reminder)
+            status_patches.append(patches.delete_reminder(subject, chapter_uid, reminder.reminder_id))
+        for reminder in added:
+            _on_reminder_added(subject, chapter, reminder)
+            status_patches.append(patches.append_reminder(subject, chapter_uid, reminder))
+        if added or removed:
+            structure.append((subject, chapter, original_reminders, added, removed))
+
+    def revert():
+        for subject, chapter, original_reminders, added, removed in structure:
+            for reminder in added:
+                _on_reminder_removed(subject, reminder)
+            chapter.reminders[:] = original_reminders
+            for reminder in removed:
+                _on_reminder_added(subject, chapter, reminder)
+        for subject, reminder, original_status, original_revised_at in changes:
+            _set_reminder_status(subject, reminder, original_status, original_revised_at)
+    return status_patches, revert
+
+
+@_profiled("aggregate.subject_progress")
 def calculate_subject_progress(subject: str) -> float:
-    chapters = get_subject_chapters_data().get(subject, [])
-    total, revised = 0, 0
-    for ch in chapters:
-        reminders = ch.get("reminders", [])
-        total += len(reminders)
-        revised += sum(1 for rem in reminders if rem.get("status") == "Revised")
-    return (revised / total) * 100 if total else 0
-
-def display_reminders_section(subject: str, chapter: Dict, chapter_index: int):
-    reminders = chapter.get("reminders", [])
+    return cached_by_revision(("subject_progress",),
+                              lambda: get_reminder_table().subject_progress(get_archive_summary()["subjects"])).get(subject, 0)
+
+def _fragment_chapter(chapter_uid: str) -> Optional[Chapter]:
+    """The chapter a fragment shows, looked up on every (fragment) rerun: a fragment rerun reuses the arguments
+    of the last full run, and the session's first edit replaces the document with its own copy."""
+    chapter = get_record_index().chapter(chapter_uid)
+    if chapter is None:
+        st.caption("This chapter no longer exists.")
+    return chapter
+
+@st.fragment
+@_profiled("fragment[reminders]")
+def display_reminders_section(subject: str, chapter_uid: str):
+    chapter = _fragment_chapter(chapter_uid)
+    if chapter is None:
+        return
+    reminders = chapter.reminders
     if not reminders:
         st.caption("No reminders found for this chapter.")
         return
 
-    with st.form(key=f"form_reminders_{subject}_{chapter_index}"):
+    with st.form(key=f"form_reminders_{chapter_uid}"):
         st.subheader("Manage Reminders")
         rem_list_display = []
-        # Store current status for checkboxes
-        current_statuses = [rem.get("status") == "Revised" for rem in reminders]
-        updated_statuses_values = []
+        updated_statuses_values = {} # reminder_id -> new "is revised" state
 
-        for i, reminder in enumerate(reminders):
-            # Use unique key for each checkbox inside the form
+        for reminder in reminders:
+            # Keyed by durable IDs, so widget state survives edits to other chapters
             status_is_revised = st.checkbox(
-                f"{reminder.get('type', 'Unknown')} @ {reminder.get('time', 'N/A').strftime('%d/%m %I:%M%p') if isinstance(reminder.get('time'), datetime.datetime) else 'N/A'}",
-                value=current_statuses[i],
-                key=f"rem_cb_{subject}_{chapter_index}_{i}_form"
+                f"{reminder.type or 'Unknown'} @ {reminder.time.strftime('%d/%m %I:%M%p') if isinstance(reminder.time, datetime.datetime) else 'N/A'}",
+                value=reminder.status == ReminderStatus.REVISED,
+                key=f"rem_cb_{chapter_uid}_{reminder.reminder_id}_form"
             )
-            updated_statuses_values.append(status_is_revised)
+            updated_statuses_values[reminder.reminder_id] = status_is_revised
             rem_list_display.append({
-                "Reminder Type": reminder.get("type", "N/A"),
-                "Reminder Time": reminder.get("time", "N/A").strftime("%d/%m/%y %I:%M %p") if isinstance(reminder.get('time'), datetime.datetime) else 'N/A',
+                "Reminder Type": str(reminder.type or "N/A"),
+                "Reminder Time": reminder.time.strftime("%d/%m/%y %I:%M %p") if isinstance(reminder.time, datetime.datetime) else 'N/A',
                 "Status": "Revised" if status_is_revised else "Pending" # Show potential new status
             })
         
+        scheduler = scheduling.scheduler_for(chapter)
+        if scheduler is not None:
+            st.caption(f"{scheduler.label} schedule: the next reminder is added when the last one is revised."
+                       + (f" The chapter is archived once the interval reaches {scheduler.max_interval_days} days."
+                          if isinstance(scheduler, scheduling.Sm2Scheduler) else ""))
         if st.form_submit_button("Update Reminder Statuses"):
-            update_reminder_statuses(subject, chapter_index, updated_statuses_values)
+            update_reminder_statuses(subject, chapter_uid, updated_statuses_values)
             # Rerun is handled by update_reminder_statuses on success
 
     # Display current state (or what it would be post-submit)
@@ -494,72 +1340,75 @@ def display_reminders_section(subject: str, chapter: Dict, chapter_index: int):
         st.markdown("</div>", unsafe_allow_html=True)
 
 
-def display_time_spent_section(subject: str, chapter: Dict, chapter_index: int):
-    current_time_spent = chapter.get("time_spent", 0)
+@st.fragment
+@_profiled("fragment[time_spent]")
+def display_time_spent_section(subject: str, chapter_uid: str):
+    chapter = _fragment_chapter(chapter_uid)
+    if chapter is None:
+        return
+    current_time_spent = chapter.time_spent
     
-    with st.form(key=f"time_spent_form_{subject}_{chapter_index}"):
+    with st.form(key=f"time_spent_form_{chapter_uid}"):
         time_spent_input = st.number_input(
             "Time Spent Studying (minutes):",
             value=current_time_spent,
             min_value=0,
             step=5,
-            key=f"time_spent_input_{subject}_{chapter_index}"
+            key=f"time_spent_input_{chapter_uid}"
         )
         submitted = st.form_submit_button("Update Time Spent")
 
     if submitted and time_spent_input != current_time_spent:
-        app_data = get_app_data()
-        # Access chapter directly from app_data to ensure we modify the session state version
-        chapter_to_update = app_data['subject_chapters_data'][subject][chapter_index]
-        original_time = chapter_to_update.get("time_spent", 0)
-        chapter_to_update["time_spent"] = time_spent_input
-        if save_data_to_jsonbin(app_data):
+        app_data = get_writable_app_data()
+        chapter_to_update = get_record_index().chapter(chapter_uid) # The live record in app_data
+        original_time = chapter_to_update.time_spent
+        chapter_to_update.time_spent = time_spent_input
+        if save_patches_to_storage(app_data, [patches.set_chapter_fields(subject, chapter_uid, {"time_spent": time_spent_input})]):
             st.success("Time spent updated successfully!")
-            st.rerun()
+            _rerun_fragment()
         else:
             st.error("Failed to save time spent online. Reverting.")
-            chapter_to_update["time_spent"] = original_time # Revert
+            chapter_to_update.time_spent = original_time # Revert
     elif submitted:
         st.info("No change in time spent.")
 
 
-def display_exam_tracking_section(subject: str, chapter: Dict, chapter_index: int):
+@st.fragment
+@_profiled("fragment[exam_tracking]")
+def display_exam_tracking_section(subject: str, chapter_uid: str):
+    chapter = _fragment_chapter(chapter_uid)
+    if chapter is None:
+        return
     st.subheader(f"Exam Tracking")
-    current_exam_appeared = chapter.get("exams_appeared", 0)
-    current_exam_status = chapter.get("exam_status", "Not Appeared")
+    current_exam_appeared = chapter.exams_appeared
+    current_exam_status = chapter.exam_status
 
-    with st.form(key=f"exam_tracking_form_{subject}_{chapter_index}"):
-        exam_appeared = st.number_input("Exams Appeared:", min_value=0, value=current_exam_appeared)
-        exam_status_text = st.text_input("Exam Status:", value=current_exam_status, placeholder="e.g., Score, Performance")
+    with st.form(key=f"exam_tracking_form_{chapter_uid}"):
+        exam_appeared = st.number_input("Exams Appeared:", min_value=0, value=current_exam_appeared, key=f"exam_appeared_{chapter_uid}")
+        exam_status_text = st.text_input("Exam Status:", value=current_exam_status, placeholder="e.g., Score, Performance", key=f"exam_status_{chapter_uid}")
         submitted = st.form_submit_button("Update Exam Info")
 
     if submitted:
         if exam_appeared != current_exam_appeared or exam_status_text != current_exam_status:
-            app_data = get_app_data()
-            chapter_to_update = app_data['subject_chapters_data'][subject][chapter_index]
+            app_data = get_writable_app_data()
+            chapter_to_update = get_record_index().chapter(chapter_uid)
             # Store originals for revert
-            original_appeared = chapter_to_update["exams_appeared"]
-            original_status = chapter_to_update["exam_status"]
+            original_appeared = chapter_to_update.exams_appeared
+            original_status = chapter_to_update.exam_status
 
-            chapter_to_update["exams_appeared"] = exam_appeared
-            chapter_to_update["exam_status"] = exam_status_text
-            if save_data_to_jsonbin(app_data):
+            chapter_to_update.exams_appeared = exam_appeared
+            chapter_to_update.exam_status = exam_status_text
+            exam_patch = patches.set_chapter_fields(subject, chapter_uid, {"exams_appeared": exam_appeared, "exam_status": exam_status_text})
+            if save_patches_to_storage(app_data, [exam_patch]):
                 st.success("Exam info updated!")
-                st.rerun()
+                _rerun_fragment()
             else:
                 st.error("Failed to save exam info online. Reverting.")
-                chapter_to_update["exams_appeared"] = original_appeared
-                chapter_to_update["exam_status"] = original_status
+                chapter_to_update.exams_appeared = original_appeared
+                chapter_to_update.exam_status = original_status
         else:
             st.info("No changes detected in exam info.")
 
-def _get_chapter_item(subject: str, chapter_name: str) -> Tuple[Optional[Dict], int]:
-    chapters_list = get_subject_chapters_data().get(subject, [])
-    for idx, chapter in enumerate(chapters_list):
-        if chapter.get("chapter_name") == chapter_name:
-            return chapter, idx
-    return None, -1
-
 def display_subject_tab_content(subject: str):
     st.subheader(f"{subject} Revision Progress")
     progress = calculate_subject_progress(subject)
@@ -567,99 +1416,223 @@ def display_subject_tab_content(subject: str):
     st.write(f"Overall Revision: {progress:.2f}%")
 
     chapters_list = get_subject_chapters_data().get(subject, [])
-    chapter_names = [ch.get("chapter_name", f"Unnamed Chapter {i}") for i, ch in enumerate(chapters_list)]
+    chapter_names = {ch.uid: ch.chapter_name or f"Unnamed Chapter {i}" for i, ch in enumerate(chapters_list)}
     
     if not chapter_names:
         st.info(f"No chapters in {subject}. Please add one from the sidebar.")
         return
 
-    selected_chapter_name = st.selectbox(f"Select {subject} Chapter:", ["Select Chapter"] + chapter_names, index=0, key=f"select_{subject}")
-    if selected_chapter_name != "Select Chapter":
-        chapter_data, chapter_idx = _get_chapter_item(subject, selected_chapter_name)
-        if chapter_data is not None and chapter_idx != -1:
-            # Pass a copy to display functions if they don't modify, or ensure they get from session_state
-            display_reminders_section(subject, chapter_data, chapter_idx)
+    # Options are chapter uids, so two chapters with the same name stay distinct
+    selected_chapter_uid = st.selectbox(f"Select {subject} Chapter:", ["Select Chapter"] + list(chapter_names), index=0, key=f"select_{subject}",
+                                        format_func=lambda uid: chapter_names.get(uid, uid))
+    if selected_chapter_uid != "Select Chapter":
+        chapter_data = get_record_index().chapter(selected_chapter_uid)
+        if chapter_data is not None:
+            selected_chapter_name = chapter_names[selected_chapter_uid]
+            display_reminders_section(subject, selected_chapter_uid)
             st.markdown("<br>", unsafe_allow_html=True)
-            display_time_spent_section(subject, chapter_data, chapter_idx)
+            display_time_spent_section(subject, selected_chapter_uid)
             st.markdown("<br>", unsafe_allow_html=True)
-            display_exam_tracking_section(subject, chapter_data, chapter_idx)
+            display_exam_tracking_section(subject, selected_chapter_uid)
             st.markdown("<hr class='section-divider'>", unsafe_allow_html=True)
             
             st.markdown("### Delete Chapter", unsafe_allow_html=True)
-            confirm_delete = st.checkbox("Confirm deletion", key=f"confirm_delete_{subject}_{chapter_idx}", help=f"Tick this box to enable deletion of '{selected_chapter_name}'.")
-            if st.button("Delete Chapter Permanently", key=f"delete_{subject}_{chapter_idx}", disabled=not confirm_delete, type="primary"):
-                delete_chapter(subject, chapter_idx)
+            confirm_delete = st.checkbox("Confirm deletion", key=f"confirm_delete_{selected_chapter_uid}", help=f"Tick this box to enable deletion of '{selected_chapter_name}'.")
+            if st.button("Delete Chapter Permanently", key=f"delete_{selected_chapter_uid}", disabled=not confirm_delete, type="primary"):
+                delete_chapter(subject, selected_chapter_uid)
         else:
-             st.warning(f"Could not find details for chapter: {selected_chapter_name}")
-
-def get_revisions_for_date(target_date: datetime.date) -> List[Tuple[str, int, Dict, int, Dict]]:
-    """Fetches all revision entries for a specific date."""
-    revision_entries = []
-    subject_data = get_subject_chapters_data()
-    for subj, chapters in subject_data.items():
-        for c_idx, chapter in enumerate(chapters):
-            for r_idx, reminder in enumerate(chapter.get("reminders", [])):
-                reminder_time_obj = reminder.get("time")
-                if isinstance(reminder_time_obj, datetime.datetime) and reminder_time_obj.date() == target_date:
-                    revision_entries.append((subj, c_idx, chapter, r_idx, reminder))
-    return revision_entries
-
-def display_revision_entries_list(revision_entries: List[Tuple[str, int, Dict, int, Dict]], list_key_prefix: str):
-    """Displays a list of revision entries with interactive checkboxes."""
-    if not revision_entries:
+             st.warning(f"Could not find details for the selected chapter.")
+
+# ---------------------------- PAGED LISTS ----------------------------
+# Long lists render one page of rows inside their form. Edits made on a page are staged in session
+# state whenever the form is submitted (page buttons included), so a save covers every page.
+def _reset_page(list_key: str):
+    st.session_state[f"{list_key}_page"] = 0
+
+def _display_status_filter(list_key: str, counts: Dict[str, int], statuses: List[str]) -> Optional[str]:
+    """Status filter labelled with the index counts; returns the chosen status, or None for all."""
+    total = sum(counts.values())
+    choice = st.radio("Show", ["All"] + statuses, horizontal=True, key=f"{list_key}_filter",
+                      format_func=lambda option: f"{option} ({total if option == 'All' else counts.get(option, 0)})",
+                      on_change=_reset_page, args=(list_key,))
+    return None if choice == "All" else choice
+
+def _display_page_size_select(list_key: str):
+    options = LIST_PAGE_CONFIG["page_size_options"]
+    st.selectbox("Per page", options, index=options.index(LIST_PAGE_CONFIG["default_page_size"]),
+                 key=f"{list_key}_page_size", on_change=_reset_page, args=(list_key,))
+
+def _page_window(list_key: str, total: int) -> Tuple[int, int]:
+    """Clamps the list's page to ``total`` rows and returns the page's [start, end) row range."""
+    page_size = st.session_state.get(f"{list_key}_page_size", LIST_PAGE_CONFIG["default_page_size"])
+    page_count = max(1, -(-total // page_size))
+    page = min(st.session_state.get(f"{list_key}_page", 0), page_count - 1)
+    st.session_state[f"{list_key}_page"] = page
+    return page * page_size, min((page + 1) * page_size, total)
+
+def _display_page_nav(start: int, end: int, total: int) -> int:
+    """Previous / Next submit buttons for a paged form; returns the page step requested (0 for none)."""
+    col_prev, col_info, col_next = st.columns([0.25, 0.5, 0.25])
+    submitted_prev = col_prev.form_submit_button("◀ Previous", disabled=start == 0)
+    col_info.caption(f"Showing {start + 1}–{end} of {total}" if total else "Nothing to show")
+    submitted_next = col_next.form_submit_button("Next ▶", disabled=end >= total)
+    return -1 if submitted_prev else 1 if submitted_next else 0
+
+def _staged_edits(list_key: str, kind: str = "status") -> Dict:
+    return st.session_state.setdefault(f"{list_key}_staged_{kind}", {})
+
+def _stage_edit(staged: Dict, row_key: Any, new_value: Any, stored_value: Any):
+    if new_value == stored_value:
+        staged.pop(row_key, None)
+    else:
+        staged[row_key] = new_value
+
+def _discard_staged(list_key: str):
+    """Drops the staged edits and the row widgets' state, so rows show the stored values again."""
+    for key in [k for k in st.session_state if k.startswith((f"{list_key}_staged_", f"{list_key}_cb_", f"{list_key}_del_"))]:
+        del st.session_state[key]
+
+@_profiled("aggregate.revisions_for_date")
+def get_revisions_for_date(target_date: datetime.date) -> List[Tuple[str, Chapter, Reminder]]:
+    """Fetches all revision entries for a specific date from the date index."""
+    return get_reminder_index().entries_for_date(target_date)
+
+@_profiled("aggregate.status_counts")
+def get_status_counts(target_date: datetime.date) -> Dict[str, int]:
+    """Revised/Pending counts of the revisions due on ``target_date``."""
+    return cached_by_revision(("status_counts", target_date), lambda: get_reminder_index().status_counts(target_date))
+
+def display_revision_entries_list(target_date: datetime.date, list_key_prefix: str):
+    """Displays one page of the revisions due on ``target_date`` with interactive checkboxes.
+    Ticks are staged across pages and saved together."""
+    index = get_reminder_index()
+    if index.count_for_date(target_date) == 0:
         st.info(f"No revisions scheduled.")
         return
+    if st.session_state.get(f"{list_key_prefix}_date") != target_date: # Staged ticks belong to one date
+        _discard_staged(list_key_prefix)
+        _reset_page(list_key_prefix)
+        st.session_state[f"{list_key_prefix}_date"] = target_date
+
+    status_counts = get_status_counts(target_date)
+    col_filter, col_size = st.columns([0.7, 0.3])
+    with col_filter:
+        status_filter = _display_status_filter(list_key_prefix, status_counts, ["Pending", "Revised"])
+    with col_size:
+        _display_page_size_select(list_key_prefix)
+    revision_entries = get_revisions_for_date(target_date)
+    if status_filter is not None:
+        revision_entries = [entry for entry in revision_entries if entry[2].status == status_filter]
+    start, end = _page_window(list_key_prefix, len(revision_entries))
+    staged = _staged_edits(list_key_prefix) # (chapter uid, reminder_id) -> new "is revised" state
 
     # Use a form to batch updates for these checkboxes too
     with st.form(key=f"form_{list_key_prefix}_revisions"):
-        checkbox_states = {} # To store the new state of checkboxes
-        for idx, (subj, c_idx, chapter, r_idx, reminder) in enumerate(revision_entries):
+        checkbox_states = [] # (row key, stored "is revised" state, new "is revised" state)
+        for subj, chapter, reminder in revision_entries[start:end]:
+            row_key = (chapter.uid, reminder.reminder_id)
             col1, col2 = st.columns([0.85, 0.15])
             with col1:
                 st.markdown(
                     f"<div class='container-box' style='margin-bottom: 2px;'>"
-                    f"<strong>{subj}</strong> | {chapter.get('chapter_name','N/A')} | {reminder.get('type','N/A')} at "
-                    f"{reminder.get('time','N/A').strftime('%I:%M %p') if isinstance(reminder.get('time'),datetime.datetime) else 'N/A'}"
+                    f"<strong>{subj}</strong> | {chapter.chapter_name or 'N/A'} | {reminder.type or 'N/A'} at "
+                    f"{reminder.time.strftime('%I:%M %p') if isinstance(reminder.time, datetime.datetime) else 'N/A'}"
                     f"</div>", unsafe_allow_html=True)
             with col2:
-                key = f"{list_key_prefix}_cb_{subj}_{c_idx}_{r_idx}_{idx}"
-                current_is_revised = reminder.get("status") == "Revised"
-                new_is_revised = st.checkbox("Done", value=current_is_revised, key=key, label_visibility="collapsed")
-                checkbox_states[(subj, c_idx, r_idx)] = new_is_revised
+                key = f"{list_key_prefix}_cb_{row_key[0]}_{row_key[1]}"
+                current_is_revised = reminder.status == ReminderStatus.REVISED
+                new_is_revised = st.checkbox("Done", value=staged.get(row_key, current_is_revised), key=key, label_visibility="collapsed")
+                checkbox_states.append((row_key, current_is_revised, new_is_revised))
             st.markdown("<div style='height: 8px;'></div>", unsafe_allow_html=True)
 
-        if st.form_submit_button("Update All Displayed Revision Statuses"):
-            app_data = get_app_data()
-            original_app_data_copy = copy.deepcopy(app_data) # For potential full revert
-            any_change_attempted = False
-
-            for (subj, c_idx, r_idx), new_is_revised in checkbox_states.items():
-                try:
-                    reminder_to_update = app_data['subject_chapters_data'][subj][c_idx]['reminders'][r_idx]
-                    current_status = reminder_to_update['status']
-                    target_status = "Revised" if new_is_revised else "Pending"
-                    if current_status != target_status:
-                        reminder_to_update['status'] = target_status
-                        any_change_attempted = True
-                except (KeyError, IndexError):
-                    st.error(f"Error accessing reminder for {subj} - Chapter {c_idx} - Reminder {r_idx}. Skipping.")
-                    continue
-            
-            if any_change_attempted:
-                if save_data_to_jsonbin(app_data):
-                    st.success("Revision statuses updated.")
-                    st.rerun()
-                else:
-                    st.error("Failed to save revision status updates. Reverting local changes.")
-                    st.session_state['app_data'] = original_app_data_copy # Revert all changes
-                    st.rerun() # Rerun to show reverted state
+        page_step = _display_page_nav(start, end, len(revision_entries))
+        if staged:
+            st.caption(f"{len(staged)} unsaved change(s) across pages.")
+        col_save, col_discard = st.columns(2)
+        submitted_save = col_save.form_submit_button("Update Revision Statuses")
+        submitted_discard = col_discard.form_submit_button("Discard Changes", disabled=not staged)
+
+    if submitted_discard:
+        _discard_staged(list_key_prefix)
+        st.rerun()
+    if page_step or submitted_save:
+        for row_key, current_is_revised, new_is_revised in checkbox_states:
+            _stage_edit(staged, row_key, new_is_revised, current_is_revised)
+    if page_step:
+        st.session_state[f"{list_key_prefix}_page"] += page_step
+        st.rerun()
+
+    if submitted_save:
+        app_data = get_writable_app_data()
+        record_index = get_record_index()
+        # A chapter or reminder deleted since the tick was staged is skipped
+        targets = [(record_index.chapter_subject(chapter_uid), record_index.chapter(chapter_uid), record_index.reminder(chapter_uid, reminder_id),
+                    ReminderStatus.REVISED if new_is_revised else ReminderStatus.PENDING)
+                   for (chapter_uid, reminder_id), new_is_revised in staged.items()]
+        status_patches, revert = apply_reminder_statuses(targets)
+        
+        if status_patches:
+            if save_patches_to_storage(app_data, status_patches):
+                staged.clear()
+                st.success("Revision statuses updated.")
+                st.rerun()
             else:
-                st.info("No changes in revision statuses to save.")
+                st.error("Failed to save revision status updates. Reverting local changes.")
+                revert()
+                st.rerun() # Rerun to show reverted state
+        else:
+            staged.clear()
+            st.info("No changes in revision statuses to save.")
+
 
+# ---------------------------- PROFILER PANEL ----------------------------
+def set_profiling_enabled(enabled: bool):
+    st.session_state['profiling_enabled'] = enabled
+    if not enabled:
+        st.session_state.pop('profiler', None) # History is dropped with the profiler
+
+def display_profiler_panel(profiler: profiling.Profiler):
+    """Breakdown of the last completed rerun, the rolling history and the exports."""
+    last_run = profiler.last_run
+    if last_run is None:
+        st.caption("Timings appear here after the first profiled rerun.")
+        return
+    st.caption(f"Last {last_run.label}: **{last_run.duration_ms:.1f} ms**"
+               + (" (interrupted by a rerun)" if last_run.interrupted else "") + f" · {len(profiler.runs)} run(s) kept")
+    df_breakdown = pd.DataFrame(profiler.breakdown(last_run))
+    df_breakdown["Span"] = ["  " * depth + name for depth, name in zip(df_breakdown["depth"], df_breakdown["span"])]
+    st.dataframe(pd.DataFrame({"Span": df_breakdown["Span"], "Calls": df_breakdown["calls"],
+                               "ms": df_breakdown["total_ms"].round(2), "% of run": (df_breakdown["share"] * 100).round(1)}),
+                 hide_index=True, use_container_width=True)
+
+    st.markdown("**History**")
+    st.line_chart(pd.DataFrame({"Rerun (ms)": [run.duration_ms for run in profiler.runs]}), height=150)
+    df_history = pd.DataFrame(profiler.history_stats())
+    st.dataframe(pd.DataFrame({"Span": df_history["span"], "Runs": df_history["runs"],
+                               "Mean ms": df_history["mean_ms"].round(2), "Max ms": df_history["max_ms"].round(2)}),
+                 hide_index=True, use_container_width=True)
+
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    col_json, col_trace = st.columns(2)
+    col_json.download_button("Timings (JSON)", data=json.dumps(profiler.to_json(), indent=2),
+                             file_name=f"profile_{stamp}.json", mime="application/json", key="download_profile_json_btn")
+    col_trace.download_button("Chrome trace", data=json.dumps(profiler.to_chrome_trace()),
+                              file_name=f"trace_{stamp}.json", mime="application/json", key="download_profile_trace_btn",
+                              help="Open in chrome://tracing or ui.perfetto.dev")
+    if st.button("Clear History", key="clear_profile_btn"):
+        profiler.clear()
+        st.rerun()
 
 # ---------------------------- SIDEBAR ----------------------------
-with st.sidebar:
+with st.sidebar, _span("sidebar"):
     st.title("📚 NEET Prep App")
+    if get_user() is not None:
+        col_user, col_logout = st.columns([0.6, 0.4])
+        col_user.caption(f"👤 {get_user()}")
+        if col_logout.button("Log out", key="logout_btn"):
+            log_out()
+    if is_write_behind_enabled():
+        display_write_behind_status()
     with st.expander("App Theme", expanded=False):
         current_theme = st.session_state.get('app_theme', "Light Mode")
         selected_theme = st.selectbox("Choose Theme:", THEME_OPTIONS, index=THEME_OPTIONS.index(current_theme), key="theme_select")
@@ -676,33 +1649,59 @@ with st.sidebar:
             entry_time_form = st.time_input("Entry Time:", value=datetime.datetime.now().time().replace(second=0, microsecond=0), key="add_time_form")
             
             st.markdown("<hr class='section-divider'>", unsafe_allow_html=True)
-            st.caption("Revision Schedule (Default: 12hr, 3 day, 5 day)")
-            use_12hr_form = st.checkbox("12 hour Reminder", value=True, key="add_cb_12hr_form")
-            use_3day_form = st.checkbox("3 days Reminder", value=True, key="add_cb_3day_form")
-            use_5day_form = st.checkbox("5 days Reminder", value=True, key="add_cb_5day_form")
+            scheduler_names = list(scheduling.SCHEDULERS)
+            scheduler_form = st.selectbox("Revision Schedule:", scheduler_names, index=scheduler_names.index(SCHEDULER_CONFIG['default']),
+                                          format_func=lambda name: scheduling.SCHEDULERS[name].label, key="add_scheduler_form",
+                                          help="Each reminder is created when the previous one is revised. "
+                                               "Adaptive intervals grow with on-time revisions and shrink with late ones.")
+            st.caption("Fixed intervals (for the fixed schedule; none ticked means all)")
+            fixed_hours_form = [hours for hours in SCHEDULER_CONFIG['fixed_intervals_hours']
+                                if st.checkbox(scheduling.interval_label(hours), value=True, key=f"add_cb_{hours}h_form")]
             
             submitted_add_chapter = st.form_submit_button("Add Chapter")
 
             if submitted_add_chapter:
                 if chapter_name_form and subject_form:
                     entry_datetime = datetime.datetime.combine(entry_date_form, entry_time_form)
-                    custom_reminders = []
-                    rid_counter = 1
-                    if use_12hr_form:
-                        custom_reminders.append({"reminder_id": rid_counter, "type": "12 hour Reminder", "time": entry_datetime + datetime.timedelta(hours=12), "status": "Pending"}); rid_counter+=1
-                    if use_3day_form:
-                        custom_reminders.append({"reminder_id": rid_counter, "type": "3 days Reminder", "time": entry_datetime + datetime.timedelta(days=3), "status": "Pending"}); rid_counter+=1
-                    if use_5day_form:
-                        custom_reminders.append({"reminder_id": rid_counter, "type": "5 days Reminder", "time": entry_datetime + datetime.timedelta(days=5), "status": "Pending"}); rid_counter+=1
+                    if scheduler_form == scheduling.FixedIntervalScheduler.name:
+                        scheduler = scheduling.FixedIntervalScheduler(fixed_hours_form or SCHEDULER_CONFIG['fixed_intervals_hours'])
+                    else:
+                        scheduler = scheduling.SCHEDULERS[scheduler_form]()
                     
-                    add_chapter_and_reminders(subject_form, chapter_name_form, entry_datetime, custom_reminders)
+                    add_chapter_and_reminders(subject_form, chapter_name_form, entry_datetime, scheduler.to_schedule())
                     # Rerun is handled by add_chapter_and_reminders on success
                 else:
                     st.warning("Please enter a chapter name and select a subject.")
 
+    with st.expander("Bulk Import", expanded=False):
+        display_bulk_import()
+
     with st.expander("Data Options", expanded=False):
+        if OFFLINE_FIRST:
+            st.caption("Changes are saved on this device at once and synced in the background, also after a restart.")
+        elif STORAGE_CONFIGURED:
+            write_behind_choice = st.checkbox("Save changes in the background", value=st.session_state['write_behind_enabled'],
+                                              key="write_behind_cb", help="Edits apply instantly and are saved a few seconds later in one batch.")
+            if write_behind_choice != st.session_state['write_behind_enabled'] and set_write_behind_enabled(write_behind_choice):
+                st.rerun()
+        profiling_choice = st.checkbox("Profile reruns", value=st.session_state['profiling_enabled'], key="profiling_cb",
+                                       help="Times loading, saving, aggregates, charts and each view; shown in a Profiler panel.")
+        if profiling_choice != st.session_state['profiling_enabled']:
+            set_profiling_enabled(profiling_choice)
+            st.rerun()
+        st.session_state['light_charts_enabled'] = st.checkbox(
+            "Lightweight charts", value=st.session_state['light_charts_enabled'], key="light_charts_cb",
+            help="Draws charts with Vega-Lite instead of Plotly: faster on slow devices. Long trends always use it.")
         st.header("Download Data")
-        st.download_button(label="Download Study Data (CSV)", data=_prepare_csv_data(), file_name="neet_prep_data.csv", mime='text/csv', key="download_csv_btn")
+        display_data_export()
+        if has_archive():
+            summary = get_archive_summary()
+            st.caption(f"Archived: {archive.archived_chapter_count(summary)} chapter(s) and {summary.get('todos', 0)} task(s) "
+                       f"finished more than {get_archive_after_days()} days ago. Included in exports and All Time productivity.")
+
+    if get_profiler() is not None:
+        with st.expander("Profiler", expanded=True):
+            display_profiler_panel(get_profiler())
 
     st.header("Motivation")
     st.markdown(f"> *{random.choice(motivational_quotes)}*")
@@ -710,75 +1709,124 @@ with st.sidebar:
     with st.expander("See Study Tips", expanded=False):
         for tip in study_tips: st.markdown(f"- {tip}")
 
-# ---------------------------- APPLY THEME & MAIN PANEL ----------------------------
-st.markdown(get_app_css(st.session_state.app_theme), unsafe_allow_html=True)
-st.markdown("<div class='main-header'><h1>NEET Prep Tracker Dashboard</h1></div>", unsafe_allow_html=True)
-
-tab_titles = SUBJECT_CHOICES + ["Today's Revisions", "Productivity Tracking", "To Do List"]
-tabs = st.tabs(tab_titles)
-
-# ----- Subject Tabs -----
-for idx, subject_name in enumerate(SUBJECT_CHOICES):
-    with tabs[idx]:
-        st.header(subject_name)
-        tab_bg_color = TAB_HIGHLIGHT_COLOR_DARK if st.session_state.app_theme == "Dark Mode" else TAB_HIGHLIGHT_COLOR
-        st.markdown(f"<div style='background-color:{tab_bg_color}; padding: 15px; border-radius: 8px; border: 1px solid #ccc;'>", unsafe_allow_html=True)
-        display_subject_tab_content(subject_name)
-        st.markdown("</div>", unsafe_allow_html=True)
+# ---------------------------- MAIN PANEL VIEWS ----------------------------
+def display_subject_view(subject_name: str):
+    st.header(subject_name)
+    tab_bg_color = TAB_HIGHLIGHT_COLOR_DARK if st.session_state.app_theme == "Dark Mode" else TAB_HIGHLIGHT_COLOR
+    st.markdown(f"<div style='background-color:{tab_bg_color}; padding: 15px; border-radius: 8px; border: 1px solid #ccc;'>", unsafe_allow_html=True)
+    display_subject_tab_content(subject_name)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+@_profiled("aggregate.due_queue")
+def display_overdue_revisions():
+    """Pending revisions from earlier days, straight from the index's due queue."""
+    today = datetime.date.today()
+    end_of_yesterday = datetime.datetime.combine(today, datetime.time.min) - datetime.timedelta(microseconds=1)
+    overdue = cached_by_revision(("overdue", today), lambda: get_reminder_index().due(end_of_yesterday))
+    if not overdue:
+        return
+    limit = SCHEDULER_CONFIG['overdue_list_limit']
+    with st.expander(f"⚠️ Overdue revisions ({len(overdue)})", expanded=False):
+        for subj, chapter, reminder in overdue[:limit]:
+            st.markdown(f"- **{subj}** | {chapter.chapter_name or 'N/A'} | {reminder.type or 'N/A'} "
+                        f"(due {reminder.time.strftime('%d %b, %Y')})")
+        if len(overdue) > limit:
+            st.caption(f"Showing the {limit} oldest. Pick their date above to mark them revised.")
+        else:
+            st.caption("Pick their date above to mark them revised.")
 
-# ----- Today's Revisions Tab -----
-with tabs[len(SUBJECT_CHOICES)]:
+def display_todays_revisions_view():
     st.header("Today's Revisions")
     mode = st.radio("View Mode", ["Today", "Select Date"], index=0, horizontal=True, key="rev_view_mode")
     sel_date = datetime.date.today() if mode == "Today" else st.date_input("Select Date:", value=datetime.date.today(), key="rev_date_select")
     
+    display_overdue_revisions()
     st.info(f"Showing revisions for: {sel_date.strftime('%d %b, %Y')}")
-    todays_revision_entries = get_revisions_for_date(sel_date)
-    st.markdown(f"**Total revisions found: {len(todays_revision_entries)}**")
+    revision_count = get_reminder_index().count_for_date(sel_date)
+    st.markdown(f"**Total revisions found: {revision_count}**")
 
-    if todays_revision_entries:
-        status_counts = {"Revised": 0, "Pending": 0}
-        for _, _, _, _, reminder in todays_revision_entries:
-            status_counts[reminder.get("status", "Pending")] += 1
+    if revision_count:
+        status_counts = get_status_counts(sel_date)
         
         if sum(status_counts.values()) > 0:
-            df_status = pd.DataFrame(list(status_counts.items()), columns=["Status", "Count"])
-            df_status['Status'] = pd.Categorical(df_status['Status'], categories=["Revised", "Pending"], ordered=True)
-            fig_pie = px.pie(df_status, names="Status", values="Count", title="Revision Status Breakdown",
-                             color="Status", color_discrete_map={"Revised": COLOR_SUCCESS, "Pending": COLOR_WARNING})
-            fig_pie.update_traces(textinfo='percent+value')
-            st.plotly_chart(fig_pie, use_container_width=True)
+            display_status_pie("revision_status", status_counts, {"Revised": COLOR_SUCCESS, "Pending": COLOR_WARNING},
+                               "Revision Status Breakdown", textinfo='percent+value')
         st.markdown("---")
-        display_revision_entries_list(todays_revision_entries, "today_rev_tab")
+        display_revision_entries_list(sel_date, "today_rev_tab")
 
-# ----- Productivity Tracking Tab -----
-with tabs[len(SUBJECT_CHOICES) + 1]:
+def display_productivity_view():
     st.header("Productivity Tracking")
-    period = st.selectbox("Tracking Period:", ["Last 1 Week", "Last 1 Month", "All Time"], key="prod_period")
-    start_date_prod = None
+    col_period, col_granularity = st.columns([2, 1])
+    period = col_period.selectbox("Tracking Period:", ["Last 1 Week", "Last 1 Month", "All Time", "Custom Range"], key="prod_period")
+    granularity = col_granularity.selectbox("Group By:", GRANULARITIES, key="prod_granularity")
+    start_date_prod = end_date_prod = None
     if period == "Last 1 Week": start_date_prod = datetime.date.today() - datetime.timedelta(days=7)
     elif period == "Last 1 Month": start_date_prod = datetime.date.today() - datetime.timedelta(days=30)
-
-    agg_data = _aggregate_productivity_data(start_date_prod)
-    if agg_data:
-        df_prod = pd.DataFrame([
-            {"Date": d, "Total Reminders": stats["total"], "Revised": stats["revised"],
-             "Productivity (%)": (stats["revised"] / stats["total"] * 100) if stats["total"] else 0}
-            for d, stats in agg_data.items()
-        ]).sort_values("Date")
-        df_prod_display = df_prod.copy()
-        df_prod_display["Date"] = df_prod_display["Date"].apply(lambda d: d.strftime("%d/%m/%y"))
-        
-        fig_line = px.line(df_prod_display, x="Date", y="Productivity (%)", markers=True, title="Daily Productivity Trend")
-        st.plotly_chart(fig_line, use_container_width=True)
+    elif period == "Custom Range":
+        default_start = datetime.date.today() - datetime.timedelta(days=CHART_CONFIG["default_custom_range_days"])
+        picked = st.date_input("Date Range:", value=(default_start, datetime.date.today()), key="prod_range")
+        if len(picked) < 2:
+            st.info("Pick the last day of the range.")
+            return
+        start_date_prod, end_date_prod = picked
+    subjects = st.multiselect("Subjects:", SUBJECT_CHOICES, default=SUBJECT_CHOICES, key="prod_subjects")
+
+    series = get_period_series(start_date_prod, end_date_prod, granularity, subjects)
+    if len(series):
+        revised_in_period = int(series.revised.sum())
+        col_revised, col_pending = st.columns(2)
+        col_revised.metric("Revised in period", revised_in_period)
+        col_pending.metric("Pending in period", int(series.total.sum()) - revised_in_period)
+
+        df_prod_display = _productivity_chart_data(series)
+        display_productivity_trend(series, df_prod_display)
         st.dataframe(df_prod_display, use_container_width=True)
     else:
         st.info("No productivity data available for the selected period.")
 
-# ----- To Do List Tab -----
-with tabs[-1]:
+def display_heatmap_view():
+    st.header("Revision Heatmap")
+    subject = st.selectbox("Subject:", ["All Subjects"] + SUBJECT_CHOICES, key="heatmap_subject")
+    subjects = None if subject == "All Subjects" else [subject]
+    calendar = get_revision_calendar()
+    calendars = [calendar] + ([get_archive_calendar()] if archive_covers(calendar.first_day) else [])
+    inputs = (subject,) + tuple((each, each.version) for each in calendars)
+    daily = memoize_chart("revision_heatmap.daily", inputs, lambda: sum(each.daily(subjects) for each in calendars))
+
+    stats = revision_calendar.year_stats(daily, calendar.today_column)
+    col_total, col_days, col_streak = st.columns(3)
+    col_total.metric("Revisions in the last year", stats["revisions"])
+    col_days.metric("Days with revisions", stats["active_days"])
+    col_streak.metric("Current streak", f"{stats['streak']} day(s)")
+
+    title = f"Revisions per Day ({subject})"
+    if use_light_charts():
+        spec = memoize_chart("revision_heatmap.light", inputs, lambda: charts.heatmap_spec(
+            calendar.days()[:calendar.today_column + 1], daily[:calendar.today_column + 1], title))
+        with _span("vega.render[revision_heatmap]"):
+            st.vega_lite_chart(spec, use_container_width=True)
+    else:
+        def build():
+            week_starts = [day.strftime("%d %b %Y") for day in calendar.days()[::7]]
+            fig_heatmap = px.imshow(revision_calendar.week_grid(daily, calendar.today_column), x=week_starts,
+                                    y=["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"], color_continuous_scale="Greens",
+                                    aspect="auto", title=title, labels={"x": "Week of", "y": "Day", "color": "Revisions"})
+            fig_heatmap.update_xaxes(showticklabels=False)
+            fig_heatmap.update_traces(xgap=2, ygap=2)
+            return fig_heatmap
+        with _span("plotly.figure[revision_heatmap]"):
+            fig_heatmap = memoize_chart("revision_heatmap", inputs, build)
+        with _span("plotly.render[revision_heatmap]"):
+            st.plotly_chart(fig_heatmap, use_container_width=True)
+
+    totals = calendar.subject_totals()
+    if len(calendars) > 1:
+        for each_subject, count in calendars[1].subject_totals().items():
+            totals[each_subject] = totals.get(each_subject, 0) + count
+    st.caption(" · ".join(f"{each_subject}: {count}" for each_subject, count in totals.items() if each_subject in SUBJECT_CHOICES or count))
+
+def display_todo_view():
     st.header("To Do List")
-    app_data_todo = get_app_data() # Get main app_data dict for modification
 
     # Add New Manual Task
     with st.form("add_todo_task_form"):
@@ -787,87 +1835,119 @@ with tabs[-1]:
     
     if submitted_add_task:
         if new_task_text:
-            new_task_entry = {"task": new_task_text, "status": "Pending", "timestamp": datetime.datetime.now()}
+            app_data_todo = get_writable_app_data()
+            new_task_entry = Todo(new_task_text, timestamp=datetime.datetime.now(), uid=records.new_uid())
             app_data_todo['todo_data'].append(new_task_entry)
-            if save_data_to_jsonbin(app_data_todo):
+            get_record_index().todo_added(new_task_entry)
+            if save_patches_to_storage(app_data_todo, [patches.append_todo(new_task_entry)]):
                 st.success("Task added!")
                 st.rerun()
             else:
                 st.error("Failed to save task online. Reverting.")
                 app_data_todo['todo_data'].pop()
+                get_record_index().todo_removed(new_task_entry.uid)
         else:
             st.warning("Please enter a task.")
     st.markdown("<hr class='section-divider'>", unsafe_allow_html=True)
 
     # Manual Tasks List
     st.subheader("Manual Tasks")
-    todo_list = get_todo_data() # Get current list
-    if todo_list:
-        with st.form("manual_tasks_form"):
-            indices_to_delete_todo = []
-            task_statuses_todo = {} # (index, new_status_is_completed)
+    record_index = get_record_index()
+    if get_todo_data():
+        col_filter, col_size = st.columns([0.7, 0.3])
+        with col_filter:
+            status_filter = _display_status_filter("todo", record_index.todo_status_counts(), ["Pending", "Completed"])
+        with col_size:
+            _display_page_size_select("todo")
+        todo_count = record_index.todo_count(status_filter)
+        start, end = _page_window("todo", todo_count)
+        staged_statuses = _staged_edits("todo") # todo uid -> new_status_is_completed
+        staged_deletes = _staged_edits("todo", "delete") # todo uid -> True
 
-            for i, task in enumerate(todo_list):
+        with st.form("manual_tasks_form"):
+            row_states = [] # (uid, stored is_completed, new is_completed, marked for deletion)
+            for todo_uid in record_index.todo_uids(status_filter, start, end):
+                task = record_index.todo(todo_uid)
                 col1, col2, col3 = st.columns([0.75, 0.15, 0.1])
                 with col1:
-                    current_is_completed = task.get("status", "Pending") == "Completed"
+                    current_is_completed = task.status == TodoStatus.COMPLETED
                     new_is_completed = st.checkbox(
-                        task.get("task", "Unnamed Task"), 
-                        value=current_is_completed, 
-                        key=f"todo_cb_{i}_form"
+                        task.task or "Unnamed Task", 
+                        value=staged_statuses.get(todo_uid, current_is_completed), 
+                        key=f"todo_cb_{todo_uid}"
                     )
-                    task_statuses_todo[i] = new_is_completed
                 with col2:
                     # Timestamp display
-                    ts = task.get("timestamp")
+                    ts = task.timestamp
                     if isinstance(ts, datetime.datetime):
                         st.caption(ts.strftime("%d/%m %H:%M"))
                 with col3:
-                    if st.button("🗑️", key=f"delete_todo_btn_{i}_form", help="Delete Task"):
-                       indices_to_delete_todo.append(i) # Mark for deletion outside form submission logic
-
-            submitted_update_todos = st.form_submit_button("Update Manual Tasks Statuses")
-
-        # Handle deletions immediately if button clicked (outside form logic for direct action)
-        if indices_to_delete_todo:
-            indices_to_delete_todo.sort(reverse=True)
-            original_todo_list_copy = copy.deepcopy(app_data_todo['todo_data'])
-            num_deleted = 0
-            for index in indices_to_delete_todo:
-                if 0 <= index < len(app_data_todo['todo_data']):
-                    del app_data_todo['todo_data'][index]
-                    num_deleted += 1
-            if num_deleted > 0:
-                if save_data_to_jsonbin(app_data_todo):
-                    st.success(f"{num_deleted} Task(s) deleted.")
-                    st.rerun()
-                else:
-                    st.error("Failed to save deletions online. Reverting.")
-                    app_data_todo['todo_data'] = original_todo_list_copy
-                    st.rerun()
+                    # A button cannot live inside a form, so deletion is a tick applied on save
+                    marked_for_deletion = st.checkbox("🗑️", value=staged_deletes.get(todo_uid, False),
+                                                      key=f"todo_del_{todo_uid}", help="Delete task on save")
+                row_states.append((todo_uid, current_is_completed, new_is_completed, marked_for_deletion))
+
+            page_step = _display_page_nav(start, end, todo_count)
+            if staged_statuses or staged_deletes:
+                st.caption(f"{len(staged_statuses) + len(staged_deletes)} unsaved change(s) across pages.")
+            col_save, col_discard = st.columns(2)
+            submitted_update_todos = col_save.form_submit_button("Update Manual Tasks")
+            submitted_discard_todos = col_discard.form_submit_button("Discard Changes", disabled=not (staged_statuses or staged_deletes))
+
+        if submitted_discard_todos:
+            _discard_staged("todo")
+            st.rerun()
+        if page_step or submitted_update_todos:
+            for todo_uid, current_is_completed, new_is_completed, marked_for_deletion in row_states:
+                _stage_edit(staged_statuses, todo_uid, new_is_completed, current_is_completed)
+                _stage_edit(staged_deletes, todo_uid, marked_for_deletion, False)
+        if page_step:
+            st.session_state["todo_page"] += page_step
+            st.rerun()
         
-        # Handle status updates from form submission
+        # Apply staged status changes and deletions from every page as one batch
         if submitted_update_todos:
-            original_todo_list_copy = copy.deepcopy(app_data_todo['todo_data'])
-            changed_todo_status = False
-            for i, new_is_completed in task_statuses_todo.items():
-                task_to_update = app_data_todo['todo_data'][i]
-                current_status_str = task_to_update.get("status", "Pending")
-                target_status_str = "Completed" if new_is_completed else "Pending"
+            app_data_todo = get_writable_app_data()
+            record_index = get_record_index() # Over the session's own copy from here on
+            original_todo_list = list(app_data_todo['todo_data']) # Deleted records themselves are left untouched
+            changes = [] # (task, original_status) for revert
+            todo_patches = []
+            for todo_uid, new_is_completed in staged_statuses.items():
+                task_to_update = record_index.todo(todo_uid)
+                if task_to_update is None or todo_uid in staged_deletes:
+                    continue
+                current_status_str = task_to_update.status
+                target_status_str = TodoStatus.COMPLETED if new_is_completed else TodoStatus.PENDING
                 if current_status_str != target_status_str:
-                    task_to_update["status"] = target_status_str
-                    changed_todo_status = True
+                    _set_todo_status(task_to_update, target_status_str)
+                    changes.append((task_to_update, current_status_str))
+                    todo_patches.append(patches.set_todo_status(todo_uid, target_status_str))
+            deleted_uids = [uid for uid in staged_deletes if record_index.todo(uid) is not None]
+            if deleted_uids:
+                deleted = set(deleted_uids)
+                app_data_todo['todo_data'][:] = [t for t in app_data_todo['todo_data'] if t.uid not in deleted]
+                for uid in deleted_uids:
+                    record_index.todo_removed(uid)
+                todo_patches.append(patches.delete_todos(deleted_uids))
             
-            if changed_todo_status:
-                if save_data_to_jsonbin(app_data_todo):
-                    st.success("Manual task statuses updated.")
+            if todo_patches:
+                if save_patches_to_storage(app_data_todo, todo_patches):
+                    _discard_staged("todo")
+                    message = "Manual tasks updated."
+                    if deleted_uids:
+                        message += f" {len(deleted_uids)} Task(s) deleted."
+                    st.success(message)
                     st.rerun()
                 else:
-                    st.error("Failed to update manual task statuses. Reverting.")
-                    app_data_todo['todo_data'] = original_todo_list_copy
+                    st.error("Failed to update manual tasks. Reverting.")
+                    for task, original_status in changes:
+                        task.status = original_status
+                    app_data_todo['todo_data'][:] = original_todo_list
+                    _rebuild_record_index()
                     st.rerun()
             else:
-                st.info("No changes in manual task statuses.")
+                _discard_staged("todo")
+                st.info("No changes in manual tasks.")
     else:
         st.info("No manual tasks added yet.")
 
@@ -875,34 +1955,49 @@ with tabs[-1]:
 
     # Today's Revision Reminders (as Tasks) - Refactored
     st.subheader("Today's Revision Reminders (as Tasks)")
-    revision_tasks_for_today = get_revisions_for_date(datetime.date.today())
-    display_revision_entries_list(revision_tasks_for_today, "todo_rev_list")
+    display_revision_entries_list(datetime.date.today(), "todo_rev_list")
 
     st.markdown("<hr class='section-divider'>", unsafe_allow_html=True)
 
     # Today's To-Do Overview
     st.subheader("Today's To-Do Overview")
-    total_manual = len(todo_list)
-    completed_manual = sum(1 for t in todo_list if t.get("status") == "Completed")
-    total_rev_tasks = len(revision_tasks_for_today)
-    completed_rev_tasks = sum(1 for _,_,_,_,rem in revision_tasks_for_today if rem.get("status") == "Revised")
+    manual_counts = get_record_index().todo_status_counts()
+    total_manual = sum(manual_counts.values())
+    completed_manual = manual_counts.get("Completed", 0)
+    today_rev_counts = get_status_counts(datetime.date.today())
+    total_rev_tasks = get_reminder_index().count_for_date(datetime.date.today())
+    completed_rev_tasks = today_rev_counts["Revised"]
     
     total_overall_tasks = total_manual + total_rev_tasks
     completed_overall_tasks = completed_manual + completed_rev_tasks
     pending_overall_tasks = total_overall_tasks - completed_overall_tasks
 
     if total_overall_tasks > 0:
-        df_overview = pd.DataFrame({
-            "Status": ["Completed", "Pending"], "Count": [completed_overall_tasks, pending_overall_tasks]
-        })
-        df_overview['Status'] = pd.Categorical(df_overview['Status'], categories=["Completed", "Pending"], ordered=True)
-        fig_overview = px.pie(df_overview, names="Status", values="Count", title="Today's Task Status",
-                              color="Status", color_discrete_map={"Completed": COLOR_SUCCESS, "Pending": COLOR_WARNING})
-        fig_overview.update_traces(textposition='inside', textinfo='percent+value')
-        st.plotly_chart(fig_overview, use_container_width=True)
+        display_status_pie("todo_overview", {"Completed": completed_overall_tasks, "Pending": pending_overall_tasks},
+                           {"Completed": COLOR_SUCCESS, "Pending": COLOR_WARNING}, "Today's Task Status",
+                           textposition='inside', textinfo='percent+value')
     else:
         st.info("No tasks for today to generate overview.")
 
+# ---------------------------- APPLY THEME & MAIN PANEL ----------------------------
+st.markdown(get_app_css(st.session_state.app_theme), unsafe_allow_html=True)
+st.markdown("<div class='main-header'><h1>NEET Prep Tracker Dashboard</h1></div>", unsafe_allow_html=True)
+
+# Only the selected view is built on a rerun; the others cost nothing until picked.
+MAIN_VIEWS: Dict[str, Callable[[], None]] = {
+    **{subject: functools.partial(display_subject_view, subject) for subject in SUBJECT_CHOICES},
+    "Today's Revisions": display_todays_revisions_view,
+    "Productivity Tracking": display_productivity_view,
+    "Revision Heatmap": display_heatmap_view,
+    "To Do List": display_todo_view,
+}
+active_view = st.radio("View", list(MAIN_VIEWS), horizontal=True, key="active_view", label_visibility="collapsed")
+with _span(f"view[{active_view}]"):
+    MAIN_VIEWS[active_view]()
+
 st.markdown("<hr class='section-divider'>", unsafe_allow_html=True)
 # Consider adding a small footer or app version if needed
 # st.caption("NEET Prep Tracker v1.1")
+
+if get_profiler() is not None:
+    get_profiler().end_run()
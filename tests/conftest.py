@@ -0,0 +1,22 @@
+"""Shared fixtures: a local stand-in JSONBin server and small seeded documents."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stand_in_jsonbin import StandInJsonBin
+from benchmarks.synthetic import stored_document
+
+
+@pytest.fixture
+def server():
+    with StandInJsonBin() as stand_in:
+        yield stand_in
+
+
+@pytest.fixture
+def document():
+    """A JSON-ready document with record IDs, as the backends store it."""
+    return stored_document(chapters=12, todos=4)
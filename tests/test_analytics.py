@@ -0,0 +1,119 @@
+"""The analytics table and daily rollup: aggregates against plain counts, and hooks against a fresh build."""
+import collections
+import datetime
+
+import numpy as np
+
+from benchmarks.synthetic import make_app_data
+from tracker.analytics import GRANULARITIES, DailyRollup, ReminderTable, period_series
+from tracker.models import Chapter, Reminder, ReminderStatus
+
+SUBJECTS = ["Botany", "Zoology", "Physics", "Chemistry"]
+
+
+def _reminders(subject_chapters):
+    return [(subject, reminder) for subject, chapters in subject_chapters.items() for chapter in chapters for reminder in chapter.reminders]
+
+
+def test_table_aggregates_match_plain_counts():
+    subject_chapters = make_app_data(chapters=40, todos=0)["subject_chapters_data"]
+    table = ReminderTable.build(subject_chapters, SUBJECTS)
+    reminders = _reminders(subject_chapters)
+    start, end = datetime.date(2024, 6, 1), datetime.date(2024, 8, 31)
+    in_range = [reminder for _, reminder in reminders if start <= reminder.time.date() <= end]
+
+    statuses = collections.Counter(reminder.status for reminder in in_range)
+    assert table.status_breakdown(start, end) == {ReminderStatus.PENDING: statuses[ReminderStatus.PENDING],
+                                                  ReminderStatus.REVISED: statuses[ReminderStatus.REVISED]}
+    counts = table.daily_counts(start, end)
+    assert list(counts["date"]) == sorted({reminder.time.date() for reminder in in_range})
+    assert dict(zip(counts["date"], counts["total"])) == collections.Counter(reminder.time.date() for reminder in in_range)
+    assert dict(zip(counts["date"], counts["revised"])) == {
+        day: sum(r.status == ReminderStatus.REVISED for r in in_range if r.time.date() == day) for day in counts["date"]}
+
+    archived = {"Physics": {"reminders": 12, "revised": 12}, "Biology": {"reminders": 3, "revised": 3}}
+    progress = table.subject_progress(archived)
+    for subject in SUBJECTS:
+        own = [reminder for s, reminder in reminders if s == subject]
+        extra = archived.get(subject, {"reminders": 0, "revised": 0})
+        revised = sum(reminder.status == ReminderStatus.REVISED for reminder in own) + extra["revised"]
+        assert progress[subject] == revised * 100.0 / (len(own) + extra["reminders"])
+    assert "Biology" not in progress
+
+
+def _bucket_start(day, granularity, start):
+    if granularity == "Weekly":
+        day -= datetime.timedelta(days=day.weekday())
+    elif granularity == "Monthly":
+        day = day.replace(day=1)
+    return max(day, start) # The first bucket is cut at the start of the range
+
+
+def test_period_series_matches_plain_counts():
+    subject_chapters = make_app_data(chapters=40, todos=0)["subject_chapters_data"]
+    # Two rollups, as for live and archived reminders
+    archived = {subject: chapters[::2] for subject, chapters in subject_chapters.items()}
+    live = {subject: chapters[1::2] for subject, chapters in subject_chapters.items()}
+    rollups = [DailyRollup.build(ReminderTable.build(part, SUBJECTS)) for part in (live, archived)]
+    reminders = _reminders(subject_chapters)
+    start, end = datetime.date(2024, 5, 15), datetime.date(2024, 11, 20)
+
+    for granularity in GRANULARITIES:
+        for subjects in (None, ["Physics", "Botany"]):
+            series = period_series(rollups, start, end, granularity, subjects)
+            counted = [(_bucket_start(r.time.date(), granularity, start), r.status == ReminderStatus.REVISED)
+                       for s, r in reminders if start <= r.time.date() <= end and (subjects is None or s in subjects)]
+            starts = [day.astype(datetime.date) for day in series.starts]
+            assert starts == sorted({bucket for bucket, _ in counted}) # Empty buckets are dropped
+            assert list(series.total) == [sum(bucket == day for bucket, _ in counted) for day in starts]
+            assert list(series.revised) == [sum(bucket == day and revised for bucket, revised in counted) for day in starts]
+            assert np.allclose(series.productivity(), series.revised * 100.0 / series.total)
+
+    whole = period_series(rollups, None, None, "Monthly")
+    assert whole.total.sum() == len(reminders)
+    assert whole.starts[0] == np.datetime64(min(r.time.date() for _, r in reminders)) # Open ends take the covered days
+    assert len(period_series(rollups, end, start, "Daily")) == 0
+    assert len(period_series([DailyRollup.build(ReminderTable.build({}, SUBJECTS))], None, None, "Weekly")) == 0
+
+
+def _assert_matches_build(table, rollup, subject_chapters):
+    fresh = ReminderTable.build(subject_chapters, SUBJECTS)
+    assert table.subject_progress() == fresh.subject_progress()
+    assert table.status_breakdown() == fresh.status_breakdown()
+    assert table.daily_counts().equals(fresh.daily_counts())
+    boundaries = np.arange(np.datetime64("2023-06-01"), np.datetime64("2025-08-01"), 7)
+    for subjects in (None, ["Physics"], ["Biology"]):
+        got = rollup.bucket_counts(boundaries, subjects)
+        expected = DailyRollup.build(fresh).bucket_counts(boundaries, subjects)
+        assert all(np.array_equal(g, e) for g, e in zip(got, expected))
+
+
+def test_hooks_keep_table_and_rollup_current():
+    subject_chapters = make_app_data(chapters=30, todos=0)["subject_chapters_data"]
+    table = ReminderTable.build(subject_chapters, SUBJECTS)
+    rollup = DailyRollup.build(table)
+    views = (table, rollup)
+
+    deleted = subject_chapters["Botany"].pop(0)
+    for view in views:
+        view.chapter_deleted("Botany", deleted)
+    chapter = subject_chapters["Physics"][0]
+    removed = chapter.reminders.pop(1)
+    for view in views:
+        view.reminder_removed("Physics", removed)
+    # Due before and after everything else, so the rollup has to widen on both sides
+    for due, status in ((datetime.datetime(2023, 7, 1, 9), "Revised"), (datetime.datetime(2025, 6, 1, 9), "Pending")):
+        reminder = Reminder(len(chapter.reminders) + 1, "Extra", due, status)
+        chapter.reminders.append(reminder)
+        for view in views:
+            view.reminder_added("Physics", reminder)
+    new_subject = subject_chapters.setdefault("Biology", [])
+    added = Chapter("Cells", datetime.datetime(2024, 3, 1, 8), [Reminder(1, "Extra", datetime.datetime(2024, 3, 2, 8), "Revised"),
+                                                                Reminder(2, "Extra", "not a date")])
+    new_subject.append(added)
+    for view in views:
+        view.chapter_added("Biology", added)
+
+    _assert_matches_build(table, rollup, subject_chapters)
+    assert rollup.first_day == datetime.date(2023, 7, 1)
+    assert rollup.last_day == datetime.date(2025, 6, 1)
@@ -0,0 +1,47 @@
+"""Which chapters are finished enough to archive, for fixed and adaptive (SM-2) schedules."""
+import datetime
+
+from tracker import scheduling
+from tracker.archive import chapter_is_archivable
+from tracker.models import Chapter, ReminderStatus
+from tracker.scheduling import FixedIntervalScheduler, Sm2Scheduler
+
+ENTRY = datetime.datetime(2023, 1, 2, 18, 0)
+CUTOFF = datetime.datetime(2024, 6, 1)
+
+
+def _revise_on_time(chapter, times):
+    for _ in range(times):
+        scheduling.sync_chapter(chapter)
+        reminder = chapter.reminders[-1]
+        reminder.status, reminder.revised_at = ReminderStatus.REVISED, reminder.time
+    scheduling.sync_chapter(chapter)
+
+
+def test_sm2_chapter_is_archived_once_the_interval_is_capped():
+    chapter = Chapter("Optics", ENTRY, schedule=Sm2Scheduler().to_schedule())
+    _revise_on_time(chapter, 4)
+    assert Sm2Scheduler().interval_days(chapter) == 131 # 45 days times an ease of 2.9
+    assert not chapter_is_archivable(chapter, CUTOFF)
+
+    _revise_on_time(chapter, 1)
+    assert Sm2Scheduler().interval_days(chapter) == 180
+    assert chapter.reminders[-1].status == ReminderStatus.PENDING
+    assert chapter_is_archivable(chapter, CUTOFF)
+    assert not chapter_is_archivable(chapter, chapter.reminders[-2].revised_at) # Last revision not old enough yet
+
+    short = Chapter("Units", ENTRY, schedule=Sm2Scheduler(max_interval_days=30).to_schedule())
+    _revise_on_time(short, 3)
+    assert chapter_is_archivable(short, CUTOFF)
+    short.reminders[0].status = ReminderStatus.PENDING # Only the trailing reminder may be pending
+    assert not chapter_is_archivable(short, CUTOFF)
+
+
+def test_fixed_chapter_is_archived_once_all_reminders_are_revised():
+    chapter = Chapter("Cells", ENTRY, schedule=FixedIntervalScheduler([12, 72]).to_schedule())
+    _revise_on_time(chapter, 1)
+    assert not chapter_is_archivable(chapter, CUTOFF)
+    _revise_on_time(chapter, 1)
+    assert [r.status for r in chapter.reminders] == [ReminderStatus.REVISED] * 2
+    assert chapter_is_archivable(chapter, CUTOFF)
+    assert not chapter_is_archivable(Chapter("Empty", ENTRY), CUTOFF)
@@ -0,0 +1,22 @@
+"""Row validation of bulk imports: bad rows are reported, never abort the file."""
+import datetime
+
+from tracker import scheduling
+from tracker.bulk_import import parse_rows
+
+SUBJECTS = ["Physics", "Botany"]
+DEFAULT_SCHEDULE = scheduling.FixedIntervalScheduler().to_schedule()
+NOW = datetime.datetime(2025, 1, 6, 18, 0)
+
+
+def _parse(*rows):
+    return parse_rows(enumerate(rows, start=2), SUBJECTS, DEFAULT_SCHEDULE, now=NOW)
+
+
+def test_out_of_range_rows_are_reported():
+    result = _parse({"kind": "chapter", "subject": "Physics", "chapter_name": "Huge", "intervals_hours": "1e9"},
+                    {"kind": "chapter", "subject": "Physics", "chapter_name": "Late", "entry_datetime": "9999-12-31 23:00"},
+                    {"kind": "chapter", "subject": "Physics", "chapter_name": "Endless", "intervals_hours": "inf"},
+                    {"kind": "chapter", "subject": "Botany", "chapter_name": "Fine", "intervals_hours": "12;72"})
+    assert [row for row, _ in result.errors] == [2, 3, 4]
+    assert [chapter.chapter_name for _, chapter in result.chapters] == ["Fine"]
@@ -0,0 +1,81 @@
+"""Slotted models through the codec: stored documents survive a decode and encode unchanged."""
+import copy
+import datetime
+import json
+
+import pytest
+
+from benchmarks.synthetic import make_app_data
+from tracker import codec
+from tracker.models import Chapter, Reminder, ReminderStatus, ReminderType, Todo, TodoStatus
+
+STORED = {
+    "schema_version": 1,
+    "theme": "dark", # A document key the schema does not know about
+    "subject_chapters_data": {
+        "Physics": [{
+            "uid": "c-optics", "chapter_name": "Optics", "entry_datetime": "2025-01-06T18:00:00",
+            "reminders": [
+                {"reminder_id": 1, "type": "12 hour Reminder", "time": "2025-01-07T06:00:00", "status": "Revised",
+                 "revised_at": "2025-01-07T08:30:00"},
+                {"reminder_id": 2, "type": "Extra", "time": "next week", "status": "Pending",
+                 "note": "kept", "seen": ["2025-01-08T09:00:00"]},
+            ],
+            "exams_appeared": 2, "exam_status": "Appeared", "time_spent": 90,
+            "schedule": {"kind": "sm2", "max_interval_days": 180}, "colour": "blue",
+        }],
+        "Botany": [{"chapter_name": "Cells", "entry_datetime": "not a date", "reminders": [], "exams_appeared": 0,
+                    "exam_status": "Not Appeared", "time_spent": 0}],
+    },
+    "todo_data": [{"uid": "t-1", "task": "Revise optics", "status": "Completed", "timestamp": "2025-01-06T19:00:00",
+                   "priority": 3},
+                  {"task": "Legacy", "status": "Snoozed", "timestamp": None}],
+}
+
+
+def test_stored_document_round_trips():
+    document = codec.decode_document(copy.deepcopy(STORED))
+    optics = document["subject_chapters_data"]["Physics"][0]
+    revised, extra = optics.reminders
+    assert isinstance(optics, Chapter) and not hasattr(optics, "__dict__")
+    assert revised.status is ReminderStatus.REVISED and revised.type is ReminderType.HOURS_12
+    assert revised.revised_at == datetime.datetime(2025, 1, 7, 8, 30)
+    assert extra.time == "next week" and extra.revised_at is None # Unparsable times stay as stored
+    assert extra.extra == {"note": "kept", "seen": ["2025-01-08T09:00:00"]}
+    assert optics.schedule == {"kind": "sm2", "max_interval_days": 180} and optics.extra == {"colour": "blue"}
+    assert document["subject_chapters_data"]["Botany"][0].entry_datetime == "not a date"
+    todo, legacy = document["todo_data"]
+    assert todo.status is TodoStatus.COMPLETED and todo.extra == {"priority": 3}
+    assert legacy.status == "Snoozed" and legacy.uid is None and legacy.extra is None
+
+    encoded = codec.encode_document(document)
+    assert json.loads(json.dumps(encoded)) == STORED
+    assert codec.decode_document(json.loads(json.dumps(encoded))) == document
+
+
+def test_models_round_trip():
+    document = make_app_data(chapters=20, todos=20)
+    chapter = document["subject_chapters_data"]["Physics"][0]
+    chapter.schedule = {"kind": "sm2", "max_interval_days": 180}
+    chapter.reminders[0].status = ReminderStatus.REVISED
+    chapter.reminders[0].revised_at = datetime.datetime(2025, 1, 7, 8, 30)
+    chapter.reminders.append(Reminder(len(chapter.reminders) + 1, "Extra", datetime.datetime(2025, 2, 1, 9),
+                                      extra={"seen": [datetime.datetime(2025, 2, 1, 10)]}))
+    document["todo_data"].append(Todo("Custom", "Snoozed", datetime.datetime(2025, 1, 1), uid="t-custom"))
+    document[codec.DATA_REVISION_KEY] = 12
+    document[codec.IDS_UNSAVED_KEY] = True
+    before = copy.deepcopy(document)
+
+    encoded = codec.encode_document(document)
+    assert document == before # Not modified
+    assert codec.DATA_REVISION_KEY not in encoded and codec.IDS_UNSAVED_KEY not in encoded # Session-only
+    decoded = codec.decode_document(json.loads(json.dumps(encoded)))
+    del before[codec.DATA_REVISION_KEY], before[codec.IDS_UNSAVED_KEY]
+    # Datetimes in ``extra`` come back as their stored strings
+    before["subject_chapters_data"]["Physics"][0].reminders[-1].extra = {"seen": ["2025-02-01T10:00:00"]}
+    assert decoded == before
+
+
+def test_newer_schema_is_refused():
+    with pytest.raises(ValueError):
+        codec.decode_document({"schema_version": codec.SCHEMA_VERSION + 1, "subject_chapters_data": {}, "todo_data": []})
@@ -0,0 +1,21 @@
+"""Export files: rebuilt on a new data revision, and removed once the session's cache is gone."""
+import gc
+import os
+
+from benchmarks.synthetic import make_app_data
+from tracker.export import ExportCache
+
+
+def test_export_cache_removes_its_files():
+    subject_chapters = make_app_data(chapters=5, todos=0)["subject_chapters_data"]
+    cache = ExportCache(chunk_rows=7)
+    first = cache.build(1, "CSV", subject_chapters)
+    assert cache.build(1, "CSV", subject_chapters) == first
+    rebuilt = cache.build(2, "CSV", subject_chapters)
+    jsonl = cache.build(2, "JSON Lines", subject_chapters)
+    assert not os.path.exists(first) and os.path.exists(rebuilt) and os.path.exists(jsonl)
+    assert cache.get(1, "CSV") is None and cache.get(2, "CSV") == rebuilt
+
+    del cache
+    gc.collect()
+    assert not os.path.exists(rebuilt) and not os.path.exists(jsonl)
@@ -0,0 +1,115 @@
+"""JSONBin backends against the local stand-in server: round trips, conditional loads, retries, journal and shards."""
+import copy
+
+import pytest
+import requests
+
+from tracker import patches
+from tracker.http_client import create_session
+from tracker.patches import apply_patch
+from tracker.storage import SHARDED_MARKER_KEY, TODO_SHARD, JsonBinBackend, ShardedJsonBinBackend
+
+
+def _document():
+    return {"subject_chapters_data": {"Physics": [{"chapter_name": "Units", "entry_datetime": "2025-01-06T18:00:00",
+                                                   "reminders": [{"reminder_id": 1, "type": "12 hour Reminder",
+                                                                  "time": "2025-01-07T06:00:00", "status": "Pending"}],
+                                                   "exams_appeared": 0, "exam_status": "", "time_spent": 0}]},
+            "todo_data": [{"task": f"Task {i}", "status": "Pending", "timestamp": "2025-01-06T18:00:00"} for i in range(12)]}
+
+
+def _backend(server, **kwargs):
+    return JsonBinBackend("key", "main", base_url=server.base_url, session=create_session(backoff_factor=0, backoff_jitter=0),
+                          **kwargs)
+
+
+def _full_reads(server, bin_id):
+    return sum(1 for method, path in server.requests if method == "GET" and path.endswith(f"/{bin_id}/latest"))
+
+
+def _save(backend, document, patch_list):
+    """What the app's patch save does: apply locally, send a snapshot when the backend asks for one."""
+    for patch in patch_list:
+        apply_patch(document, patch)
+    snapshot = copy.deepcopy(document) if backend.wants_snapshot(len(patch_list)) else None
+    backend.save_patches(patch_list, snapshot)
+
+
+def test_round_trip(server):
+    _backend(server).save_snapshot(_document())
+    assert _backend(server).load() == _document()
+
+
+def test_unchanged_bin_is_not_downloaded_again(server):
+    """Conditional load: only the version count is fetched while the bin is unchanged (JSONBin has no 304)."""
+    _backend(server).save_snapshot(_document())
+    backend = _backend(server)
+    backend.load()
+    backend.load()
+    assert _full_reads(server, "main") == 1
+
+    _backend(server).save_snapshot({**_document(), "todo_data": []})
+    assert backend.load()["todo_data"] == []
+    assert _full_reads(server, "main") == 2
+
+
+def test_server_errors_are_retried(server):
+    _backend(server).save_snapshot(_document())
+    server.fail("main", 503, times=2, method="GET")
+    assert _backend(server).load() == _document()
+
+    server.fail("main", 503, times=5, method="PUT")
+    with pytest.raises(requests.exceptions.HTTPError):
+        _backend(server).save_snapshot(_document()) # Still failing once the session's 3 retries are used up
+
+
+def test_journal_compaction_and_replay(server):
+    document = _document()
+    backend = _backend(server, journal_bin_id="journal", compact_every=5)
+    _save(backend, document, [])
+    for index in range(len(document["todo_data"])):
+        _save(backend, document, [{"op": "set_todo_status", "todo_index": index, "status": "Completed"}])
+        assert len(server.bins["journal"][0]["patches"]) < 5
+
+    assert server.bins["main"][0]["snapshot_seq"] > 0 # Compacted at least once
+    assert _backend(server, journal_bin_id="journal", compact_every=5).load() == document
+
+
+def test_shard_writes(server, document):
+    shard_bin_ids = {name: f"shard-{name}" for name in list(document["subject_chapters_data"]) + [TODO_SHARD]}
+    backend = ShardedJsonBinBackend("key", "main", shard_bin_ids, base_url=server.base_url)
+    _save(backend, document, [])
+    versions = {name: server.bins[bin_id][1] for name, bin_id in shard_bin_ids.items()}
+
+    subject = next(s for s, chapters in document["subject_chapters_data"].items() if chapters)
+    _save(backend, document, [patches.delete_chapter(subject, document["subject_chapters_data"][subject][0]["uid"])])
+    written = {name for name, bin_id in shard_bin_ids.items() if server.bins[bin_id][1] != versions[name]}
+    assert written == {subject}
+
+    loaded = ShardedJsonBinBackend("key", "main", shard_bin_ids, base_url=server.base_url).load()
+    assert loaded["subject_chapters_data"] == document["subject_chapters_data"]
+    assert loaded["todo_data"] == document["todo_data"]
+
+
+def test_failed_first_shard_snapshot_keeps_the_single_bin_document(server, document):
+    shard_bin_ids = {name: f"shard-{name}" for name in list(document["subject_chapters_data"]) + [TODO_SHARD]}
+    def sharded():
+        return ShardedJsonBinBackend("key", "main", shard_bin_ids, base_url=server.base_url, session=create_session(max_retries=0))
+    JsonBinBackend("key", "main", base_url=server.base_url).save_snapshot(document) # Stored before sharding
+    edited = copy.deepcopy(document)
+    edited["todo_data"].pop(0)
+    backend = sharded()
+    backend.load()
+    server.fail(f"shard-{TODO_SHARD}", 400) # The subject shards are written, the todo shard is not
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        backend.save_snapshot(edited)
+    loaded = sharded().load()
+    assert loaded["subject_chapters_data"] == document["subject_chapters_data"]
+    assert loaded["todo_data"] == document["todo_data"]
+
+    backend.save_snapshot(edited)
+    assert server.bins["main"][0] == {SHARDED_MARKER_KEY: True}
+    loaded = sharded().load()
+    assert loaded["subject_chapters_data"] == edited["subject_chapters_data"]
+    assert loaded["todo_data"] == edited["todo_data"]
@@ -0,0 +1,50 @@
+"""Offline-first saving when the document's bin does not exist yet: logged edits are shown and then synced."""
+import copy
+import functools
+
+import pytest
+import requests
+
+from tracker import codec, patches
+from tracker.http_client import create_session, is_transient_error
+from tracker.models import Todo
+from tracker.storage import JsonBinBackend
+from tracker.wal import WriteAheadLog
+from tracker.write_behind import WriteBehindQueue, flush_offline_batch
+
+EMPTY_RECORD = codec.encode_document({"subject_chapters_data": {}, "todo_data": []})
+
+
+def _backend(server):
+    return JsonBinBackend("key", "main", journal_bin_id="journal", base_url=server.base_url, session=create_session(max_retries=0))
+
+
+def _logged_todo(wal_path):
+    """A batch an earlier run logged but never synced."""
+    todo = codec.encode_todo(Todo("Revise optics", uid="t-optics"))
+    WriteAheadLog(wal_path).append([patches.append_todo(todo)])
+    return todo
+
+
+def test_edits_logged_for_a_missing_bin_are_shown(server, tmp_path):
+    todo = _logged_todo(str(tmp_path / "offline.wal"))
+    backend = _backend(server)
+    with pytest.raises(requests.exceptions.HTTPError):
+        backend.load()
+
+    assert backend.load_if_exists() is None
+    wal = WriteAheadLog(str(tmp_path / "offline.wal"))
+    assert wal.reconcile(copy.deepcopy(EMPTY_RECORD))["todo_data"] == [todo]
+
+
+def test_offline_flush_creates_a_missing_bin(server, tmp_path):
+    wal_path = str(tmp_path / "offline.wal")
+    todo = _logged_todo(wal_path)
+    wal = WriteAheadLog(wal_path)
+    queue = WriteBehindQueue(functools.partial(flush_offline_batch, _backend(server), wal, EMPTY_RECORD),
+                             debounce_seconds=0, retry_seconds=0, wal=wal, max_failures=2, is_transient=is_transient_error)
+    queue.submit([patches.set_todo_status(todo["uid"], "Completed")])
+
+    assert queue.flush(timeout=5)
+    assert not wal.pending() and EMPTY_RECORD["todo_data"] == []
+    assert _backend(server).load()["todo_data"] == [{**todo, "status": "Completed"}]
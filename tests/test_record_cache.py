@@ -0,0 +1,80 @@
+"""The process-wide record cache: byte-bounded LRU eviction, versions and expiry, and copy-on-write sharing."""
+import copy
+import threading
+import time
+
+from benchmarks.synthetic import make_app_data
+from tracker.models import ReminderStatus
+from tracker.record_cache import RecordCache
+
+
+def test_lru_eviction_by_size():
+    cache = RecordCache(max_bytes=100)
+    cache.put("a", 1, "A", 40)
+    cache.put("b", 1, "B", 40)
+    assert cache.get("a", 1) == "A" # Now "b" is the least recently used
+    cache.put("c", 1, "C", 40)
+    assert cache.get("b", 1) is None
+    assert (cache.get("a", 1), cache.get("c", 1)) == ("A", "C")
+    assert cache.stats()["bytes"] == 80 and cache.stats()["evictions"] == 1
+
+    cache.put("a", 2, "A2", 30) # A new version replaces the old one's size
+    assert cache.get("a", 1) is None and cache.get("a", 2) == "A2"
+    assert cache.stats()["bytes"] == 70
+
+    cache.put("big", 1, "BIG", 500) # Too big for the cache, but the entry just stored is kept
+    assert cache.get("big", 1) == "BIG"
+    assert cache.stats()["entries"] == 1 and cache.stats()["bytes"] == 500
+    cache.invalidate()
+    assert cache.stats()["entries"] == 0 and cache.stats()["bytes"] == 0
+
+
+def test_expiry_and_invalidation(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = RecordCache(max_bytes=100, ttl_seconds=60)
+    cache.put("a", 1, "A", 10)
+    cache.put("b", 1, "B", 10)
+    now[0] += 59
+    assert cache.get("a", 1) == "A"
+    now[0] += 2
+    assert cache.get("a", 1) is None
+    assert cache.get_or_load("a", 1, lambda: ("A again", 10)) == "A again"
+    cache.invalidate("a")
+    assert cache.get("a", 1) is None and cache.stats()["bytes"] == 10
+
+
+def test_sessions_load_once_and_copy_on_write():
+    cache = RecordCache(max_bytes=10 ** 9)
+    loads = []
+    release = threading.Event()
+
+    def load():
+        loads.append(1)
+        release.wait(5)
+        return make_app_data(chapters=10, todos=10), 1000
+
+    documents = []
+    sessions = [threading.Thread(target=lambda: documents.append(cache.get_or_load("user", 7, load))) for _ in range(4)]
+    for session in sessions:
+        session.start()
+    release.set()
+    for session in sessions:
+        session.join()
+    assert len(loads) == 1 and all(document is documents[0] for document in documents)
+    assert cache.get_or_load("user", 8, lambda: (None, 0)) is None and cache.get("user", 8) is None # Not stored
+
+    shared = documents[0]
+    own = copy.deepcopy(shared) # What a session's first edit does
+    chapter = own["subject_chapters_data"]["Physics"][0]
+    statuses = [reminder.status for reminder in chapter.reminders]
+    for reminder in chapter.reminders:
+        reminder.status = ReminderStatus.REVISED if reminder.status == ReminderStatus.PENDING else ReminderStatus.PENDING
+    chapter.reminders.pop()
+    own["todo_data"][0].task = "Edited"
+    cached = cache.get("user", 7)
+    assert cached is shared
+    original = cached["subject_chapters_data"]["Physics"][0]
+    assert original is not chapter and len(original.reminders) == len(chapter.reminders) + 1
+    assert [reminder.status for reminder in original.reminders] == statuses
+    assert cached["todo_data"][0].task != "Edited"
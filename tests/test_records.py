@@ -0,0 +1,24 @@
+"""The record index's todo status lists: counts and pages stay in list order through edits."""
+from tracker.models import Todo, TodoStatus
+from tracker.records import RecordIndex
+
+
+def test_todo_status_pages_follow_list_order():
+    todos = [Todo(f"Task {i}", TodoStatus.COMPLETED if i % 3 == 0 else TodoStatus.PENDING, uid=f"t{i}") for i in range(10)]
+    index = RecordIndex.build({"todo_data": todos})
+    for todo in (todos[1], todos[7]):
+        todo.status = TodoStatus.COMPLETED
+        index.todo_status_changed(todo, TodoStatus.PENDING)
+    todos[3].status = TodoStatus.PENDING
+    index.todo_status_changed(todos[3], TodoStatus.COMPLETED)
+    index.todo_removed("t4")
+    index.todo_added(Todo("Task 10", uid="t10"))
+
+    remaining = [todo for todo in todos if todo.uid != "t4"] + [index.todo("t10")]
+    for status in (TodoStatus.PENDING, TodoStatus.COMPLETED):
+        expected = [todo.uid for todo in remaining if todo.status == status]
+        assert index.todo_count(status) == len(expected)
+        assert index.todo_uids(status) == expected
+        assert index.todo_uids(status, 1, 3) == expected[1:3]
+    assert index.todo_status_counts() == {TodoStatus.PENDING: 5, TodoStatus.COMPLETED: 5}
+    assert index.todo_uids(None, 8) == ["t9", "t10"]
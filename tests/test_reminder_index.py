@@ -0,0 +1,67 @@
+"""The reminder index's date lookups and due queue, kept current by the maintenance hooks."""
+import datetime
+
+from tracker.models import Chapter, Reminder, ReminderStatus
+from tracker.reminder_index import ReminderIndex
+
+SUBJECTS = ["Botany", "Zoology", "Physics", "Chemistry"]
+NOW = datetime.datetime(2025, 1, 10, 12, 0)
+
+
+def _at(hours):
+    return NOW + datetime.timedelta(hours=hours)
+
+
+def _types(entries):
+    return [reminder.type for _, _, reminder in entries]
+
+
+def test_date_lookups_after_edits():
+    day = NOW.date()
+    units = Chapter("Units", _at(-100), [Reminder(1, "a", _at(1)), Reminder(2, "b", _at(-1), ReminderStatus.REVISED)])
+    optics = Chapter("Optics", _at(-100), [Reminder(1, "c", _at(2))])
+    cells = Chapter("Cells", _at(-100), [Reminder(1, "d", _at(3)), Reminder(2, "e", _at(48))])
+    index = ReminderIndex.build({"Physics": [units, optics], "Botany": [cells]}, SUBJECTS)
+    assert _types(index.entries_for_date(day)) == ["d", "a", "b", "c"] # Subject order, then chapter, then reminder
+    assert index.status_counts(day) == {ReminderStatus.REVISED: 1, ReminderStatus.PENDING: 3}
+
+    units.reminders[0].status = ReminderStatus.REVISED
+    index.status_changed(units.reminders[0], ReminderStatus.PENDING, ReminderStatus.REVISED)
+    index.chapter_deleted(cells)
+    late = Chapter("Waves", _at(-100), [Reminder(1, "f", _at(-3))])
+    index.chapter_added("Physics", late)
+    extra = Reminder(2, "g", _at(4))
+    units.reminders.append(extra)
+    index.reminder_added("Physics", units, extra)
+    assert _types(index.entries_for_date(day)) == ["a", "b", "g", "c", "f"]
+    assert index.status_counts(day) == {ReminderStatus.REVISED: 2, ReminderStatus.PENDING: 3}
+    assert index.count_for_date(day + datetime.timedelta(days=2)) == 0
+    assert index.status_counts(day + datetime.timedelta(days=2)) == {ReminderStatus.REVISED: 0, ReminderStatus.PENDING: 0}
+
+
+def test_due_queue_order_and_invalidation():
+    optics = Chapter("Optics", _at(-100), [Reminder(1, "a", _at(-30)), Reminder(2, "b", _at(-2), ReminderStatus.REVISED),
+                                           Reminder(3, "c", _at(5))])
+    cells = Chapter("Cells", _at(-100), [Reminder(1, "d", _at(-50)), Reminder(2, "e", _at(-1)), Reminder(3, "f", "not a date")])
+    index = ReminderIndex.build({"Physics": [optics], "Botany": [cells]}, SUBJECTS)
+    assert _types(index.due(NOW)) == ["d", "a", "e"]
+    assert _types([index.next_due()]) == ["d"]
+
+    revised = cells.reminders[0]
+    revised.status = ReminderStatus.REVISED
+    index.status_changed(revised, ReminderStatus.PENDING, ReminderStatus.REVISED)
+    removed = optics.reminders.pop(0)
+    index.reminder_removed(removed)
+    extra = Reminder(4, "g", _at(-70))
+    optics.reminders.append(extra)
+    index.reminder_added("Physics", optics, extra)
+    assert _types(index.due(NOW)) == ["g", "e"]
+
+    revised.status = ReminderStatus.PENDING # Queued again once pending
+    index.status_changed(revised, ReminderStatus.REVISED, ReminderStatus.PENDING)
+    assert _types(index.due(NOW)) == ["g", "d", "e"]
+    assert _types(index.due(_at(6))) == ["g", "d", "e", "c"]
+
+    index.chapter_deleted(optics)
+    assert _types(index.due(_at(6))) == ["d", "e"]
+    assert _types([index.next_due()]) == ["d"]
@@ -0,0 +1,71 @@
+"""Replaying a batch that was already stored (sent, but never acknowledged) must leave the data loadable."""
+import copy
+
+from tracker import patches
+from tracker.storage import JsonBinBackend, SqliteBackend
+from tracker.wal import WriteAheadLog
+
+
+def _first_chapter(document):
+    subject = next(s for s, chapters in document["subject_chapters_data"].items() if chapters)
+    return subject, document["subject_chapters_data"][subject][0]
+
+
+def _changes_to(subject, chapter):
+    reminder_id = chapter["reminders"][0]["reminder_id"]
+    return [patches.set_reminder_status(subject, chapter["uid"], reminder_id, "Revised", "2024-12-30T09:00:00"),
+            patches.set_chapter_fields(subject, chapter["uid"], {"time_spent": 99}),
+            patches.delete_reminder(subject, chapter["uid"], reminder_id),
+            patches.append_reminder(subject, chapter["uid"], {"reminder_id": 99, "type": "Extra", "time": None, "status": "Pending"}),
+            patches.delete_chapter(subject, chapter["uid"])]
+
+
+def test_apply_patch_twice_is_a_no_op(document):
+    subject, chapter = _first_chapter(document)
+    todo = document["todo_data"][0]
+    batch = _changes_to(subject, chapter) + [patches.set_todo_status(todo["uid"], "Completed"), patches.delete_todos([todo["uid"]]),
+                                             patches.set_todo_status(todo["uid"], "Pending")]
+    once = copy.deepcopy(document)
+    for patch in batch:
+        patches.apply_patch(once, patch)
+    twice = copy.deepcopy(once)
+    for patch in batch:
+        patches.apply_patch(twice, patch)
+    assert twice == once
+    assert chapter["uid"] not in {c["uid"] for c in once["subject_chapters_data"][subject]}
+
+
+def test_journal_replay_of_a_resent_batch(server, document):
+    subject, chapter = _first_chapter(document)
+    backend = JsonBinBackend("key", "main", journal_bin_id="journal", base_url=server.base_url)
+    backend.save_patches([], snapshot=document)
+    batch = [patches.delete_chapter(subject, chapter["uid"])]
+    backend.save_patches(batch) # Stored, but the ack never reached the log...
+    backend.save_patches(batch) # ...so the batch is sent again
+
+    assert len(server.bins["journal"][0]["patches"]) == 2
+    loaded = JsonBinBackend("key", "main", journal_bin_id="journal", base_url=server.base_url).load()
+    assert [c["uid"] for c in loaded["subject_chapters_data"][subject]] == \
+        [c["uid"] for c in document["subject_chapters_data"][subject][1:]]
+
+
+def test_sqlite_replay_of_a_resent_batch(tmp_path, document):
+    subject, chapter = _first_chapter(document)
+    backend = SqliteBackend(str(tmp_path / "replay.db"))
+    backend.save_snapshot(document)
+    batch = _changes_to(subject, chapter)
+    backend.save_patches(batch)
+    backend.save_patches(batch)
+    assert chapter["uid"] not in {c["uid"] for c in backend.load()["subject_chapters_data"][subject]}
+
+
+def test_reconcile_stops_at_the_flushed_batch(tmp_path, document):
+    subject, chapter = _first_chapter(document)
+    wal = WriteAheadLog(str(tmp_path / "replay.wal"))
+    first = wal.append([patches.set_chapter_fields(subject, chapter["uid"], {"time_spent": 5})])
+    wal.append([patches.delete_chapter(subject, chapter["uid"])])
+
+    through_first = wal.reconcile(copy.deepcopy(document), through_seq=first.seq)
+    assert _first_chapter(through_first)[1]["time_spent"] == 5
+    everything = wal.reconcile(copy.deepcopy(document))
+    assert chapter["uid"] not in {c["uid"] for c in everything["subject_chapters_data"][subject]}
@@ -0,0 +1,86 @@
+"""The revision calendar: counts and year stats from a build, and hooks against a fresh build."""
+import datetime
+
+import numpy as np
+
+from benchmarks.synthetic import make_app_data
+from tracker.models import Chapter, Reminder, ReminderStatus
+from tracker.revision_calendar import RevisionCalendar, week_grid, year_stats
+
+SUBJECTS = ["Botany", "Zoology", "Physics", "Chemistry"]
+TODAY = datetime.date(2025, 1, 15) # A Wednesday
+
+
+def _days_ago(days, hour=9):
+    return datetime.datetime.combine(TODAY - datetime.timedelta(days=days), datetime.time(hour))
+
+
+def _revised(reminder_id, days_ago, due_days_ago=None):
+    due = _days_ago(days_ago if due_days_ago is None else due_days_ago)
+    return Reminder(reminder_id, "Extra", due, ReminderStatus.REVISED, revised_at=_days_ago(days_ago, 20))
+
+
+def test_build_counts_revisions_on_the_day_they_were_made():
+    optics = Chapter("Optics", _days_ago(900), [
+        _revised(1, 0), _revised(2, 1, due_days_ago=30), _revised(3, 2),
+        Reminder(4, "Extra", _days_ago(1), ReminderStatus.REVISED), # Revised before times were kept: counts when due
+        Reminder(5, "Extra", _days_ago(0)), # Pending
+        _revised(6, 800)]) # Before the window
+    cells = Chapter("Cells", _days_ago(900), [_revised(1, 5), Reminder(2, "Extra", "not a date", ReminderStatus.REVISED)])
+    calendar = RevisionCalendar.build({"Physics": [optics], "Botany": [cells], "Biology": []}, SUBJECTS, TODAY)
+
+    assert calendar.first_day.weekday() == 0 and calendar.days()[calendar.today_column] == TODAY
+    assert calendar.subjects == SUBJECTS + ["Biology"]
+    assert calendar.subject_totals() == {"Botany": 1, "Zoology": 0, "Physics": 4, "Chemistry": 0, "Biology": 0}
+    daily = calendar.daily()
+    today = calendar.today_column
+    assert daily[today - 5:today + 1].tolist() == [1, 0, 0, 1, 2, 1]
+    assert calendar.daily(["Botany", "Biology"]).sum() == 1
+    assert year_stats(daily, today) == {"revisions": 5, "active_days": 4, "streak": 3}
+    assert year_stats(calendar.daily(["Botany"]), today)["streak"] == 0
+
+    grid = week_grid(daily, today)
+    assert grid.shape == (7, 53)
+    assert np.isnan(grid[3:, -1]).all() and grid[2, -1] == 1 # Thursday on is still to come
+
+
+def test_year_stats_streak():
+    daily = np.zeros(400, dtype=np.int32)
+    daily[390:399] = 1
+    assert year_stats(daily, 399)["streak"] == 9 # Today has none yet: the streak ends yesterday
+    daily[399] = 2
+    assert year_stats(daily, 399) == {"revisions": 11, "active_days": 10, "streak": 10}
+    assert year_stats(np.ones(20, dtype=np.int32), 19)["streak"] == 20
+
+
+def test_hooks_keep_the_calendar_current():
+    subject_chapters = make_app_data(chapters=30, todos=0)["subject_chapters_data"]
+    today = max(r.time.date() for chapters in subject_chapters.values() for c in chapters for r in c.reminders)
+    calendar = RevisionCalendar.build(subject_chapters, SUBJECTS, today)
+
+    deleted = subject_chapters["Botany"].pop(0)
+    calendar.chapter_deleted("Botany", deleted)
+    chapter = subject_chapters["Physics"][0]
+    removed = chapter.reminders.pop(0)
+    calendar.reminder_removed("Physics", removed)
+    added = Reminder(len(chapter.reminders) + 1, "Extra", _days_ago(3), ReminderStatus.REVISED,
+                     revised_at=datetime.datetime.combine(today, datetime.time(8)))
+    chapter.reminders.append(added)
+    calendar.reminder_added("Physics", added)
+    for reminder in subject_chapters["Zoology"][0].reminders:
+        old_status, old_revised_at = reminder.status, reminder.revised_at
+        if old_status == ReminderStatus.REVISED:
+            reminder.status, reminder.revised_at = ReminderStatus.PENDING, None
+        else:
+            reminder.status, reminder.revised_at = ReminderStatus.REVISED, datetime.datetime.combine(today, datetime.time(7))
+        calendar.status_changed("Zoology", reminder, old_status, old_revised_at)
+    cells = Chapter("Cells", _days_ago(10), [Reminder(1, "Extra", datetime.datetime.combine(today, datetime.time(6)),
+                                                      ReminderStatus.REVISED)])
+    subject_chapters["Biology"] = [cells]
+    calendar.chapter_added("Biology", cells)
+
+    fresh = RevisionCalendar.build(subject_chapters, SUBJECTS, today)
+    assert calendar.subjects == fresh.subjects
+    assert np.array_equal(calendar.counts, fresh.counts)
+    assert calendar.version > 0 and fresh.version == 0
+    assert not calendar.covers(today + datetime.timedelta(days=1))
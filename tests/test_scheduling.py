@@ -0,0 +1,61 @@
+"""Lazy scheduling: SM-2 grades and intervals, and sync_chapter adding and withdrawing reminders."""
+import datetime
+
+from tracker import scheduling
+from tracker.models import Chapter, Reminder, ReminderStatus
+from tracker.scheduling import FixedIntervalScheduler, Sm2Scheduler
+
+ENTRY = datetime.datetime(2025, 1, 6, 18, 0)
+
+
+def _revise(reminder, days_late=0):
+    reminder.status = ReminderStatus.REVISED
+    reminder.revised_at = reminder.time + datetime.timedelta(days=days_late)
+
+
+def test_sm2_grade_from_lateness():
+    due = datetime.datetime(2025, 1, 10, 9, 0)
+    for revised_at, grade in ((due - datetime.timedelta(days=2), 5), (due.replace(hour=23), 5),
+                              (due + datetime.timedelta(days=1), 4), (due + datetime.timedelta(days=3), 3),
+                              (due + datetime.timedelta(days=4), 2)):
+        assert Sm2Scheduler.grade(Reminder(1, "1 day Reminder", due, ReminderStatus.REVISED, revised_at=revised_at)) == grade
+    assert Sm2Scheduler.grade(Reminder(1, "1 day Reminder", due, ReminderStatus.REVISED)) == 5 # Revised before times were kept
+
+
+def test_sm2_intervals_follow_the_grades():
+    chapter = Chapter("Optics", ENTRY, schedule=Sm2Scheduler().to_schedule())
+    intervals = []
+    for days_late in (0, 0, 0, 5):
+        added, removed = scheduling.sync_chapter(chapter)
+        assert len(added) == 1 and not removed
+        reminder = added[0]
+        base = chapter.reminders[-2].revised_at if len(chapter.reminders) > 1 else ENTRY
+        intervals.append((reminder.time - base).days)
+        _revise(reminder, days_late)
+    # 1 and 6 days, then the interval times the ease (2.7, then 2.8); a very late revision restarts at 1 day
+    assert intervals == [1, 6, 16, 45]
+    assert Sm2Scheduler().interval_days(chapter) == 1
+    assert Sm2Scheduler(max_interval_days=30).interval_days(Chapter("Optics", ENTRY, chapter.reminders[:3])) == 30
+
+
+def test_sync_chapter_withdraws_and_adds():
+    chapter = Chapter("Units", ENTRY, schedule=FixedIntervalScheduler([12, 72, 120]).to_schedule())
+    scheduling.sync_chapter(chapter)
+    first = chapter.reminders[0]
+    assert first.time == ENTRY + datetime.timedelta(hours=12) and first.type == "12 hour Reminder"
+    _revise(first)
+    added, _ = scheduling.sync_chapter(chapter)
+    assert [r.type for r in added] == ["3 days Reminder"]
+    assert scheduling.sync_chapter(chapter) == ([], []) # Nothing to do while the last one is pending
+
+    first.status = ReminderStatus.PENDING # Revision undone: the reminder it unlocked goes again
+    added, removed = scheduling.sync_chapter(chapter)
+    assert not added and [r.reminder_id for r in removed] == [2]
+    assert chapter.reminders == [first]
+
+    for _ in range(3):
+        _revise(chapter.reminders[-1])
+        scheduling.sync_chapter(chapter)
+    assert [r.type for r in chapter.reminders] == ["12 hour Reminder", "3 days Reminder", "5 days Reminder"]
+    assert scheduling.sync_chapter(chapter) == ([], []) # The fixed schedule is used up
+    assert scheduling.sync_chapter(Chapter("Unscheduled", ENTRY)) == ([], [])
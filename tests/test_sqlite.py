@@ -0,0 +1,21 @@
+"""SQLite backend: archiving with a snapshot is one transaction."""
+import pytest
+
+from tracker import patches
+from tracker.storage import SqliteBackend
+
+
+def test_archive_snapshot_rolls_back_as_a_whole(tmp_path, document):
+    backend = SqliteBackend(str(tmp_path / "archive.db"))
+    backend.save_snapshot(document)
+    subject = next(s for s, chapters in document["subject_chapters_data"].items() if chapters)
+    chapter = document["subject_chapters_data"][subject][0]
+    archive_patch = patches.archive_records([(subject, chapter)], [])
+    broken_snapshot = {"subject_chapters_data": {subject: [{"uid": "x", "reminders": [{"reminder_id": 1, "bad": object()}]}]},
+                       "todo_data": []}
+
+    with pytest.raises(TypeError): # Not JSON-serialisable: fails half way through the snapshot
+        backend.save_patches([archive_patch], snapshot=broken_snapshot)
+
+    assert backend.load_archive()["subject_chapters_data"] == {}
+    assert backend.load()["subject_chapters_data"][subject][0]["uid"] == chapter["uid"]
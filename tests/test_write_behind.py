@@ -0,0 +1,72 @@
+"""Retries of failed batches: partly written shards and errors that repeat on every attempt."""
+import threading
+
+import requests
+
+from tracker import patches
+from tracker.http_client import create_session, is_transient_error
+from tracker.storage import TODO_SHARD, ShardedJsonBinBackend
+from tracker.write_behind import WriteBehindQueue
+
+
+def _sharded(server, document):
+    shard_bin_ids = {name: f"shard-{name}" for name in list(document["subject_chapters_data"]) + [TODO_SHARD]}
+    return ShardedJsonBinBackend("key", "main", shard_bin_ids, base_url=server.base_url,
+                                 session=create_session(max_retries=0))
+
+
+def test_sharded_retry_after_a_partial_write(server, document):
+    backend = _sharded(server, document)
+    backend.save_patches([], snapshot=document)
+    todo = document["todo_data"][0]
+    batch = [patches.delete_chapter(subject, chapters[0]["uid"])
+             for subject, chapters in document["subject_chapters_data"].items() if chapters]
+    batch.append(patches.delete_todos([todo["uid"]]))
+    server.fail(f"shard-{TODO_SHARD}", 400) # The subject shards are written, the todo shard is not
+
+    try:
+        backend.save_patches(batch)
+    except requests.exceptions.HTTPError:
+        pass
+    else:
+        raise AssertionError("The injected failure should fail the save")
+    backend.save_patches(batch)
+
+    loaded = _sharded(server, document).load()
+    for subject, chapters in document["subject_chapters_data"].items():
+        assert [c["uid"] for c in loaded["subject_chapters_data"][subject]] == [c["uid"] for c in chapters[1:]]
+    assert todo["uid"] not in {t["uid"] for t in loaded["todo_data"]}
+
+
+def test_queue_stalls_on_a_repeated_error():
+    attempts = []
+    def flush(patch_list, snapshot, last_seq):
+        attempts.append(patch_list)
+        raise ValueError("Unsupported chapter field: 'colour'")
+    queue = WriteBehindQueue(flush, debounce_seconds=0, retry_seconds=0, max_failures=3, is_transient=is_transient_error)
+    queue.submit([{"op": "set_chapter_fields"}])
+
+    assert not queue.flush(timeout=5)
+    assert queue.status()["state"] == "stalled"
+    assert len(attempts) == 3
+    queue.submit([{"op": "append_todo"}])
+    assert queue.status()["pending"] == 2 # Kept, not sent
+
+    queue.retry()
+    assert not queue.flush(timeout=5)
+    assert len(attempts) == 6
+
+
+def test_queue_keeps_retrying_transient_errors():
+    attempts = []
+    recovered = threading.Event()
+    def flush(patch_list, snapshot, last_seq):
+        attempts.append(patch_list)
+        if len(attempts) < 5:
+            raise requests.exceptions.ConnectionError("Connection refused")
+        recovered.set()
+    queue = WriteBehindQueue(flush, debounce_seconds=0, retry_seconds=0, max_failures=2, is_transient=is_transient_error)
+    queue.submit([{"op": "append_todo"}])
+
+    assert queue.flush(timeout=5)
+    assert recovered.is_set() and queue.status()["state"] == "idle"
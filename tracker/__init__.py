@@ -0,0 +1 @@
+"""Streamlit-free building blocks for the NEET Prep Tracker (indexes, storage, analytics)."""
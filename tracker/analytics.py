@@ -0,0 +1,373 @@
+"""Columnar reminder table and the vectorized dashboard aggregates computed from it."""
+import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd # Imported by daily_counts only: pandas is slow to import and most reruns never need it
+
+from tracker.models import Chapter, Reminder, ReminderStatus
+
+STATUS_REVISED = ReminderStatus.REVISED
+STATUS_PENDING = ReminderStatus.PENDING
+
+
+class ReminderTable:
+    """One row per reminder, stored as parallel NumPy arrays.
+
+    Columns: ``subject_code`` (index into ``subjects``), ``due``
+    (``datetime64[s]``, NaT when the reminder has no valid time) and
+    ``status_code`` (index into ``status_names``). Built in a single pass over
+    ``subject_chapters_data``; afterwards every aggregate is a NumPy group-by.
+    Status edits patch the status column in place, and the ``chapter_added`` /
+    ``chapter_deleted`` / ``reminder_added`` / ``reminder_removed`` hooks (the
+    ``RevisionCalendar``'s signatures) append a row or move the last row into a removed one, so
+    the table never has to be rebuilt for an edit. Row order is not meaningful.
+    """
+
+    def __init__(self, subjects: List[str], subject_code: np.ndarray, due: np.ndarray, status_code: np.ndarray,
+                 status_names: List[str], reminders: List[Reminder]):
+        self.subjects = subjects
+        self.status_names = status_names
+        self._status_lookup = {name: code for code, name in enumerate(status_names)}
+        self._size = len(reminders)
+        # Column buffers with room to append; the public columns are views of their first ``_size`` rows
+        self._subject_code, self._due, self._status_code = subject_code, due, status_code
+        self._reminders = reminders # Row -> reminder, kept alive so ``id`` keys stay unique
+        self._row_of = {id(reminder): row for row, reminder in enumerate(reminders)}
+
+    @classmethod
+    def build(cls, subject_chapters_data: Dict[str, List[Chapter]], subject_order: List[str]) -> "ReminderTable":
+        subjects = list(subject_order) + [s for s in subject_chapters_data if s not in subject_order]
+        subject_lookup = {subject: code for code, subject in enumerate(subjects)}
+        status_names = [STATUS_PENDING, STATUS_REVISED]
+        status_lookup = {name: code for code, name in enumerate(status_names)}
+        subject_codes, due_times, status_codes, reminders = [], [], [], []
+        for subject, chapters in subject_chapters_data.items():
+            subject_code = subject_lookup[subject]
+            for chapter in chapters:
+                for reminder in chapter.reminders:
+                    reminders.append(reminder)
+                    subject_codes.append(subject_code)
+                    reminder_time_obj = reminder.time
+                    due_times.append(reminder_time_obj if isinstance(reminder_time_obj, datetime.datetime) else None)
+                    status = reminder.status
+                    if status not in status_lookup:
+                        status_lookup[status] = len(status_names)
+                        status_names.append(status)
+                    status_codes.append(status_lookup[status])
+        return cls(subjects,
+                   np.array(subject_codes, dtype=np.int16),
+                   np.array(due_times, dtype="datetime64[s]"),
+                   np.array(status_codes, dtype=np.int16),
+                   status_names, reminders)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def subject_code(self) -> np.ndarray:
+        return self._subject_code[:self._size]
+
+    @property
+    def due(self) -> np.ndarray:
+        return self._due[:self._size]
+
+    @property
+    def status_code(self) -> np.ndarray:
+        return self._status_code[:self._size]
+
+    def _code_of_status(self, status: str) -> int:
+        if status not in self._status_lookup:
+            self._status_lookup[status] = len(self.status_names)
+            self.status_names.append(status)
+        return self._status_lookup[status]
+
+    def set_status(self, reminder: Reminder, status: str) -> bool:
+        """Updates one row's status in place. Returns False if the reminder is not in the table."""
+        row = self._row_of.get(id(reminder))
+        if row is None:
+            return False
+        self._status_code[row] = self._code_of_status(status)
+        return True
+
+    def subject_code_of(self, reminder: Reminder) -> Optional[int]:
+        row = self._row_of.get(id(reminder))
+        return None if row is None else int(self._subject_code[row])
+
+    # ---------------- Maintenance hooks ----------------
+    def chapter_added(self, subject: str, chapter: Chapter):
+        for reminder in chapter.reminders:
+            self.reminder_added(subject, reminder)
+
+    def chapter_deleted(self, subject: str, chapter: Chapter):
+        for reminder in chapter.reminders:
+            self.reminder_removed(subject, reminder)
+
+    def reminder_added(self, subject: str, reminder: Reminder):
+        if id(reminder) in self._row_of:
+            return
+        if self._size == len(self._status_code): # Full: double the buffers
+            capacity = max(2 * self._size, 16)
+            self._subject_code = np.resize(self._subject_code, capacity)
+            self._due = np.resize(self._due, capacity)
+            self._status_code = np.resize(self._status_code, capacity)
+        if subject not in self.subjects:
+            self.subjects.append(subject)
+        row = self._size
+        self._subject_code[row] = self.subjects.index(subject)
+        self._due[row] = reminder.time if isinstance(reminder.time, datetime.datetime) else np.datetime64("NaT")
+        self._status_code[row] = self._code_of_status(reminder.status)
+        self._reminders.append(reminder)
+        self._row_of[id(reminder)] = row
+        self._size += 1
+
+    def reminder_removed(self, subject: str, reminder: Reminder):
+        row = self._row_of.pop(id(reminder), None)
+        if row is None:
+            return
+        last = self._size - 1
+        if row != last: # Move the last row into the gap
+            moved = self._reminders[last]
+            self._subject_code[row], self._due[row], self._status_code[row] = \
+                self._subject_code[last], self._due[last], self._status_code[last]
+            self._reminders[row] = moved
+            self._row_of[id(moved)] = row
+        self._reminders.pop()
+        self._size = last
+
+    # ---------------- Aggregates ----------------
+    def _revised_mask(self) -> np.ndarray:
+        return self.status_code == self._status_lookup[STATUS_REVISED]
+
+    def _date_mask(self, start_date: Optional[datetime.date], end_date: Optional[datetime.date]) -> np.ndarray:
+        mask = ~np.isnat(self.due)
+        days = self.due.astype("datetime64[D]")
+        if start_date is not None:
+            mask &= days >= np.datetime64(start_date, "D")
+        if end_date is not None:
+            mask &= days <= np.datetime64(end_date, "D")
+        return mask
+
+    def subject_progress(self, archived: Optional[Dict[str, Dict[str, int]]] = None) -> Dict[str, float]:
+        """Percentage of reminders marked Revised, per subject (0 for subjects without reminders).
+        ``archived`` adds archived counts (``tracker.archive`` summary ``subjects``) that are not in the table."""
+        minlength = len(self.subjects)
+        totals = np.bincount(self.subject_code, minlength=minlength).astype(np.float64)
+        revised = np.bincount(self.subject_code, weights=self._revised_mask(), minlength=minlength)
+        for subject, counts in (archived or {}).items():
+            if subject in self.subjects:
+                code = self.subjects.index(subject)
+                totals[code] += counts.get("reminders", 0)
+                revised[code] += counts.get("revised", 0)
+        progress = np.divide(revised * 100.0, totals, out=np.zeros(minlength), where=totals > 0)
+        return dict(zip(self.subjects, progress.tolist()))
+
+    def daily_counts(self, start_date: Optional[datetime.date] = None, end_date: Optional[datetime.date] = None) -> "pd.DataFrame":
+        """Per-day ``total`` and ``revised`` reminder counts, sorted by ``date``."""
+        import pandas as pd
+        mask = self._date_mask(start_date, end_date)
+        days = self.due[mask].astype("datetime64[D]")
+        if days.size == 0:
+            return pd.DataFrame({"date": pd.Series([], dtype=object), "total": pd.Series([], dtype=np.int64),
+                                 "revised": pd.Series([], dtype=np.int64)})
+        unique_days, inverse = np.unique(days, return_inverse=True)
+        totals = np.bincount(inverse, minlength=unique_days.size)
+        revised = np.bincount(inverse, weights=self._revised_mask()[mask], minlength=unique_days.size).astype(np.int64)
+        return pd.DataFrame({"date": unique_days.astype(object), "total": totals, "revised": revised})
+
+    def status_breakdown(self, start_date: Optional[datetime.date] = None, end_date: Optional[datetime.date] = None) -> Dict[str, int]:
+        """Reminder count per status for reminders due in the (optional) date range."""
+        codes = self.status_code[self._date_mask(start_date, end_date)] if (start_date or end_date) else self.status_code
+        counts = np.bincount(codes, minlength=len(self.status_names))
+        return {name: int(count) for name, count in zip(self.status_names, counts)}
+
+
+
+GRANULARITIES = ("Daily", "Weekly", "Monthly")
+
+
+class PeriodSeries:
+    """Reminder counts per bucket (day, week or month) of a period, as parallel arrays; empty buckets are left out."""
+
+    def __init__(self, starts: np.ndarray, total: np.ndarray, revised: np.ndarray, granularity: str):
+        self.starts = starts # datetime64[D], first day of each bucket, ascending
+        self.total = total
+        self.revised = revised
+        self.granularity = granularity
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def productivity(self) -> np.ndarray:
+        """Percentage of each bucket's reminders that are revised."""
+        return self.revised * 100.0 / self.total
+
+
+class DailyRollup:
+    """Reminder counts per subject and due day, with running totals for range queries.
+
+    ``total`` and ``revised`` have one row per subject (the ``ReminderTable``'s
+    subject codes) and one column per day from ``origin`` through the last due
+    day. ``cum_total`` and ``cum_revised`` are their prefix sums along the days,
+    with a leading zero column, so the count for any date range is two lookups
+    per subject whatever its length. A status edit patches one cell and the
+    running totals after it (a single vectorized add), and so do the
+    ``reminder_added`` / ``reminder_removed`` hooks, which first widen the
+    arrays when a reminder is due outside them. ``version`` goes up with every
+    edit, so anything drawn from the rollup can tell it is stale.
+    """
+
+    def __init__(self, subjects: List[str], origin: np.datetime64, total: np.ndarray, revised: np.ndarray):
+        self.subjects = subjects
+        self.origin = origin
+        self.total = total
+        self.revised = revised
+        self.cum_total = self._running(total)
+        self.cum_revised = self._running(revised)
+        self.version = 0
+
+    @staticmethod
+    def _running(counts: np.ndarray) -> np.ndarray:
+        running = np.zeros((counts.shape[0], counts.shape[1] + 1), dtype=np.int64)
+        np.cumsum(counts, axis=1, out=running[:, 1:])
+        return running
+
+    @classmethod
+    def build(cls, table: ReminderTable) -> "DailyRollup":
+        """One pass over the table: a bincount over (subject, day) cells."""
+        mask = ~np.isnat(table.due)
+        days = table.due[mask].astype("datetime64[D]")
+        subjects = len(table.subjects)
+        if days.size == 0:
+            empty = np.zeros((subjects, 0), dtype=np.int64)
+            return cls(table.subjects, np.datetime64(datetime.date.today(), "D"), empty, empty.copy())
+        origin = days.min()
+        span = int((days.max() - origin).astype(np.int64)) + 1
+        cells = table.subject_code[mask].astype(np.int64) * span + (days - origin).astype(np.int64)
+        total = np.bincount(cells, minlength=subjects * span).reshape(subjects, span)
+        revised = np.bincount(cells, weights=table._revised_mask()[mask], minlength=subjects * span)
+        return cls(table.subjects, origin, total, revised.astype(np.int64).reshape(subjects, span))
+
+    @property
+    def first_day(self) -> Optional[datetime.date]:
+        return self.origin.astype(object) if self.total.shape[1] else None
+
+    @property
+    def last_day(self) -> Optional[datetime.date]:
+        return (self.origin + self.total.shape[1] - 1).astype(object) if self.total.shape[1] else None
+
+    def _column(self, days: np.ndarray) -> np.ndarray:
+        """Running-total column at the start of each of ``days`` (clipped to the rollup)."""
+        return np.clip((days - self.origin).astype(np.int64), 0, self.total.shape[1])
+
+    def _rows(self, subjects: Optional[List[str]]) -> Any:
+        return slice(None) if subjects is None else [self.subjects.index(s) for s in subjects if s in self.subjects]
+
+    def bucket_counts(self, boundaries: np.ndarray, subjects: Optional[List[str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """``total`` and ``revised`` between consecutive ``boundaries`` (datetime64[D]; each bucket includes its
+        start and excludes the next boundary), summed over ``subjects`` (default all)."""
+        columns, rows = self._column(boundaries), self._rows(subjects)
+        total = self.cum_total[:, columns][rows].sum(axis=0)
+        revised = self.cum_revised[:, columns][rows].sum(axis=0)
+        return np.diff(total), np.diff(revised)
+
+    def status_changed(self, subject_code: Optional[int], due: Any, old_status: str, new_status: str) -> bool:
+        """Moves the reminder due at ``due`` between revised and not revised. Returns False if nothing changed."""
+        delta = (new_status == STATUS_REVISED) - (old_status == STATUS_REVISED)
+        if not delta or subject_code is None or not isinstance(due, datetime.datetime):
+            return False
+        column = int((np.datetime64(due.date(), "D") - self.origin).astype(np.int64))
+        if not 0 <= column < self.total.shape[1]:
+            return False
+        self.revised[subject_code, column] += delta
+        self.cum_revised[subject_code, column + 1:] += delta
+        self.version += 1
+        return True
+
+    # ---------------- Maintenance hooks ----------------
+    def chapter_added(self, subject: str, chapter: Chapter):
+        for reminder in chapter.reminders:
+            self.reminder_added(subject, reminder)
+
+    def chapter_deleted(self, subject: str, chapter: Chapter):
+        for reminder in chapter.reminders:
+            self.reminder_removed(subject, reminder)
+
+    def reminder_added(self, subject: str, reminder: Reminder) -> bool:
+        """Counts a new reminder on its due day. Returns False if it has no valid time."""
+        return self._count(subject, reminder, 1)
+
+    def reminder_removed(self, subject: str, reminder: Reminder) -> bool:
+        return self._count(subject, reminder, -1)
+
+    def _count(self, subject: str, reminder: Reminder, delta: int) -> bool:
+        if not isinstance(reminder.time, datetime.datetime):
+            return False
+        if subject not in self.subjects:
+            self.subjects.append(subject)
+        subject_code = self.subjects.index(subject)
+        column = self._cover(subject_code, np.datetime64(reminder.time.date(), "D"))
+        self.total[subject_code, column] += delta
+        self.cum_total[subject_code, column + 1:] += delta
+        if reminder.status == STATUS_REVISED:
+            self.revised[subject_code, column] += delta
+            self.cum_revised[subject_code, column + 1:] += delta
+        self.version += 1
+        return True
+
+    def _cover(self, subject_code: int, day: np.datetime64) -> int:
+        """Column of ``day``, after widening the arrays when the day (or the subject's row) is outside them."""
+        span = self.total.shape[1]
+        origin = min(self.origin, day) if span else day
+        end = max(self.origin + span, day + 1) if span else day + 1
+        shape = (max(self.total.shape[0], subject_code + 1), int((end - origin).astype(np.int64)))
+        if shape != self.total.shape:
+            before = int((self.origin - origin).astype(np.int64)) if span else 0
+            total, revised = np.zeros(shape, dtype=np.int64), np.zeros(shape, dtype=np.int64)
+            total[:self.total.shape[0], before:before + span] = self.total
+            revised[:self.revised.shape[0], before:before + span] = self.revised
+            self.origin, self.total, self.revised = origin, total, revised
+            self.cum_total, self.cum_revised = self._running(total), self._running(revised)
+        return int((day - self.origin).astype(np.int64))
+
+
+def bucket_boundaries(start_date: datetime.date, end_date: datetime.date, granularity: str) -> np.ndarray:
+    """Bucket starts from ``start_date`` through ``end_date`` plus the day after ``end_date``. Weeks start on
+    Monday and months on the 1st; the first bucket is cut short at ``start_date``."""
+    start, stop = np.datetime64(start_date, "D"), np.datetime64(end_date, "D") + 1
+    if granularity == "Daily":
+        inner = np.arange(start + 1, stop, dtype="datetime64[D]")
+    elif granularity == "Weekly":
+        first_monday = start - (start.astype(np.int64) + 3) % 7 + 7 # 1970-01-01 was a Thursday
+        inner = np.arange(first_monday, stop, 7, dtype="datetime64[D]")
+    elif granularity == "Monthly":
+        inner = np.arange(start.astype("datetime64[M]") + 1, stop.astype("datetime64[M]") + 1,
+                          dtype="datetime64[M]").astype("datetime64[D]")
+        inner = inner[inner < stop]
+    else:
+        raise ValueError(f"Unknown granularity {granularity!r}")
+    return np.concatenate([[start], inner[inner > start], [stop]]).astype("datetime64[D]")
+
+
+def period_series(rollups: List[DailyRollup], start_date: Optional[datetime.date], end_date: Optional[datetime.date],
+                  granularity: str, subjects: Optional[List[str]] = None) -> PeriodSeries:
+    """Counts per bucket over several rollups (e.g. live and archived reminders). Open ends take the outermost
+    day any rollup covers. Each bucket costs a few running-total lookups, whatever the range."""
+    covered = [rollup for rollup in rollups if rollup.total.shape[1]]
+    if not covered:
+        return PeriodSeries(np.array([], dtype="datetime64[D]"), np.zeros(0, np.int64), np.zeros(0, np.int64), granularity)
+    start_date = start_date if start_date is not None else min(rollup.first_day for rollup in covered)
+    end_date = end_date if end_date is not None else max(rollup.last_day for rollup in covered)
+    if end_date < start_date:
+        return PeriodSeries(np.array([], dtype="datetime64[D]"), np.zeros(0, np.int64), np.zeros(0, np.int64), granularity)
+    boundaries = bucket_boundaries(start_date, end_date, granularity)
+    total = np.zeros(len(boundaries) - 1, dtype=np.int64)
+    revised = np.zeros(len(boundaries) - 1, dtype=np.int64)
+    for rollup in covered:
+        rollup_total, rollup_revised = rollup.bucket_counts(boundaries, subjects)
+        total += rollup_total
+        revised += rollup_revised
+    kept = total > 0
+    return PeriodSeries(boundaries[:-1][kept], total[kept], revised[kept], granularity)
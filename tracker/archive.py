@@ -0,0 +1,119 @@
+"""Archive tier: finished chapters and old completed todos moved out of the live document.
+
+The live ("hot") document is what every load and save handles, so it should
+only hold what the day-to-day views use. Chapters whose reminders were all
+revised before a cutoff, and completed todos created before it, move to an
+archive record of the same layout. The archive is read only when a view needs
+the whole history (All Time productivity, exports).
+
+Moving records is one ``archive_records`` patch (see ``tracker.patches``): it
+removes them from the hot document and carries their encoded bodies, so a
+backend can add them to its archive in the same save. The hot document keeps
+an ``archive_summary`` of the archived counts, so subject progress stays
+correct without reading the archive. Functions here work on encoded
+(JSON-ready) records, like ``apply_patch``.
+"""
+import datetime
+from typing import Dict, List, Any, Set, Tuple
+
+from tracker import scheduling
+from tracker.models import Chapter, ReminderStatus, Todo, TodoStatus
+
+ARCHIVE_SUMMARY_KEY = "archive_summary" # Top-level key of the hot document
+
+
+def chapter_is_archivable(chapter: Chapter, cutoff: datetime.datetime) -> bool:
+    """True when the chapter has reminders, all of them revised, and the last one due and revised before ``cutoff``.
+
+    An adaptive (SM-2) schedule never runs out, so its chapters always end with a
+    pending reminder. They count as finished once the interval has grown to the
+    scheduler's ``max_interval_days``; the pending reminder is then left out of
+    the check and archived with the chapter.
+    """
+    reminders = chapter.reminders
+    scheduler = scheduling.scheduler_for(chapter)
+    if isinstance(scheduler, scheduling.Sm2Scheduler):
+        if scheduler.interval_days(chapter) < scheduler.max_interval_days:
+            return False
+        if reminders and reminders[-1].status != ReminderStatus.REVISED:
+            reminders = reminders[:-1]
+    if not reminders:
+        return False
+    for reminder in reminders:
+        if reminder.status != ReminderStatus.REVISED:
+            return False
+        for moment in (reminder.time, reminder.revised_at):
+            if moment is not None and (not isinstance(moment, datetime.datetime) or moment >= cutoff):
+                return False
+    return True
+
+
+def todo_is_archivable(todo: Todo, cutoff: datetime.datetime) -> bool:
+    """True for completed todos created before ``cutoff``; pending ones stay live however old they are."""
+    return todo.status == TodoStatus.COMPLETED and isinstance(todo.timestamp, datetime.datetime) and todo.timestamp < cutoff
+
+
+def select_archivable(subject_chapters_data: Dict[str, List[Chapter]], todo_data: List[Todo],
+                      cutoff: datetime.datetime) -> Tuple[List[Tuple[str, Chapter]], List[Todo]]:
+    chapters = [(subject, chapter) for subject, subject_chapters in subject_chapters_data.items()
+                for chapter in subject_chapters if chapter.uid is not None and chapter_is_archivable(chapter, cutoff)]
+    todos = [todo for todo in todo_data if todo.uid is not None and todo_is_archivable(todo, cutoff)]
+    return chapters, todos
+
+
+# ---------------------------- SUMMARY ----------------------------
+def empty_summary() -> Dict[str, Any]:
+    return {"subjects": {}, "todos": 0}
+
+
+def summarize_patch(patch: Dict[str, Any]) -> Dict[str, Any]:
+    """Archived counts carried by an encoded ``archive_records`` patch: per subject chapters, reminders and
+    revised reminders, plus todos."""
+    summary = empty_summary()
+    for entry in patch["chapters"]:
+        counts = summary["subjects"].setdefault(entry["subject"], {"chapters": 0, "reminders": 0, "revised": 0})
+        reminders = entry["chapter"].get("reminders", [])
+        counts["chapters"] += 1
+        counts["reminders"] += len(reminders)
+        counts["revised"] += sum(1 for reminder in reminders if reminder.get("status") == ReminderStatus.REVISED)
+    summary["todos"] = len(patch["todos"])
+    return summary
+
+
+def add_summary(summary: Dict[str, Any], other: Dict[str, Any]):
+    """Adds ``other``'s counts to ``summary`` in place."""
+    for subject, counts in other.get("subjects", {}).items():
+        target = summary.setdefault("subjects", {}).setdefault(subject, {"chapters": 0, "reminders": 0, "revised": 0})
+        for key, value in counts.items():
+            target[key] = target.get(key, 0) + value
+    summary["todos"] = summary.get("todos", 0) + other.get("todos", 0)
+
+
+def archived_chapter_count(summary: Dict[str, Any]) -> int:
+    return sum(counts.get("chapters", 0) for counts in summary.get("subjects", {}).values())
+
+
+# ---------------------------- ARCHIVE RECORD ----------------------------
+def empty_archive() -> Dict[str, Any]:
+    return {"subject_chapters_data": {}, "todo_data": []}
+
+
+def add_to_archive(archive: Dict[str, Any], patch: Dict[str, Any]):
+    """Adds an encoded ``archive_records`` patch's records to an encoded archive document in place.
+    Records already there (by uid) are skipped, so retrying a save that half succeeded is harmless."""
+    chapters_by_subject = archive.setdefault("subject_chapters_data", {})
+    todo_data = archive.setdefault("todo_data", [])
+    known_chapters = {chapter.get("uid") for chapters in chapters_by_subject.values() for chapter in chapters}
+    known_todos = {todo.get("uid") for todo in todo_data}
+    for entry in patch["chapters"]:
+        if entry["chapter"].get("uid") not in known_chapters:
+            chapters_by_subject.setdefault(entry["subject"], []).append(entry["chapter"])
+    todo_data.extend(todo for todo in patch["todos"] if todo.get("uid") not in known_todos)
+
+
+def drop_live_records(archive: Dict[str, Any], live_chapter_uids: Set[str], live_todo_uids: Set[str]):
+    """Removes records that are also in the hot document from a decoded archive, in place. They overlap only
+    when an archive write succeeded and the hot save after it did not; the hot copy wins."""
+    for subject, chapters in archive.get("subject_chapters_data", {}).items():
+        chapters[:] = [chapter for chapter in chapters if chapter.uid not in live_chapter_uids]
+    archive["todo_data"] = [todo for todo in archive.get("todo_data", []) if todo.uid not in live_todo_uids]
@@ -0,0 +1,178 @@
+"""Bulk import of chapters and todos from CSV or JSON, validated row by row.
+
+Every row is checked in one pass. Valid rows become ready-made records (chapters
+already hold their first scheduled reminder) and invalid rows are reported with
+their row number, so one bad line does not hold back the rest of the file.
+
+CSV files have a header row with any of ``IMPORT_COLUMNS``. JSON files hold
+either a list of row objects with the same keys, or
+``{"chapters": [...], "todos": [...]}``. ``kind`` may be left out: rows with a
+``task`` and no ``chapter_name`` are todos, everything else is a chapter.
+"""
+import csv
+import datetime
+import io
+import json
+from typing import Dict, List, Any, Iterable, Optional, Set, Tuple
+
+from tracker import records, scheduling
+from tracker.models import Chapter, Todo, TodoStatus
+
+IMPORT_COLUMNS = ["kind", "subject", "chapter_name", "entry_datetime", "schedule", "intervals_hours", "task", "status"]
+IMPORT_FILE_TYPES = ["csv", "json"]
+MAX_INTERVAL_HOURS = 24 * 366 * 5 # Longest revision interval accepted, five years
+ENTRY_DATETIME_FORMATS = ("%Y-%m-%d %H:%M", "%Y-%m-%d", "%d/%m/%Y %H:%M", "%d/%m/%Y", "%d/%m/%y %I:%M %p")
+IMPORT_TEMPLATE_CSV = (",".join(IMPORT_COLUMNS) + "\n"
+                       "chapter,Physics,Units and Measurements,2025-01-06 18:00,fixed,12;72;120,,\n"
+                       "chapter,Botany,Cell: The Unit of Life,2025-01-06,sm2,,,\n"
+                       "todo,,,,,,Solve 30 MCQs on kinematics,Pending\n")
+
+
+class ImportResult:
+    def __init__(self):
+        self.chapters: List[Tuple[str, Chapter]] = [] # (subject, chapter) in file order
+        self.todos: List[Todo] = []
+        self.errors: List[Tuple[int, str]] = [] # (row number, message); CSV rows count from 2, after the header
+
+    @property
+    def rows_ok(self) -> int:
+        return len(self.chapters) + len(self.todos)
+
+
+def read_rows(data: bytes, file_type: str) -> List[Tuple[int, Dict[str, Any]]]:
+    """``(row number, row)`` pairs from a CSV or JSON file; raises ``ValueError`` for a file that cannot be read at all."""
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        raise ValueError(f"File is not UTF-8 text: {e}")
+    if file_type == "csv":
+        reader = csv.DictReader(io.StringIO(text))
+        if not reader.fieldnames or not set(reader.fieldnames) & set(IMPORT_COLUMNS):
+            raise ValueError(f"CSV header must name some of: {', '.join(IMPORT_COLUMNS)}")
+        return [(reader.line_num, row) for row in reader]
+    if file_type == "json":
+        try:
+            document = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+        if isinstance(document, dict):
+            rows = [{"kind": "chapter", **row} if isinstance(row, dict) else row for row in document.get("chapters", [])]
+            rows += [{"kind": "todo", **row} if isinstance(row, dict) else row for row in document.get("todos", [])]
+        elif isinstance(document, list):
+            rows = document
+        else:
+            raise ValueError("JSON must be a list of rows or an object with \"chapters\" and \"todos\" lists")
+        return list(enumerate(rows, start=1))
+    raise ValueError(f"Unsupported import file type: {file_type!r}")
+
+
+def _text(row: Dict[str, Any], key: str) -> str:
+    value = row.get(key)
+    return "" if value is None else str(value).strip()
+
+
+def _parse_entry_datetime(value: str, now: datetime.datetime) -> datetime.datetime:
+    if not value:
+        return now
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    for fmt in ENTRY_DATETIME_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognised entry_datetime {value!r} (use e.g. 2025-01-06 18:00)")
+
+
+def _parse_intervals(value: Any) -> Optional[List[float]]:
+    if value in (None, "", []):
+        return None
+    parts = value if isinstance(value, list) else str(value).replace(",", ";").split(";")
+    try:
+        intervals = [float(part) for part in parts if str(part).strip()]
+    except ValueError:
+        raise ValueError(f"intervals_hours must be numbers separated by ';', got {value!r}")
+    if not intervals or not all(0 < hours <= MAX_INTERVAL_HOURS for hours in intervals):
+        raise ValueError(f"intervals_hours must be positive and at most {MAX_INTERVAL_HOURS}")
+    return [int(hours) if hours.is_integer() else hours for hours in intervals]
+
+
+def _schedule(row: Dict[str, Any], default_schedule: Dict[str, Any]) -> Dict[str, Any]:
+    name = _text(row, "schedule").lower()
+    intervals = _parse_intervals(row.get("intervals_hours"))
+    if not name:
+        if intervals is None:
+            return dict(default_schedule)
+        name = scheduling.FixedIntervalScheduler.name
+    if name not in scheduling.SCHEDULERS:
+        raise ValueError(f"unknown schedule {name!r} (use one of: {', '.join(scheduling.SCHEDULERS)})")
+    if name == scheduling.FixedIntervalScheduler.name:
+        if intervals is None and default_schedule.get("scheduler") == name:
+            intervals = default_schedule.get("intervals_hours")
+        return (scheduling.FixedIntervalScheduler(intervals) if intervals else scheduling.FixedIntervalScheduler()).to_schedule()
+    if intervals is not None:
+        raise ValueError("intervals_hours only applies to the fixed schedule")
+    return scheduling.SCHEDULERS[name]().to_schedule()
+
+
+def parse_rows(rows: Iterable[Tuple[int, Any]], subjects: List[str], default_schedule: Dict[str, Any],
+               existing_chapters: Set[Tuple[str, str]] = frozenset(), now: Optional[datetime.datetime] = None) -> ImportResult:
+    """Validates every row and builds the records for the valid ones.
+
+    ``existing_chapters`` holds ``(subject, lower-cased chapter name)`` pairs
+    already stored; rows repeating one of those, or an earlier row of the same
+    file, are reported instead of imported.
+    """
+    now = (now or datetime.datetime.now()).replace(second=0, microsecond=0)
+    subject_names = {subject.lower(): subject for subject in subjects}
+    seen_chapters: Dict[Tuple[str, str], int] = {}
+    result = ImportResult()
+    for row_number, row in rows:
+        if not isinstance(row, dict):
+            result.errors.append((row_number, "row is not an object"))
+            continue
+        if not any(_text(row, key) for key in row): # Blank CSV line
+            continue
+        kind = _text(row, "kind").lower() or ("todo" if _text(row, "task") and not _text(row, "chapter_name") else "chapter")
+        try:
+            if kind == "chapter":
+                subject = subject_names.get(_text(row, "subject").lower())
+                if subject is None:
+                    raise ValueError(f"unknown subject {_text(row, 'subject')!r} (use one of: {', '.join(subjects)})")
+                chapter_name = _text(row, "chapter_name")
+                if not chapter_name:
+                    raise ValueError("chapter_name is required")
+                key = (subject, chapter_name.lower())
+                if key in existing_chapters:
+                    raise ValueError(f"'{chapter_name}' already exists in {subject}")
+                if key in seen_chapters:
+                    raise ValueError(f"'{chapter_name}' repeats row {seen_chapters[key]}")
+                chapter = Chapter(chapter_name, _parse_entry_datetime(_text(row, "entry_datetime"), now),
+                                  uid=records.new_uid(), schedule=_schedule(row, default_schedule))
+                scheduling.sync_chapter(chapter) # First reminder
+                seen_chapters[key] = row_number
+                result.chapters.append((subject, chapter))
+            elif kind == "todo":
+                task = _text(row, "task")
+                if not task:
+                    raise ValueError("task is required")
+                status = _text(row, "status").capitalize() or TodoStatus.PENDING
+                if status not in (TodoStatus.PENDING, TodoStatus.COMPLETED):
+                    raise ValueError(f"todo status must be Pending or Completed, got {status!r}")
+                result.todos.append(Todo(task, status, _parse_entry_datetime(_text(row, "entry_datetime"), now), uid=records.new_uid()))
+            else:
+                raise ValueError(f"kind must be 'chapter' or 'todo', got {kind!r}")
+        except ValueError as e:
+            result.errors.append((row_number, str(e)))
+        except OverflowError: # A reminder past year 9999
+            result.errors.append((row_number, "entry_datetime is too far in the future to schedule reminders"))
+    return result
+
+
+def load_import(data: bytes, file_name: str, subjects: List[str], default_schedule: Dict[str, Any],
+                existing_chapters: Set[Tuple[str, str]] = frozenset()) -> ImportResult:
+    """Reads and validates an uploaded file; raises ``ValueError`` only when the file itself is unreadable."""
+    file_type = file_name.rsplit(".", 1)[-1].lower() if "." in file_name else ""
+    return parse_rows(read_rows(data, file_type), subjects, default_schedule, existing_chapters)
@@ -0,0 +1,57 @@
+"""Vega-Lite specs for the lightweight chart renderer.
+
+The specs are plain dicts with their data inlined, drawn with
+``st.vega_lite_chart``. Building them needs neither Plotly nor a DataFrame, and
+the browser draws them with far less script than a Plotly figure. The app uses
+them when "Lightweight charts" is on, and for trends too long to draw well with
+markers.
+"""
+import datetime
+from typing import Dict, List, Any, Sequence
+
+
+def pie_spec(counts: Dict[str, int], colors: Dict[str, str], title: str) -> Dict[str, Any]:
+    """Donut of ``counts``, one slice per key in ``colors`` order."""
+    order = list(colors)
+    return {
+        "title": title,
+        "data": {"values": [{"Status": status, "Count": int(counts.get(status, 0))} for status in order]},
+        "mark": {"type": "arc", "innerRadius": 40, "tooltip": True},
+        "encoding": {
+            "theta": {"field": "Count", "type": "quantitative", "stack": True},
+            "color": {"field": "Status", "type": "nominal",
+                      "scale": {"domain": order, "range": [colors[status] for status in order]}},
+            "order": {"field": "Status", "sort": "ascending"},
+        },
+    }
+
+
+def line_spec(days: Sequence[datetime.date], values: Sequence[float], value_title: str, title: str) -> Dict[str, Any]:
+    """Daily trend of ``values``; points are drawn only for short series."""
+    rows: List[Dict[str, Any]] = [{"Date": day.isoformat(), value_title: round(float(value), 2)} for day, value in zip(days, values)]
+    return {
+        "title": title,
+        "data": {"values": rows},
+        "mark": {"type": "line", "point": len(rows) <= 62, "tooltip": True},
+        "encoding": {
+            "x": {"field": "Date", "type": "temporal", "timeUnit": "yearmonthdate", "title": "Date"},
+            "y": {"field": value_title, "type": "quantitative"},
+        },
+    }
+
+
+def heatmap_spec(days: Sequence[datetime.date], values: Sequence[int], title: str) -> Dict[str, Any]:
+    """Calendar heatmap: one column per week (Monday first), one row per weekday."""
+    rows = [{"Week": (day - datetime.timedelta(days=day.weekday())).isoformat(), "Day": day.strftime("%a"),
+             "Date": day.strftime("%d %b %Y"), "Revisions": int(value)} for day, value in zip(days, values)]
+    return {
+        "title": title,
+        "data": {"values": rows},
+        "mark": {"type": "rect", "cornerRadius": 2, "tooltip": True},
+        "encoding": {
+            "x": {"field": "Week", "type": "ordinal", "title": None, "axis": {"labels": False, "ticks": False}},
+            "y": {"field": "Day", "type": "ordinal", "title": None, "sort": ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]},
+            "color": {"field": "Revisions", "type": "quantitative", "scale": {"scheme": "greens"}},
+            "tooltip": [{"field": "Date"}, {"field": "Revisions", "type": "quantitative"}],
+        },
+    }
@@ -0,0 +1,156 @@
+"""Versioned schema codec between the in-memory document and its JSON-ready form.
+
+The document layout is fixed: ``subject_chapters_data`` maps a subject to a
+list of chapters, each chapter holds a list of reminders, and ``todo_data`` is a
+list of todos. In memory the records are the slotted ``tracker.models`` classes;
+this module is the only place they are turned into (and built from) plain dicts.
+Keys the schema does not know about are kept in each record's ``extra`` and
+written back unchanged (datetimes converted), so older or hand-edited records
+survive a round trip.
+"""
+import datetime
+from enum import Enum
+from typing import Dict, List, Any, Optional
+
+from tracker.models import Chapter, Reminder, Todo
+
+SCHEMA_VERSION = 1
+SCHEMA_VERSION_KEY = "schema_version" # Stored next to the data; records without it are version 1
+DATA_REVISION_KEY = "data_revision" # Session-only edit counter on the in-memory document; never stored
+IDS_UNSAVED_KEY = "ids_unsaved" # Session-only: record IDs were assigned on load; the next save must be a snapshot
+
+CHAPTER_KEYS = frozenset(("uid", "chapter_name", "entry_datetime", "reminders", "exams_appeared", "exam_status", "time_spent",
+                          "schedule"))
+REMINDER_KEYS = frozenset(("reminder_id", "type", "time", "status", "revised_at"))
+TODO_KEYS = frozenset(("uid", "task", "status", "timestamp"))
+
+
+def _encode_value(value: Any) -> Any:
+    """Fallback for values outside the schema: converts datetimes and enums, and copies containers."""
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, dict):
+        return {k: _encode_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_encode_value(v) for v in value]
+    return value
+
+
+def _iso(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime.datetime) else value
+
+
+def _plain(value: Any) -> Any:
+    return value.value if isinstance(value, Enum) else value
+
+
+def _parse_datetime(value: Any) -> Any:
+    if isinstance(value, str):
+        try:
+            return datetime.datetime.fromisoformat(value)
+        except ValueError:
+            pass # Keep as string if invalid
+    return value
+
+
+def _extra(record: Dict[str, Any], known_keys: frozenset) -> Optional[Dict[str, Any]]:
+    if record.keys() <= known_keys: # The usual case; checked without building a dict
+        return None
+    return {k: v for k, v in record.items() if k not in known_keys}
+
+
+# ---------------------------- ENCODE ----------------------------
+def encode_reminder(reminder: Reminder) -> Dict[str, Any]:
+    encoded = {"reminder_id": reminder.reminder_id, "type": _plain(reminder.type),
+               "time": _iso(reminder.time), "status": _plain(reminder.status)}
+    if reminder.revised_at is not None:
+        encoded["revised_at"] = _iso(reminder.revised_at)
+    if reminder.extra:
+        encoded.update(_encode_value(reminder.extra))
+    return encoded
+
+
+def encode_chapter(chapter: Chapter) -> Dict[str, Any]:
+    encoded = {"chapter_name": chapter.chapter_name, "entry_datetime": _iso(chapter.entry_datetime),
+               "reminders": [encode_reminder(r) for r in chapter.reminders],
+               "exams_appeared": chapter.exams_appeared, "exam_status": chapter.exam_status,
+               "time_spent": chapter.time_spent}
+    if chapter.uid is not None:
+        encoded["uid"] = chapter.uid
+    if chapter.schedule is not None:
+        encoded["schedule"] = _encode_value(chapter.schedule)
+    if chapter.extra:
+        encoded.update(_encode_value(chapter.extra))
+    return encoded
+
+
+def encode_todo(todo: Todo) -> Dict[str, Any]:
+    encoded = {"task": todo.task, "status": _plain(todo.status), "timestamp": _iso(todo.timestamp)}
+    if todo.uid is not None:
+        encoded["uid"] = todo.uid
+    if todo.extra:
+        encoded.update(_encode_value(todo.extra))
+    return encoded
+
+
+def encode_document(app_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Builds a new JSON-ready document; ``app_data`` is not modified and shares no containers with the result."""
+    encoded = {k: _encode_value(v) for k, v in app_data.items()
+               if k not in ("subject_chapters_data", "todo_data", DATA_REVISION_KEY, IDS_UNSAVED_KEY)}
+    encoded[SCHEMA_VERSION_KEY] = SCHEMA_VERSION
+    encoded["subject_chapters_data"] = {subject: [encode_chapter(c) for c in chapters]
+                                        for subject, chapters in app_data.get("subject_chapters_data", {}).items()}
+    encoded["todo_data"] = [encode_todo(t) for t in app_data.get("todo_data", [])]
+    return encoded
+
+
+def encode_patch(patch: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-ready copy of a ``tracker.patches`` patch."""
+    op = patch.get("op")
+    if op == "append_chapter":
+        return {**patch, "chapter": encode_chapter(patch["chapter"])}
+    if op == "append_todo":
+        return {**patch, "todo": encode_todo(patch["todo"])}
+    if op == "append_reminder":
+        return {**patch, "reminder": encode_reminder(patch["reminder"])}
+    if op == "archive_records":
+        return {**patch, "chapters": [{"subject": entry["subject"], "chapter": encode_chapter(entry["chapter"])} for entry in patch["chapters"]],
+                "todos": [encode_todo(t) for t in patch["todos"]]}
+    return _encode_value(patch)
+
+
+# ---------------------------- DECODE ----------------------------
+def decode_reminder(record: Dict[str, Any]) -> Reminder:
+    return Reminder(record.get("reminder_id"), record.get("type"), _parse_datetime(record.get("time")),
+                    record.get("status", "Pending"), _extra(record, REMINDER_KEYS), _parse_datetime(record.get("revised_at")))
+
+
+def decode_chapter(record: Dict[str, Any]) -> Chapter:
+    return Chapter(record.get("chapter_name"), _parse_datetime(record.get("entry_datetime")),
+                   [decode_reminder(r) for r in record.get("reminders", [])],
+                   record.get("exams_appeared", 0), record.get("exam_status", "Not Appeared"), record.get("time_spent", 0),
+                   record.get("uid"), _extra(record, CHAPTER_KEYS), record.get("schedule"))
+
+
+def decode_todo(record: Dict[str, Any]) -> Todo:
+    return Todo(record.get("task"), record.get("status", "Pending"), _parse_datetime(record.get("timestamp")),
+                record.get("uid"), _extra(record, TODO_KEYS))
+
+
+def decode_document(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Replaces the record dicts in ``record`` with model objects in place and returns ``record``.
+
+    ``record`` must be freshly loaded (not shared), as it is modified. Raises
+    ``ValueError`` for a record written by a newer schema version.
+    """
+    version = record.pop(SCHEMA_VERSION_KEY, SCHEMA_VERSION)
+    if not isinstance(version, int) or version > SCHEMA_VERSION:
+        raise ValueError(f"Unsupported data schema version: {version!r} (this app reads up to {SCHEMA_VERSION})")
+    chapters_by_subject: Dict[str, List[Chapter]] = record.get("subject_chapters_data", {})
+    for subject, chapters in chapters_by_subject.items():
+        chapters_by_subject[subject] = [decode_chapter(c) for c in chapters]
+    if "todo_data" in record:
+        record["todo_data"] = [decode_todo(t) for t in record["todo_data"]]
+    return record
@@ -0,0 +1,144 @@
+"""Chunked study-data export to CSV, JSON Lines and (when pyarrow is installed) Parquet."""
+import csv
+import datetime
+import importlib.util
+import json
+import os
+import tempfile
+import weakref
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from tracker.models import Chapter
+
+EXPORT_COLUMNS = ["Subject", "Chapter Name", "Entry Date", "Reminder Time", "Status",
+                  "Exams Appeared", "Exam Status", "Time Spent (minutes)"]
+CSV_DATETIME_FORMAT = "%d/%m/%y %I:%M %p"
+
+# Display name -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "JSON Lines": ("jsonl", "application/x-ndjson"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+ExportRow = Tuple[str, str, Optional[datetime.datetime], Optional[datetime.datetime], str, int, str, int]
+
+
+def available_formats() -> List[str]:
+    """Parquet only when pyarrow is installed; it is imported when a Parquet export is built, not before."""
+    return [name for name in EXPORT_FORMATS if name != "Parquet" or importlib.util.find_spec("pyarrow") is not None]
+
+
+def iter_export_rows(subject_chapters_data: Dict[str, List[Chapter]]) -> Iterator[ExportRow]:
+    """One row per reminder, datetimes left as objects (``None`` when missing or invalid)."""
+    for subject, chapters in subject_chapters_data.items():
+        for chapter in chapters:
+            entry_dt = chapter.entry_datetime if isinstance(chapter.entry_datetime, datetime.datetime) else None
+            chapter_name = chapter.chapter_name if chapter.chapter_name is not None else 'N/A'
+            for reminder in chapter.reminders:
+                reminder_time = reminder.time
+                yield (subject, chapter_name, entry_dt,
+                       reminder_time if isinstance(reminder_time, datetime.datetime) else None,
+                       str(reminder.status), chapter.exams_appeared, chapter.exam_status, chapter.time_spent)
+
+
+def _iter_chunks(rows: Iterator[ExportRow], chunk_rows: int) -> Iterator[List[ExportRow]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _write_csv(rows: Iterator[ExportRow], path: str, chunk_rows: int):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_COLUMNS)
+        for chunk in _iter_chunks(rows, chunk_rows):
+            writer.writerows(
+                (subject, name, entry.strftime(CSV_DATETIME_FORMAT) if entry else 'N/A',
+                 due.strftime(CSV_DATETIME_FORMAT) if due else 'N/A', status, exams, exam_status, minutes)
+                for subject, name, entry, due, status, exams, exam_status, minutes in chunk)
+
+
+def _write_jsonl(rows: Iterator[ExportRow], path: str, chunk_rows: int):
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in _iter_chunks(rows, chunk_rows):
+            f.writelines(
+                json.dumps(dict(zip(EXPORT_COLUMNS, (subject, name, entry.isoformat() if entry else None,
+                                                     due.isoformat() if due else None, status, exams, exam_status, minutes)))) + "\n"
+                for subject, name, entry, due, status, exams, exam_status, minutes in chunk)
+
+
+def _write_parquet(rows: Iterator[ExportRow], path: str, chunk_rows: int):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = pa.schema([
+        ("Subject", pa.string()), ("Chapter Name", pa.string()),
+        ("Entry Date", pa.timestamp("s")), ("Reminder Time", pa.timestamp("s")),
+        ("Status", pa.string()), ("Exams Appeared", pa.int64()),
+        ("Exam Status", pa.string()), ("Time Spent (minutes)", pa.int64()),
+    ])
+    with pq.ParquetWriter(path, schema) as writer: # One row group per chunk
+        for chunk in _iter_chunks(rows, chunk_rows):
+            columns = list(zip(*chunk))
+            writer.write_table(pa.Table.from_arrays([pa.array(col, type=field.type) for col, field in zip(columns, schema)], schema=schema))
+
+
+_WRITERS = {"CSV": _write_csv, "JSON Lines": _write_jsonl, "Parquet": _write_parquet}
+
+
+def write_export(subject_chapters_data: Dict[str, List[Chapter]], export_format: str, path: str, chunk_rows: int = 5000):
+    """Streams the export to ``path`` ``chunk_rows`` rows at a time, so memory does not grow with the history."""
+    if export_format not in available_formats():
+        raise ValueError(f"Export format not available: {export_format}")
+    _WRITERS[export_format](iter_export_rows(subject_chapters_data), path, chunk_rows)
+
+
+def _remove_files(files: Dict[str, Tuple[int, str]], export_format: Optional[str] = None):
+    for fmt in ([export_format] if export_format else list(files)):
+        cached = files.pop(fmt, None)
+        if cached and os.path.exists(cached[1]):
+            os.remove(cached[1])
+
+
+class ExportCache:
+    """Per-session export files keyed by data revision; an edit makes the next request rebuild the file.
+
+    A rebuilt file replaces the old one on disk. The files left are removed when
+    the cache is garbage collected (its session ended) or at interpreter exit.
+    """
+
+    def __init__(self, chunk_rows: int = 5000):
+        self.chunk_rows = chunk_rows
+        self._files: Dict[str, Tuple[int, str]] = {} # format -> (revision, path)
+        self._finalizer = weakref.finalize(self, _remove_files, self._files)
+
+    def get(self, revision: int, export_format: str) -> Optional[str]:
+        cached = self._files.get(export_format)
+        if cached and cached[0] == revision and os.path.exists(cached[1]):
+            return cached[1]
+        return None
+
+    def build(self, revision: int, export_format: str, subject_chapters_data: Dict[str, List[Chapter]]) -> str:
+        cached_path = self.get(revision, export_format)
+        if cached_path:
+            return cached_path
+        self.discard(export_format)
+        extension = EXPORT_FORMATS[export_format][0]
+        fd, path = tempfile.mkstemp(prefix="neet_prep_export_", suffix=f".{extension}")
+        os.close(fd)
+        try:
+            write_export(subject_chapters_data, export_format, path, self.chunk_rows)
+        except Exception:
+            os.remove(path)
+            raise
+        self._files[export_format] = (revision, path)
+        return path
+
+    def discard(self, export_format: Optional[str] = None):
+        _remove_files(self._files, export_format)
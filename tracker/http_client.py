@@ -0,0 +1,45 @@
+"""Shared HTTP session for remote storage: pooled keep-alive connections and bounded, jittered retries."""
+from typing import Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# Full-record GETs and PUTs are idempotent, so both may be retried safely.
+RETRY_METHODS = frozenset({"GET", "PUT"})
+
+Timeout = Tuple[float, float] # (connect seconds, read seconds)
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Whether a failed request may succeed unchanged later: connection problems, timeouts and the
+    statuses in ``RETRY_STATUS_CODES``. Other errors (4xx responses, bad data) repeat on every retry."""
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError):
+        return error.response is None or error.response.status_code in RETRY_STATUS_CODES
+    return False
+
+
+def create_session(max_retries: int = 3, backoff_factor: float = 0.5, backoff_jitter: float = 0.25,
+                   pool_maxsize: int = 4) -> requests.Session:
+    """Session whose connections are reused across requests.
+
+    Connection errors, read timeouts and the statuses in ``RETRY_STATUS_CODES``
+    are retried up to ``max_retries`` times, sleeping ``backoff_factor * 2**n``
+    seconds plus up to ``backoff_jitter`` random seconds (``Retry-After`` is
+    honoured). Once retries are exhausted the last response is returned, so
+    callers still see it through ``raise_for_status``.
+    """
+    retry_kwargs = dict(total=max_retries, backoff_factor=backoff_factor, status_forcelist=RETRY_STATUS_CODES,
+                        allowed_methods=RETRY_METHODS, respect_retry_after_header=True, raise_on_status=False)
+    try:
+        retry = Retry(backoff_jitter=backoff_jitter, **retry_kwargs)
+    except TypeError: # urllib3 < 2 has no jitter option
+        retry = Retry(**retry_kwargs)
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -0,0 +1,32 @@
+"""Deferred module imports for the app script.
+
+``pd = LazyModule("pandas")`` binds a stand-in that imports pandas the first
+time one of its attributes is used, so a rerun that never builds a DataFrame
+(the login screen, most list views) never pays for the import. Once imported,
+the module is also in ``sys.modules`` as usual.
+"""
+import importlib
+import sys
+from types import ModuleType
+from typing import Any, Optional
+
+
+class LazyModule:
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None or self._name in sys.modules
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        return f"<LazyModule {self._name!r} ({'loaded' if self.loaded else 'not loaded'})>"
@@ -0,0 +1,98 @@
+"""Compact in-memory records: slotted Chapter, Reminder and Todo classes with interned status and type values.
+
+Every session holds its own copy of the whole study history, so the records
+avoid a per-instance ``__dict__`` and share one object per status / reminder
+type instead of a string per record. Plain dicts appear only at the storage
+boundary (``tracker.codec``); keys the schema does not know about ride along in
+``extra`` so they survive a round trip.
+"""
+import datetime
+import sys
+from enum import Enum
+from typing import Dict, List, Any, Optional, Type, Union
+
+
+class _InternedEnum(str, Enum):
+    """``str`` enum: members compare and hash like their value, and print as it."""
+    __str__ = str.__str__
+    __format__ = str.__format__
+
+
+class ReminderStatus(_InternedEnum):
+    PENDING = "Pending"
+    REVISED = "Revised"
+
+
+class TodoStatus(_InternedEnum):
+    PENDING = "Pending"
+    COMPLETED = "Completed"
+
+
+class ReminderType(_InternedEnum):
+    HOURS_12 = "12 hour Reminder"
+    DAYS_3 = "3 days Reminder"
+    DAYS_5 = "5 days Reminder"
+
+
+def intern_value(enum_cls: Type[_InternedEnum], value: Any) -> Union[_InternedEnum, str]:
+    """The enum member for ``value``; values outside the enum come back as interned strings."""
+    member = enum_cls._value2member_map_.get(value) # Dict lookup; enum_cls(value) is several times slower
+    if member is not None:
+        return member
+    return value if value is None else sys.intern(str(value))
+
+
+class _Record:
+    __slots__ = ()
+
+    def __eq__(self, other: Any) -> bool:
+        return type(other) is type(self) and all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(f'{f}={getattr(self, f)!r}' for f in self.__slots__)})"
+
+
+class Reminder(_Record):
+    __slots__ = ("reminder_id", "type", "time", "status", "revised_at", "extra")
+
+    def __init__(self, reminder_id: int, type: Union[ReminderType, str], time: Optional[datetime.datetime],
+                 status: Union[ReminderStatus, str] = ReminderStatus.PENDING, extra: Optional[Dict[str, Any]] = None,
+                 revised_at: Optional[datetime.datetime] = None):
+        self.reminder_id = reminder_id
+        self.type = intern_value(ReminderType, type)
+        self.time = time # A datetime; stored values that do not parse are kept as the original string
+        self.status = intern_value(ReminderStatus, status)
+        self.revised_at = revised_at # When it was marked revised; None while pending and for older records
+        self.extra = extra
+
+
+class Chapter(_Record):
+    __slots__ = ("uid", "chapter_name", "entry_datetime", "reminders", "exams_appeared", "exam_status", "time_spent",
+                 "schedule", "extra")
+
+    def __init__(self, chapter_name: str, entry_datetime: Optional[datetime.datetime], reminders: Optional[List[Reminder]] = None,
+                 exams_appeared: int = 0, exam_status: str = "Not Appeared", time_spent: int = 0,
+                 uid: Optional[str] = None, extra: Optional[Dict[str, Any]] = None, schedule: Optional[Dict[str, Any]] = None):
+        self.uid = uid
+        self.chapter_name = chapter_name
+        self.entry_datetime = entry_datetime
+        self.reminders = reminders if reminders is not None else []
+        self.exams_appeared = exams_appeared
+        self.exam_status = sys.intern(exam_status) if isinstance(exam_status, str) else exam_status
+        self.time_spent = time_spent
+        # ``tracker.scheduling`` settings; None for chapters whose reminders were all created up front
+        self.schedule = schedule
+        self.extra = extra
+
+
+class Todo(_Record):
+    __slots__ = ("uid", "task", "status", "timestamp", "extra")
+
+    def __init__(self, task: str, status: Union[TodoStatus, str] = TodoStatus.PENDING,
+                 timestamp: Optional[datetime.datetime] = None, uid: Optional[str] = None,
+                 extra: Optional[Dict[str, Any]] = None):
+        self.uid = uid
+        self.task = task
+        self.status = intern_value(TodoStatus, status)
+        self.timestamp = timestamp
+        self.extra = extra
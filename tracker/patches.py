@@ -0,0 +1,218 @@
+"""Small, JSON-ready mutation patches and the journal that batches them between snapshots."""
+import datetime
+import uuid
+from typing import Dict, List, Any, Optional, Tuple
+
+from tracker import archive
+from tracker.models import Chapter, Reminder, Todo
+
+SNAPSHOT_META_KEYS = ("snapshot_seq", "journal_epoch") # Stored next to the data in a full snapshot
+
+# ---------------------------- PATCH CONSTRUCTORS ----------------------------
+# Every patch is a plain dict with an "op" key; ``tracker.codec.encode_patch`` makes it JSON-ready for the
+# journal record. ``apply_patch`` replays stored (encoded) patches onto a stored document.
+# Records are addressed by their durable IDs (chapter/todo ``uid``, per-chapter ``reminder_id``);
+# the positional forms written by older versions are still accepted by ``apply_patch``.
+
+def append_chapter(subject: str, chapter: Chapter) -> Dict:
+    return {"op": "append_chapter", "subject": subject, "chapter": chapter}
+
+def delete_chapter(subject: str, chapter_uid: str) -> Dict:
+    return {"op": "delete_chapter", "subject": subject, "chapter_uid": chapter_uid}
+
+def set_reminder_status(subject: str, chapter_uid: str, reminder_id: int, status: str,
+                        revised_at: Optional[datetime.datetime] = None) -> Dict:
+    return {"op": "set_reminder_status", "subject": subject, "chapter_uid": chapter_uid,
+            "reminder_id": reminder_id, "status": status, "revised_at": revised_at}
+
+def append_reminder(subject: str, chapter_uid: str, reminder: Reminder) -> Dict:
+    return {"op": "append_reminder", "subject": subject, "chapter_uid": chapter_uid, "reminder": reminder}
+
+def delete_reminder(subject: str, chapter_uid: str, reminder_id: int) -> Dict:
+    return {"op": "delete_reminder", "subject": subject, "chapter_uid": chapter_uid, "reminder_id": reminder_id}
+
+def set_chapter_fields(subject: str, chapter_uid: str, fields: Dict[str, Any]) -> Dict:
+    return {"op": "set_chapter_fields", "subject": subject, "chapter_uid": chapter_uid, "fields": fields}
+
+def append_todo(todo: Todo) -> Dict:
+    return {"op": "append_todo", "todo": todo}
+
+def delete_todos(todo_uids: List[str]) -> Dict:
+    return {"op": "delete_todos", "todo_uids": list(todo_uids)}
+
+def set_todo_status(todo_uid: str, status: str) -> Dict:
+    return {"op": "set_todo_status", "todo_uid": todo_uid, "status": status}
+
+def archive_records(chapters: List[Tuple[str, Chapter]], todos: List[Todo]) -> Dict:
+    """Moves records to the archive tier (see ``tracker.archive``); carries their bodies for the archive record."""
+    return {"op": "archive_records", "chapters": [{"subject": subject, "chapter": chapter} for subject, chapter in chapters],
+            "todos": list(todos)}
+
+
+# ---------------------------- REPLAY ----------------------------
+def _find_position(records: List[Dict], uid: str) -> Optional[int]:
+    for position, record in enumerate(records):
+        if record.get("uid") == uid:
+            return position
+    return None
+
+def _chapter(chapters_by_subject: Dict[str, List[Dict]], patch: Dict[str, Any]) -> Optional[Dict]:
+    """The chapter a patch targets, or ``None`` when it (or its subject) is gone."""
+    chapters = chapters_by_subject.get(patch["subject"], [])
+    if "chapter_uid" not in patch:
+        return chapters[patch["chapter_index"]]
+    position = _find_position(chapters, patch["chapter_uid"])
+    return None if position is None else chapters[position]
+
+def _reminder(chapter: Dict, patch: Dict[str, Any]) -> Optional[Dict]:
+    if "reminder_id" in patch:
+        for reminder in chapter["reminders"]:
+            if reminder.get("reminder_id") == patch["reminder_id"]:
+                return reminder
+        return None
+    return chapter["reminders"][patch["reminder_index"]]
+
+def _todo(todos: List[Dict], patch: Dict[str, Any]) -> Optional[Dict]:
+    if "todo_uid" not in patch:
+        return todos[patch["todo_index"]]
+    position = _find_position(todos, patch["todo_uid"])
+    return None if position is None else todos[position]
+
+def apply_patch(app_data: Dict[str, Any], patch: Dict[str, Any]):
+    """Applies one encoded patch to a stored (encoded) document in place. Unknown ops raise ``ValueError``.
+
+    Replaying is idempotent for patches that address records by uid: an append whose uid (or, for a
+    reminder, ``reminder_id``) is already there does nothing, and a patch whose target record is gone
+    (deleted by an earlier copy of the same batch, or remotely) is skipped. Positional patches from
+    older versions still raise ``IndexError`` when their position is out of range."""
+    op = patch.get("op")
+    chapters_by_subject = app_data["subject_chapters_data"]
+    if op == "append_chapter":
+        chapters = chapters_by_subject.setdefault(patch["subject"], [])
+        uid = patch["chapter"].get("uid")
+        if uid is None or all(chapter.get("uid") != uid for chapter in chapters):
+            chapters.append(patch["chapter"])
+    elif op == "delete_chapter":
+        doomed = _chapter(chapters_by_subject, patch)
+        if doomed is not None:
+            chapters = chapters_by_subject[patch["subject"]]
+            chapters[:] = [chapter for chapter in chapters if chapter is not doomed]
+    elif op == "set_reminder_status":
+        chapter = _chapter(chapters_by_subject, patch)
+        reminder = _reminder(chapter, patch) if chapter is not None else None
+        if reminder is None:
+            return
+        reminder["status"] = patch["status"]
+        if patch.get("revised_at") is not None:
+            reminder["revised_at"] = patch["revised_at"]
+        else: # Older patches carry no timestamp; a revert to pending clears it
+            reminder.pop("revised_at", None)
+    elif op == "append_reminder":
+        chapter = _chapter(chapters_by_subject, patch)
+        if chapter is None:
+            return
+        reminders = chapter["reminders"]
+        if all(reminder.get("reminder_id") != patch["reminder"].get("reminder_id") for reminder in reminders):
+            reminders.append(patch["reminder"])
+    elif op == "delete_reminder":
+        chapter = _chapter(chapters_by_subject, patch)
+        doomed = _reminder(chapter, patch) if chapter is not None else None
+        if doomed is not None:
+            chapter["reminders"] = [reminder for reminder in chapter["reminders"] if reminder is not doomed]
+    elif op == "set_chapter_fields":
+        chapter = _chapter(chapters_by_subject, patch)
+        if chapter is not None:
+            chapter.update(patch["fields"])
+    elif op == "append_todo":
+        uid = patch["todo"].get("uid")
+        if uid is None or all(todo.get("uid") != uid for todo in app_data["todo_data"]):
+            app_data["todo_data"].append(patch["todo"])
+    elif op == "delete_todos":
+        todos = app_data["todo_data"]
+        if "todo_uids" in patch:
+            doomed = set(patch["todo_uids"])
+            todos[:] = [todo for todo in todos if todo.get("uid") not in doomed]
+        else:
+            for index in sorted(patch["indices"], reverse=True):
+                del todos[index]
+    elif op == "set_todo_status":
+        todo = _todo(app_data["todo_data"], patch)
+        if todo is not None:
+            todo["status"] = patch["status"]
+    elif op == "archive_records": # Only records still in the document are counted, so a replayed patch counts once
+        doomed_chapters = {entry["chapter"].get("uid") for entry in patch["chapters"]}
+        moved_chapters = set()
+        for subject in {entry["subject"] for entry in patch["chapters"]}:
+            chapters = chapters_by_subject.get(subject, [])
+            moved_chapters.update(chapter.get("uid") for chapter in chapters if chapter.get("uid") in doomed_chapters)
+            chapters[:] = [chapter for chapter in chapters if chapter.get("uid") not in doomed_chapters]
+        doomed_todos = {todo.get("uid") for todo in patch["todos"]}
+        todos = app_data["todo_data"]
+        moved_todos = {todo.get("uid") for todo in todos if todo.get("uid") in doomed_todos}
+        todos[:] = [todo for todo in todos if todo.get("uid") not in doomed_todos]
+        moved = {**patch, "chapters": [entry for entry in patch["chapters"] if entry["chapter"].get("uid") in moved_chapters],
+                 "todos": [todo for todo in patch["todos"] if todo.get("uid") in moved_todos]}
+        archive.add_summary(app_data.setdefault(archive.ARCHIVE_SUMMARY_KEY, archive.empty_summary()), archive.summarize_patch(moved))
+    else:
+        raise ValueError(f"Unknown patch op: {op!r}")
+
+
+# ---------------------------- JOURNAL ----------------------------
+class PatchJournal:
+    """Sequence-numbered patches written since the last full snapshot.
+
+    The snapshot record carries ``snapshot_seq`` and ``journal_epoch``. On load a
+    journal entry is replayed only when the journal belongs to the same epoch and
+    its ``seq`` is newer than the snapshot, so a crash between "write snapshot"
+    and "clear journal" is harmless, and a full save that did not know about the
+    remote journal (new epoch) orphans it instead of replaying stale patches.
+    """
+
+    def __init__(self, snapshot_seq: int = 0, entries: Optional[List[Dict]] = None,
+                 compact_every: int = 50, epoch: Optional[str] = None):
+        # A journal without a stored epoch has no snapshot pointing at it yet, so the next
+        # save must be a full snapshot before patches can be trusted on reload.
+        self.anchored = epoch is not None
+        self.epoch = epoch or uuid.uuid4().hex
+        self.snapshot_seq = snapshot_seq
+        self.entries: List[Dict] = [e for e in (entries or []) if e.get("seq", 0) > snapshot_seq]
+        self.compact_every = compact_every
+
+    @classmethod
+    def from_document(cls, snapshot_meta: Dict[str, Any], document: Optional[Dict], compact_every: int = 50) -> "PatchJournal":
+        snapshot_seq = snapshot_meta.get("snapshot_seq", 0)
+        epoch = snapshot_meta.get("journal_epoch")
+        entries = []
+        if epoch and isinstance(document, dict) and document.get("epoch") == epoch:
+            entries = sorted(document.get("patches", []), key=lambda e: e.get("seq", 0))
+        return cls(snapshot_seq, entries, compact_every, epoch)
+
+    @property
+    def last_seq(self) -> int:
+        return self.entries[-1]["seq"] if self.entries else self.snapshot_seq
+
+    def append(self, patch_list: List[Dict]):
+        seq = self.last_seq
+        for patch in patch_list:
+            seq += 1
+            self.entries.append({"seq": seq, **patch})
+
+    def rollback(self, count: int):
+        """Forgets the last ``count`` appended patches (used when the journal write fails)."""
+        if count > 0:
+            del self.entries[-count:]
+
+    def needs_compaction(self) -> bool:
+        return not self.anchored or len(self.entries) >= self.compact_every
+
+    def mark_compacted(self):
+        self.snapshot_seq = self.last_seq
+        self.entries = []
+        self.anchored = True
+
+    def snapshot_meta(self) -> Dict[str, Any]:
+        """Keys stored alongside a full snapshot so the loader knows which patches it already holds."""
+        return {"snapshot_seq": self.last_seq, "journal_epoch": self.epoch}
+
+    def to_document(self) -> Dict[str, Any]:
+        return {"epoch": self.epoch, "snapshot_seq": self.snapshot_seq, "patches": self.entries}
@@ -0,0 +1,147 @@
+"""Opt-in timing spans per script rerun, with a rolling history and JSON / Chrome trace export.
+
+A ``Profiler`` lives in session state. Each full rerun is one run record: the
+script calls ``start_run`` at the top and ``end_run`` at the bottom, and wraps
+the interesting work in ``span(name)``. Spans nest, and each keeps its depth,
+so the panel can show both the breakdown and which spans contain which. A run
+cut short by ``st.rerun()`` / ``st.stop()`` is closed by the next ``start_run``
+and marked interrupted. A span recorded outside a run (a fragment rerun, which
+skips the top of the script) opens a "partial rerun" record of its own that
+ends with that span.
+"""
+import collections
+import contextlib
+import datetime
+import statistics
+import time
+from typing import Deque, Dict, Iterator, List, Any, Optional
+
+
+class Span:
+    __slots__ = ("name", "start_ns", "duration_ns", "depth")
+
+    def __init__(self, name: str, start_ns: int, duration_ns: int, depth: int):
+        self.name = name
+        self.start_ns = start_ns # Relative to the profiler's epoch
+        self.duration_ns = duration_ns
+        self.depth = depth
+
+
+class RunRecord:
+    __slots__ = ("label", "started_at", "start_ns", "duration_ns", "interrupted", "spans")
+
+    def __init__(self, label: str, start_ns: int):
+        self.label = label
+        self.started_at = datetime.datetime.now()
+        self.start_ns = start_ns
+        self.duration_ns = 0
+        self.interrupted = False
+        self.spans: List[Span] = [] # In completion order (children before their parent)
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration_ns / 1e6
+
+
+class Profiler:
+    def __init__(self, history_runs: int = 50):
+        self.runs: Deque[RunRecord] = collections.deque(maxlen=history_runs) # Completed runs, oldest first
+        self._current: Optional[RunRecord] = None
+        self._depth = 0
+        self._partial = False # Current run was opened by a span and ends with it
+        self._epoch_ns = time.perf_counter_ns()
+
+    def _now_ns(self) -> int:
+        return time.perf_counter_ns() - self._epoch_ns
+
+    # ---------------- Recording ----------------
+    def start_run(self, label: str = "rerun"):
+        if self._current is not None:
+            self._finish(interrupted=True)
+        self._current = RunRecord(label, self._now_ns())
+        self._depth = 0
+        self._partial = False
+
+    def end_run(self):
+        if self._current is not None:
+            self._finish(interrupted=False)
+
+    def _finish(self, interrupted: bool):
+        run = self._current
+        run.interrupted = interrupted
+        if interrupted: # Only the spans that completed are known; end the run at the last of them
+            run.duration_ns = max((s.start_ns + s.duration_ns for s in run.spans), default=run.start_ns) - run.start_ns
+        else:
+            run.duration_ns = self._now_ns() - run.start_ns
+        self.runs.append(run)
+        self._current = None
+
+    @contextlib.contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        if self._current is None:
+            self.start_run("partial rerun")
+            self._partial = True
+        run = self._current
+        depth = self._depth
+        self._depth += 1
+        start_ns = self._now_ns()
+        try:
+            yield
+        finally:
+            self._depth = depth
+            run.spans.append(Span(name, start_ns, self._now_ns() - start_ns, depth))
+            if depth == 0 and self._partial and run is self._current:
+                self.end_run()
+
+    def clear(self):
+        self.runs.clear()
+
+    # ---------------- Summaries ----------------
+    @property
+    def last_run(self) -> Optional[RunRecord]:
+        return self.runs[-1] if self.runs else None
+
+    @staticmethod
+    def breakdown(run: RunRecord) -> List[Dict[str, Any]]:
+        """Per span name: call count and total milliseconds, in the order the spans started."""
+        rows: Dict[str, Dict[str, Any]] = {}
+        for span in sorted(run.spans, key=lambda s: s.start_ns):
+            row = rows.setdefault(span.name, {"span": span.name, "depth": span.depth, "calls": 0, "total_ms": 0.0})
+            row["calls"] += 1
+            row["total_ms"] += span.duration_ns / 1e6
+        for row in rows.values():
+            row["share"] = row["total_ms"] / run.duration_ms if run.duration_ms else 0.0
+        return list(rows.values())
+
+    def history_stats(self) -> List[Dict[str, Any]]:
+        """Per span name across the history: runs it appeared in, mean and worst total milliseconds per run."""
+        per_run: Dict[str, List[float]] = {}
+        for run in self.runs:
+            for row in self.breakdown(run):
+                per_run.setdefault(row["span"], []).append(row["total_ms"])
+        return [{"span": name, "runs": len(values), "mean_ms": statistics.fmean(values), "max_ms": max(values)}
+                for name, values in sorted(per_run.items(), key=lambda item: -statistics.fmean(item[1]))]
+
+    # ---------------- Export ----------------
+    def to_json(self) -> Dict[str, Any]:
+        return {"runs": [{"label": run.label, "started_at": run.started_at.isoformat(timespec="milliseconds"),
+                          "duration_ms": run.duration_ms, "interrupted": run.interrupted,
+                          "spans": [{"name": s.name, "start_ms": (s.start_ns - run.start_ns) / 1e6,
+                                     "duration_ms": s.duration_ns / 1e6, "depth": s.depth}
+                                    for s in sorted(run.spans, key=lambda s: s.start_ns)]}
+                         for run in self.runs]}
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Trace Event Format ("X" complete events, microseconds) for chrome://tracing or Perfetto."""
+        events = []
+        for number, run in enumerate(self.runs):
+            events.append({"name": run.label, "cat": "run", "ph": "X", "ts": run.start_ns / 1e3, "dur": run.duration_ns / 1e3,
+                           "pid": 1, "tid": 1, "args": {"run": number, "interrupted": run.interrupted}})
+            events.extend({"name": s.name, "cat": "span", "ph": "X", "ts": s.start_ns / 1e3, "dur": s.duration_ns / 1e3,
+                           "pid": 1, "tid": 1, "args": {"run": number}} for s in run.spans)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def span(profiler: Optional[Profiler], name: str):
+    """``profiler.span(name)``, or a no-op context when profiling is off."""
+    return profiler.span(name) if profiler is not None else contextlib.nullcontext()
@@ -0,0 +1,92 @@
+"""Process-wide LRU of loaded documents, shared by every session that reads the same record.
+
+Entries are keyed by storage location (each user's data lives in a location of
+its own) and tagged with a version: the backend's write revision plus anything
+else that changes what a load returns. A lookup with another version, or one
+older than ``ttl_seconds``, is a miss. The cache is bounded by the size of the
+documents it holds, measured as their serialized JSON length when loaded (the
+decoded objects take a few times that); the least recently used entries are
+evicted first, but the entry just stored is always kept.
+
+Documents are handed out shared, not copied, so callers must not modify them:
+the app gives a session its own copy on the session's first edit. Loads of one
+key are serialized, so sessions opening together fetch the record only once.
+"""
+import collections
+import threading
+import time
+from typing import Callable, Dict, Any, Hashable, Optional, Tuple
+
+
+class CacheEntry:
+    __slots__ = ("version", "value", "size", "stored_at")
+
+    def __init__(self, version: Hashable, value: Any, size: int):
+        self.version = version
+        self.value = value
+        self.size = size
+        self.stored_at = time.monotonic()
+
+
+class RecordCache:
+    def __init__(self, max_bytes: int, ttl_seconds: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "collections.OrderedDict[Hashable, CacheEntry]" = collections.OrderedDict() # Least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._hits = self._misses = self._evictions = 0
+
+    def _key_lock(self, key: Hashable) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get(self, key: Hashable, version: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version or self._expired(entry):
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.value
+
+    def put(self, key: Hashable, version: Hashable, value: Any, size: int):
+        """Stores ``value`` for ``key``, replacing any other version, then evicts down to ``max_bytes``."""
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = CacheEntry(version, value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                self._drop(next(iter(self._entries)))
+                self._evictions += 1
+
+    def get_or_load(self, key: Hashable, version: Hashable, load: Callable[[], Tuple[Optional[Any], int]]) -> Optional[Any]:
+        """The cached value, or ``load()``'s ``(value, size)`` stored and returned. A ``None`` value is not stored."""
+        with self._key_lock(key):
+            value = self.get(key, version)
+            if value is None:
+                value, size = load()
+                if value is not None:
+                    self.put(key, version, value, size)
+            return value
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drops ``key``, or every entry."""
+        with self._lock:
+            for stale_key in ([key] if key is not None else list(self._entries)):
+                self._drop(stale_key)
+
+    def _expired(self, entry: CacheEntry) -> bool:
+        return self.ttl_seconds is not None and time.monotonic() - entry.stored_at > self.ttl_seconds
+
+    def _drop(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                    "hits": self._hits, "misses": self._misses, "evictions": self._evictions}
@@ -0,0 +1,148 @@
+"""Durable record IDs and the in-session ID -> record hash maps.
+
+Chapters and todos carry a ``uid`` string; reminders keep their
+``reminder_id``, which is unique within their chapter. Records created by the
+app get a random uid. Records stored before IDs existed get one derived from
+their content and position, so every session migrating the same stored
+document assigns the same IDs.
+"""
+import bisect
+import hashlib
+import itertools
+import uuid
+from typing import Dict, List, Any, Optional, Tuple
+
+from tracker.models import Chapter, Reminder, Todo, TodoStatus
+
+
+def new_uid() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def _legacy_uid(*parts: Any) -> str:
+    return hashlib.sha1("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:16]
+
+
+def ensure_ids(app_data: Dict[str, Any]) -> bool:
+    """Gives every chapter, reminder and todo that lacks one an ID. Returns True if anything changed."""
+    changed = False
+    for subject, chapters in app_data.get("subject_chapters_data", {}).items():
+        for position, chapter in enumerate(chapters):
+            if not chapter.uid:
+                chapter.uid = _legacy_uid("chapter", subject, position, chapter.chapter_name, chapter.entry_datetime)
+                changed = True
+            reminders = chapter.reminders
+            seen = set()
+            next_id = max((r.reminder_id for r in reminders if isinstance(r.reminder_id, int)), default=0) + 1
+            for reminder in reminders:
+                reminder_id = reminder.reminder_id
+                if not isinstance(reminder_id, int) or reminder_id in seen:
+                    reminder.reminder_id = reminder_id = next_id
+                    next_id += 1
+                    changed = True
+                seen.add(reminder_id)
+    for position, todo in enumerate(app_data.get("todo_data", [])):
+        if not todo.uid:
+            todo.uid = _legacy_uid("todo", position, todo.task, todo.timestamp)
+            changed = True
+    return changed
+
+
+def find_reminder(chapter: Chapter, reminder_id: int) -> Optional[Reminder]:
+    # A chapter holds a handful of reminders, so a scan beats keeping another map in sync.
+    for reminder in chapter.reminders:
+        if reminder.reminder_id == reminder_id:
+            return reminder
+    return None
+
+
+class RecordIndex:
+    """uid -> record maps over ``app_data``, kept current by the same code paths that edit the lists.
+
+    Todos are kept in list order (they are only ever appended), and each status
+    keeps its todos' ``(list position, uid)`` pairs sorted, so the To Do filters,
+    their counts and a page of a filtered list need no scan of the todos.
+    """
+
+    def __init__(self):
+        self._chapters: Dict[str, Tuple[str, Chapter]] = {} # uid -> (subject, chapter)
+        self._todos: Dict[str, Todo] = {}
+        self._todo_positions: Dict[str, int] = {} # uid -> order in which it was added
+        self._next_todo_position = 0
+        self._todos_by_status: Dict[str, List[Tuple[int, str]]] = {TodoStatus.PENDING: [], TodoStatus.COMPLETED: []}
+
+    @classmethod
+    def build(cls, app_data: Dict[str, Any]) -> "RecordIndex":
+        index = cls()
+        for subject, chapters in app_data.get("subject_chapters_data", {}).items():
+            for chapter in chapters:
+                index.chapter_added(subject, chapter)
+        for todo in app_data.get("todo_data", []):
+            index.todo_added(todo)
+        return index
+
+    # ---------------- Maintenance hooks ----------------
+    def chapter_added(self, subject: str, chapter: Chapter):
+        self._chapters[chapter.uid] = (subject, chapter)
+
+    def chapter_removed(self, chapter_uid: str):
+        self._chapters.pop(chapter_uid, None)
+
+    def todo_added(self, todo: Todo):
+        position = self._todo_positions[todo.uid] = self._next_todo_position
+        self._next_todo_position += 1
+        self._todos[todo.uid] = todo
+        bisect.insort(self._todos_by_status.setdefault(todo.status, []), (position, todo.uid))
+
+    def todo_removed(self, todo_uid: str):
+        todo = self._todos.pop(todo_uid, None)
+        if todo is not None:
+            self._unfile_todo(todo.status, self._todo_positions.pop(todo_uid), todo_uid)
+
+    def todo_status_changed(self, todo: Todo, old_status: str):
+        """Moves a todo to the list of its new status; call after mutating ``todo.status``."""
+        if old_status != todo.status and todo.uid in self._todos:
+            position = self._todo_positions[todo.uid]
+            self._unfile_todo(old_status, position, todo.uid)
+            bisect.insort(self._todos_by_status.setdefault(todo.status, []), (position, todo.uid))
+
+    def _unfile_todo(self, status: str, position: int, todo_uid: str):
+        entries = self._todos_by_status[status]
+        del entries[bisect.bisect_left(entries, (position, todo_uid))]
+
+    # ---------------- Lookups ----------------
+    def chapter(self, chapter_uid: str) -> Optional[Chapter]:
+        entry = self._chapters.get(chapter_uid)
+        return entry[1] if entry else None
+
+    def chapter_subject(self, chapter_uid: str) -> Optional[str]:
+        entry = self._chapters.get(chapter_uid)
+        return entry[0] if entry else None
+
+    def reminder(self, chapter_uid: str, reminder_id: int) -> Optional[Reminder]:
+        chapter = self.chapter(chapter_uid)
+        return find_reminder(chapter, reminder_id) if chapter is not None else None
+
+    def todo(self, todo_uid: str) -> Optional[Todo]:
+        return self._todos.get(todo_uid)
+
+    def todo_uids(self, status: Optional[str] = None, start: int = 0, end: Optional[int] = None) -> List[str]:
+        """Todo uids in list order, optionally only those with ``status``; rows ``start`` to ``end`` of that list."""
+        if status is None:
+            return list(itertools.islice(self._todos, start, end))
+        return [uid for _, uid in self._todos_by_status.get(status, [])[start:end]]
+
+    def todo_count(self, status: Optional[str] = None) -> int:
+        return len(self._todos) if status is None else len(self._todos_by_status.get(status, []))
+
+    def todo_status_counts(self) -> Dict[str, int]:
+        return {status: len(entries) for status, entries in self._todos_by_status.items()}
+
+
+def remove_by_identity(records: List[Any], record: Any) -> int:
+    """Removes ``record`` (compared by identity) from ``records``; returns its former position."""
+    for position, candidate in enumerate(records):
+        if candidate is record:
+            del records[position]
+            return position
+    raise ValueError("record not in list")
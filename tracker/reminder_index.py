@@ -0,0 +1,182 @@
+"""In-memory, date-keyed index over the reminders stored in ``subject_chapters_data``."""
+import datetime
+import heapq
+import itertools
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+from tracker.models import Chapter, Reminder, ReminderStatus
+
+# (subject, chapter, reminder) - same shape get_revisions_for_date returns
+RevisionEntry = Tuple[str, Chapter, Reminder]
+
+STATUS_REVISED = ReminderStatus.REVISED
+STATUS_PENDING = ReminderStatus.PENDING
+
+
+def _reminder_date(reminder: Reminder) -> Optional[datetime.date]:
+    reminder_time_obj = reminder.time
+    if isinstance(reminder_time_obj, datetime.datetime):
+        return reminder_time_obj.date()
+    return None
+
+
+class ReminderIndex:
+    """Maps each calendar date to the reminders due on it, plus per-date status counts and a due queue.
+
+    Built once from ``subject_chapters_data`` and then kept current through the
+    ``chapter_added`` / ``chapter_deleted`` / ``reminder_added`` /
+    ``reminder_removed`` / ``status_changed`` hooks, so date lookups cost time
+    proportional to that day's reminders only. The first due-queue query also
+    puts the pending reminders in a min-heap on due time; entries that stop
+    being pending are dropped lazily when they reach the top, so "what is due
+    now" costs time proportional to the answer.
+    """
+
+    def __init__(self, subject_order: List[str]):
+        self._subject_rank = {subject: rank for rank, subject in enumerate(subject_order)}
+        # date -> list of (subject, chapter, reminder_index, reminder)
+        self._by_date: Dict[datetime.date, List[Tuple[str, Chapter, int, Reminder]]] = {}
+        self._status_counts: Dict[datetime.date, Dict[str, int]] = {}
+        # id(chapter) -> insertion sequence. Chapters are only ever appended, so this sorts like the
+        # list position and, unlike it, does not change when an earlier chapter is deleted.
+        self._chapter_order: Dict[int, int] = {}
+        self._next_order = 0
+        # (due time, tie-breaker, subject, chapter, reminder); built on the first due-queue query
+        self._due_heap: Optional[List[Tuple[datetime.datetime, int, str, Chapter, Reminder]]] = None
+        self._queued: Set[int] = set() # id(reminder) of heap entries; the heap keeps those reminders alive
+        self._dropped: Set[int] = set() # id(reminder) of queued reminders removed from the index
+        self._heap_seq = itertools.count()
+
+    @classmethod
+    def build(cls, subject_chapters_data: Dict[str, List[Chapter]], subject_order: List[str]) -> "ReminderIndex":
+        index = cls(subject_order)
+        for subject, chapters in subject_chapters_data.items():
+            for chapter in chapters:
+                index.chapter_added(subject, chapter)
+        return index
+
+    # ---------------- Maintenance hooks ----------------
+    def chapter_added(self, subject: str, chapter: Chapter):
+        """Registers a chapter that was just appended to its subject's list."""
+        self._chapter_order[id(chapter)] = self._next_order
+        self._next_order += 1
+        queue_pending = self._due_heap is not None
+        for r_idx, reminder in enumerate(chapter.reminders):
+            r_date = _reminder_date(reminder)
+            if r_date is None:
+                continue
+            self._by_date.setdefault(r_date, []).append((subject, chapter, r_idx, reminder))
+            self._bump_status(r_date, reminder.status, 1)
+            if queue_pending and reminder.status == STATUS_PENDING:
+                self._queue(subject, chapter, reminder)
+
+    def chapter_deleted(self, chapter: Chapter):
+        """Drops a removed chapter's reminders."""
+        for reminder in chapter.reminders:
+            self.reminder_removed(reminder)
+        self._chapter_order.pop(id(chapter), None)
+
+    def reminder_added(self, subject: str, chapter: Chapter, reminder: Reminder):
+        """Registers a reminder that was just appended to an indexed chapter."""
+        self._dropped.discard(id(reminder))
+        r_date = _reminder_date(reminder)
+        if r_date is None:
+            return
+        self._by_date.setdefault(r_date, []).append((subject, chapter, len(chapter.reminders) - 1, reminder))
+        self._bump_status(r_date, reminder.status, 1)
+        if self._due_heap is not None and reminder.status == STATUS_PENDING:
+            self._queue(subject, chapter, reminder)
+
+    def reminder_removed(self, reminder: Reminder):
+        r_date = _reminder_date(reminder)
+        entries = self._by_date.get(r_date)
+        if not entries:
+            return
+        entries[:] = [entry for entry in entries if entry[3] is not reminder]
+        self._bump_status(r_date, reminder.status, -1)
+        if not entries:
+            del self._by_date[r_date]
+            self._status_counts.pop(r_date, None)
+        if id(reminder) in self._queued:
+            self._dropped.add(id(reminder))
+
+    def status_changed(self, reminder: Reminder, old_status: str, new_status: str):
+        """Moves one reminder between status buckets; call after mutating ``reminder.status``."""
+        if old_status == new_status:
+            return
+        r_date = _reminder_date(reminder)
+        if r_date is None or r_date not in self._by_date:
+            return
+        self._bump_status(r_date, old_status, -1)
+        self._bump_status(r_date, new_status, 1)
+        if self._due_heap is not None and new_status == STATUS_PENDING:
+            for subject, chapter, _, entry_reminder in self._by_date[r_date]:
+                if entry_reminder is reminder:
+                    self._queue(subject, chapter, reminder)
+                    break
+
+    def _bump_status(self, r_date: datetime.date, status: str, delta: int):
+        counts = self._status_counts.setdefault(r_date, {STATUS_REVISED: 0, STATUS_PENDING: 0})
+        counts[status] = counts.get(status, 0) + delta
+
+    # ---------------- Due queue ----------------
+    def _queue(self, subject: str, chapter: Chapter, reminder: Reminder):
+        if id(reminder) not in self._queued:
+            self._queued.add(id(reminder))
+            heapq.heappush(self._due_heap, (reminder.time, next(self._heap_seq), subject, chapter, reminder))
+
+    def _ensure_due_heap(self) -> List[Tuple[datetime.datetime, int, str, Chapter, Reminder]]:
+        if self._due_heap is None:
+            seq = self._heap_seq
+            self._due_heap = [(reminder.time, next(seq), subject, chapter, reminder)
+                              for entries in self._by_date.values()
+                              for subject, chapter, _, reminder in entries if reminder.status == STATUS_PENDING]
+            heapq.heapify(self._due_heap)
+            self._queued = {id(entry[4]) for entry in self._due_heap}
+        return self._due_heap
+
+    def _is_due_entry(self, reminder: Reminder) -> bool:
+        return reminder.status == STATUS_PENDING and id(reminder) not in self._dropped
+
+    def _drop_stale_top(self) -> List[Tuple[datetime.datetime, int, str, Chapter, Reminder]]:
+        heap = self._ensure_due_heap()
+        while heap and not self._is_due_entry(heap[0][4]):
+            stale_id = id(heapq.heappop(heap)[4])
+            self._queued.discard(stale_id)
+            self._dropped.discard(stale_id)
+        return heap
+
+    # ---------------- Queries ----------------
+    def entries_for_date(self, target_date: datetime.date) -> List[RevisionEntry]:
+        """Reminders due on ``target_date`` in subject / chapter / reminder order."""
+        entries = sorted(self._by_date.get(target_date, []),
+                         key=lambda e: (self._subject_rank.get(e[0], len(self._subject_rank)), self._chapter_order.get(id(e[1]), -1), e[2]))
+        return [(subject, chapter, reminder) for subject, chapter, _, reminder in entries]
+
+    def status_counts(self, target_date: datetime.date) -> Dict[str, int]:
+        """``{"Revised": n, "Pending": m}`` for ``target_date`` without touching the entries."""
+        counts = self._status_counts.get(target_date)
+        return dict(counts) if counts else {STATUS_REVISED: 0, STATUS_PENDING: 0}
+
+    def count_for_date(self, target_date: datetime.date) -> int:
+        return len(self._by_date.get(target_date, []))
+
+    def due(self, now: datetime.datetime) -> List[RevisionEntry]:
+        """Pending reminders due at or before ``now``, earliest first."""
+        heap = self._drop_stale_top()
+        found, stack = [], [0] if heap else []
+        while stack: # Heap order: once an entry is later than ``now``, so is everything below it
+            position = stack.pop()
+            entry = heap[position]
+            if entry[0] > now:
+                continue
+            if self._is_due_entry(entry[4]):
+                found.append(entry)
+            stack.extend(child for child in (2 * position + 1, 2 * position + 2) if child < len(heap))
+        found.sort(key=lambda entry: entry[:2])
+        return [(subject, chapter, reminder) for _, _, subject, chapter, reminder in found]
+
+    def next_due(self) -> Optional[RevisionEntry]:
+        """The pending reminder with the earliest due time, if any."""
+        heap = self._drop_stale_top()
+        return heap[0][2:] if heap else None
@@ -0,0 +1,130 @@
+"""Revisions per subject and day over the last year, as a compact array for the calendar heatmap."""
+import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from tracker.models import Chapter, Reminder, ReminderStatus
+
+STATUS_REVISED = ReminderStatus.REVISED
+WEEKS = 53
+
+
+def _week_start(day: datetime.date) -> datetime.date:
+    return day - datetime.timedelta(days=day.weekday())
+
+
+def _revision_day(reminder: Reminder, revised_at: Optional[datetime.datetime]) -> Optional[datetime.date]:
+    """The day a revision counts on: when it was marked revised, else (older data) when it was due."""
+    when = revised_at if isinstance(revised_at, datetime.datetime) else reminder.time
+    return when.date() if isinstance(when, datetime.datetime) else None
+
+
+class RevisionCalendar:
+    """Revised reminders per subject and day, for the ``WEEKS`` weeks ending with the current one.
+
+    ``counts`` has one row per subject and one column per day, Monday of the
+    first week first, so a week is seven consecutive columns. Built with one
+    pass over ``subject_chapters_data`` and then kept current through the
+    ``chapter_added`` / ``chapter_deleted`` / ``reminder_added`` /
+    ``reminder_removed`` / ``status_changed`` hooks, like ``ReminderIndex``. A
+    render reads the array and never walks the reminders. ``version`` goes up
+    with every change. ``covers`` turns False on the next day, when the
+    calendar has to be rebuilt for the new window.
+    """
+
+    def __init__(self, subject_order: List[str], today: datetime.date):
+        self.subjects = list(subject_order)
+        self.today = today
+        self.first_day = _week_start(today) - datetime.timedelta(weeks=WEEKS - 1)
+        self.counts = np.zeros((len(self.subjects), WEEKS * 7), dtype=np.int32)
+        self.version = 0
+
+    @classmethod
+    def build(cls, subject_chapters_data: Dict[str, List[Chapter]], subject_order: List[str],
+              today: Optional[datetime.date] = None) -> "RevisionCalendar":
+        calendar = cls(list(subject_order) + [s for s in subject_chapters_data if s not in subject_order],
+                       today or datetime.date.today())
+        for subject, chapters in subject_chapters_data.items():
+            for chapter in chapters:
+                calendar.chapter_added(subject, chapter)
+        calendar.version = 0
+        return calendar
+
+    def covers(self, today: datetime.date) -> bool:
+        return today == self.today
+
+    def _bump(self, subject: str, day: Optional[datetime.date], delta: int):
+        if day is None:
+            return
+        column = (day - self.first_day).days
+        if not 0 <= column < self.counts.shape[1]:
+            return
+        if subject not in self.subjects:
+            self.subjects.append(subject)
+            self.counts = np.vstack([self.counts, np.zeros((1, self.counts.shape[1]), dtype=np.int32)])
+        self.counts[self.subjects.index(subject), column] += delta
+        self.version += 1
+
+    # ---------------- Maintenance hooks ----------------
+    def chapter_added(self, subject: str, chapter: Chapter):
+        for reminder in chapter.reminders:
+            self.reminder_added(subject, reminder)
+
+    def chapter_deleted(self, subject: str, chapter: Chapter):
+        for reminder in chapter.reminders:
+            self.reminder_removed(subject, reminder)
+
+    def reminder_added(self, subject: str, reminder: Reminder):
+        if reminder.status == STATUS_REVISED:
+            self._bump(subject, _revision_day(reminder, reminder.revised_at), 1)
+
+    def reminder_removed(self, subject: str, reminder: Reminder):
+        if reminder.status == STATUS_REVISED:
+            self._bump(subject, _revision_day(reminder, reminder.revised_at), -1)
+
+    def status_changed(self, subject: str, reminder: Reminder, old_status: str, old_revised_at: Optional[datetime.datetime]):
+        """Call after setting ``reminder.status`` and ``revised_at``; ``old_*`` are the values they replaced."""
+        if old_status == STATUS_REVISED:
+            self._bump(subject, _revision_day(reminder, old_revised_at), -1)
+        if reminder.status == STATUS_REVISED:
+            self._bump(subject, _revision_day(reminder, reminder.revised_at), 1)
+
+    # ---------------- Queries ----------------
+    def _rows(self, subjects: Optional[List[str]]) -> np.ndarray:
+        if subjects is None:
+            return self.counts
+        return self.counts[[self.subjects.index(s) for s in subjects if s in self.subjects]]
+
+    def daily(self, subjects: Optional[List[str]] = None) -> np.ndarray:
+        """Revisions per day of the window, summed over ``subjects`` (default all)."""
+        return self._rows(subjects).sum(axis=0)
+
+    def subject_totals(self) -> Dict[str, int]:
+        """Revisions per subject over the 365 days ending today."""
+        last_year = self.counts[:, max(0, self.today_column - 364):self.today_column + 1]
+        return dict(zip(self.subjects, last_year.sum(axis=1).tolist()))
+
+    def days(self) -> List[datetime.date]:
+        return [self.first_day + datetime.timedelta(days=offset) for offset in range(self.counts.shape[1])]
+
+    @property
+    def today_column(self) -> int:
+        return (self.today - self.first_day).days
+
+
+def year_stats(daily: np.ndarray, today_column: int) -> Dict[str, int]:
+    """Revisions and days with revisions over the 365 days ending today, and the current streak: days in a row
+    with revisions, ending today (or yesterday, while today has none yet)."""
+    last_year = daily[max(0, today_column - 364):today_column + 1]
+    active = last_year > 0
+    recent = active if active[-1] else active[:-1]
+    streak = len(recent) if recent.all() else int(np.argmin(recent[::-1]))
+    return {"revisions": int(last_year.sum()), "active_days": int(active.sum()), "streak": streak}
+
+
+def week_grid(daily: np.ndarray, today_column: int) -> np.ndarray:
+    """The window as a weekday x week grid (Monday in row 0); days after today are NaN."""
+    grid = daily.astype(np.float64)
+    grid[today_column + 1:] = np.nan
+    return grid.reshape(-1, 7).T
@@ -0,0 +1,155 @@
+"""Spaced-repetition schedulers that create a chapter's reminders one at a time.
+
+A chapter created with a ``schedule`` (``{"scheduler": <name>, ...settings}``)
+holds only the reminders that are actually due or done: the next reminder is
+added when the last one is marked revised, and withdrawn again if that
+revision is undone. Chapters without a schedule keep the reminders they were
+stored with. Schedulers are stateless; everything they need is derived from
+the chapter's reminders (status and ``revised_at``), so the stored document
+holds no scheduler state beyond the settings.
+"""
+import datetime
+from typing import Dict, List, Any, Optional, Tuple, Type
+
+from tracker.models import Chapter, Reminder, ReminderStatus
+
+
+def interval_label(hours: float) -> str:
+    """Reminder type for an interval: "12 hour Reminder", "1 day Reminder", "3 days Reminder", ..."""
+    if hours == 24:
+        return "1 day Reminder"
+    if hours > 24 and hours % 24 == 0:
+        return f"{int(hours // 24)} days Reminder"
+    return f"{hours:g} hour Reminder"
+
+
+def _next_reminder_id(chapter: Chapter) -> int:
+    return max((r.reminder_id for r in chapter.reminders if isinstance(r.reminder_id, int)), default=0) + 1
+
+
+class Scheduler:
+    """Base class. ``next_reminder`` proposes the reminder that follows the chapter's current ones."""
+    name = ""
+    label = ""
+
+    @classmethod
+    def from_schedule(cls, schedule: Dict[str, Any]) -> "Scheduler":
+        return cls(**{k: v for k, v in schedule.items() if k != "scheduler"})
+
+    def to_schedule(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def next_reminder(self, chapter: Chapter) -> Optional[Reminder]:
+        raise NotImplementedError
+
+
+class FixedIntervalScheduler(Scheduler):
+    """Reminders at fixed offsets from the chapter's entry time; the n-th appears once the (n-1)-th is revised."""
+    name = "fixed"
+    label = "Fixed intervals"
+
+    def __init__(self, intervals_hours: List[float] = (12, 72, 120)):
+        self.intervals_hours = sorted(intervals_hours)
+
+    def to_schedule(self) -> Dict[str, Any]:
+        return {"scheduler": self.name, "intervals_hours": list(self.intervals_hours)}
+
+    def next_reminder(self, chapter: Chapter) -> Optional[Reminder]:
+        step = len(chapter.reminders)
+        if step >= len(self.intervals_hours) or not isinstance(chapter.entry_datetime, datetime.datetime):
+            return None
+        hours = self.intervals_hours[step]
+        return Reminder(_next_reminder_id(chapter), interval_label(hours), chapter.entry_datetime + datetime.timedelta(hours=hours))
+
+
+class Sm2Scheduler(Scheduler):
+    """SM-2 style adaptive intervals. A revision done on its due day counts as a perfect recall and each day
+    late lowers the grade; the grade moves the ease factor, and a very late revision restarts the sequence."""
+    name = "sm2"
+    label = "Adaptive (SM-2)"
+
+    def __init__(self, first_interval_days: int = 1, second_interval_days: int = 6, initial_ease: float = 2.5,
+                 min_ease: float = 1.3, max_interval_days: int = 180):
+        self.first_interval_days = first_interval_days
+        self.second_interval_days = second_interval_days
+        self.initial_ease = initial_ease
+        self.min_ease = min_ease
+        self.max_interval_days = max_interval_days
+
+    def to_schedule(self) -> Dict[str, Any]:
+        return {"scheduler": self.name, "first_interval_days": self.first_interval_days,
+                "second_interval_days": self.second_interval_days, "initial_ease": self.initial_ease,
+                "min_ease": self.min_ease, "max_interval_days": self.max_interval_days}
+
+    @staticmethod
+    def grade(reminder: Reminder) -> int:
+        """SM-2 quality 0-5 from how late the revision was: on time 5, one day late 4, up to three days 3, later 2."""
+        revised_at, due = reminder.revised_at, reminder.time
+        if not isinstance(revised_at, datetime.datetime) or not isinstance(due, datetime.datetime):
+            return 5 # Revised before revision times were recorded; assume on time
+        days_late = (revised_at.date() - due.date()).days
+        if days_late <= 0:
+            return 5
+        if days_late == 1:
+            return 4
+        return 3 if days_late <= 3 else 2
+
+    def interval_days(self, chapter: Chapter) -> int:
+        """Replays the chapter's revised reminders through SM-2; returns the interval until the next one.
+        The first reminder comes ``first_interval_days`` after the entry, the next ``second_interval_days``
+        after that, and each later one the previous interval times the ease factor."""
+        repetitions, interval, ease = 0, self.first_interval_days, self.initial_ease
+        for reminder in chapter.reminders:
+            if reminder.status != ReminderStatus.REVISED:
+                continue
+            quality = self.grade(reminder)
+            ease = max(self.min_ease, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+            if quality < 3:
+                repetitions, interval = 0, self.first_interval_days
+            else:
+                repetitions += 1
+                interval = self.second_interval_days if repetitions == 1 else round(interval * ease)
+        return min(interval, self.max_interval_days)
+
+    def next_reminder(self, chapter: Chapter) -> Optional[Reminder]:
+        revised = [r for r in chapter.reminders if r.status == ReminderStatus.REVISED]
+        base = (revised[-1].revised_at or revised[-1].time) if revised else chapter.entry_datetime
+        if not isinstance(base, datetime.datetime):
+            return None
+        days = self.interval_days(chapter)
+        return Reminder(_next_reminder_id(chapter), interval_label(days * 24), base + datetime.timedelta(days=days))
+
+
+SCHEDULERS: Dict[str, Type[Scheduler]] = {scheduler.name: scheduler for scheduler in (FixedIntervalScheduler, Sm2Scheduler)}
+
+
+def scheduler_for(chapter: Chapter) -> Optional[Scheduler]:
+    """The chapter's scheduler, or ``None`` for unscheduled chapters and schedulers this version does not know."""
+    schedule = chapter.schedule
+    if not isinstance(schedule, dict):
+        return None
+    scheduler_cls = SCHEDULERS.get(schedule.get("scheduler"))
+    return scheduler_cls.from_schedule(schedule) if scheduler_cls is not None else None
+
+
+def sync_chapter(chapter: Chapter) -> Tuple[List[Reminder], List[Reminder]]:
+    """Brings a scheduled chapter's reminders in line with their statuses; returns ``(added, removed)``.
+
+    Trailing pending reminders whose predecessor is no longer revised are
+    withdrawn, then the next reminder is added if the last one is revised (or
+    the chapter has none yet). ``chapter.reminders`` is modified in place.
+    """
+    scheduler = scheduler_for(chapter)
+    if scheduler is None:
+        return [], []
+    reminders = chapter.reminders
+    removed = []
+    while len(reminders) > 1 and reminders[-1].status == ReminderStatus.PENDING and reminders[-2].status != ReminderStatus.REVISED:
+        removed.append(reminders.pop())
+    added = []
+    if not reminders or reminders[-1].status == ReminderStatus.REVISED:
+        reminder = scheduler.next_reminder(chapter)
+        if reminder is not None:
+            reminders.append(reminder)
+            added.append(reminder)
+    return added, removed
@@ -0,0 +1,611 @@
+"""Storage backends. Records cross this boundary JSON-ready (datetimes as ISO strings)."""
+import json
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Any, Optional, Set, Tuple, Union
+
+import requests
+
+from tracker import archive
+from tracker.http_client import Timeout, create_session
+from tracker.models import ReminderStatus
+from tracker.patches import PatchJournal, SNAPSHOT_META_KEYS, apply_patch
+
+
+class StorageBackend:
+    """Interface every persistence engine implements.
+
+    ``load`` returns the raw record (or ``None`` when nothing has been stored
+    yet); ``save_patches`` persists a batch of patches from ``tracker.patches``.
+    When ``wants_snapshot`` says so, callers pass the full encoded document as
+    ``snapshot`` and the backend writes that instead of (or as well as) the
+    patches. Implementations must be safe to call from several threads.
+
+    ``revision`` is a process-local counter bumped after every successful
+    write, so callers can key cached loads on it instead of clearing caches.
+
+    Backends with ``supports_archive`` also handle ``archive_records`` patches
+    by keeping the moved records in an archive tier that ``load`` skips and
+    ``load_archive`` returns (see ``tracker.archive``).
+    """
+
+    name = "storage"
+    revision = 0
+    supports_archive = False
+
+    def _bump_revision(self):
+        self.revision += 1
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def load_if_exists(self) -> Optional[Dict[str, Any]]:
+        """``load``, except that a store that does not exist yet reads as empty instead of raising."""
+        return self.load()
+
+    def load_archive(self) -> Optional[Dict[str, Any]]:
+        return None
+
+    def save_snapshot(self, record: Dict[str, Any]):
+        raise NotImplementedError
+
+    def save_patches(self, patch_list: List[Dict[str, Any]], snapshot: Optional[Dict[str, Any]] = None):
+        raise NotImplementedError
+
+    def wants_snapshot(self, pending_patches: int) -> bool:
+        return False
+
+
+# ---------------------------- JSONBIN.IO ----------------------------
+class JsonBinBackend(StorageBackend):
+    """One JSONBin record for the document, plus an optional journal bin for patch saves.
+
+    Requests go through one pooled, retrying session. With ``conditional_fetch``
+    the backend keeps the last body read from each bin together with the bin's
+    version count, and a load first asks for the (tiny) count and re-downloads
+    only when it has changed. Writes send ``X-Versioning: true`` so every PUT
+    bumps the count. An optional archive bin holds the archive tier; it is
+    read only by ``load_archive`` and written only when records are archived.
+    """
+
+    name = "JSONBin"
+
+    def __init__(self, api_key: str, bin_id: str, journal_bin_id: Optional[str] = None,
+                 base_url: str = "https://api.jsonbin.io/v3/b", timeout: Union[float, Timeout] = (5, 15),
+                 compact_every: int = 50, session: Optional[requests.Session] = None, conditional_fetch: bool = True,
+                 archive_bin_id: Optional[str] = None):
+        self.bin_id = bin_id
+        self.journal_bin_id = journal_bin_id
+        self.archive_bin_id = archive_bin_id
+        self.supports_archive = bool(archive_bin_id)
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.compact_every = compact_every
+        self.conditional_fetch = conditional_fetch
+        self._session = session or create_session()
+        self._headers = {'Content-Type': 'application/json', 'X-Master-Key': api_key}
+        self._lock = threading.RLock()
+        self._record_cache: Dict[str, Tuple[int, str]] = {} # bin id -> (version count, response body)
+        # Unanchored until a load finds the snapshot's epoch, so the first save is a full snapshot.
+        self.journal: Optional[PatchJournal] = PatchJournal(compact_every=compact_every) if journal_bin_id else None
+
+    def _get_version_count(self, bin_id: str) -> Optional[int]:
+        """Current version count of a bin, or ``None`` when it cannot be told (fall back to a full read)."""
+        response = self._session.get(f"{self.base_url}/{bin_id}/versions/count", headers=self._headers, timeout=self.timeout)
+        if response.status_code == 404 or response.status_code >= 500:
+            response.raise_for_status() # Missing bin, or still failing after the session's retries
+        if not response.ok:
+            return None
+        try:
+            count = response.json().get("metadata", {}).get("versionCount")
+        except ValueError:
+            return None
+        return count if isinstance(count, int) else None
+
+    def _get_record(self, bin_id: str) -> Any:
+        version = self._get_version_count(bin_id) if self.conditional_fetch else None
+        cached = self._record_cache.get(bin_id)
+        if version is not None and cached is not None and cached[0] == version:
+            return json.loads(cached[1]).get("record") # Parsed afresh: callers modify the record
+        response = self._session.get(f"{self.base_url}/{bin_id}/latest", headers=self._headers, timeout=self.timeout)
+        response.raise_for_status()
+        body = response.json()
+        if version is not None:
+            self._record_cache[bin_id] = (version, response.text)
+        return body.get("record")
+
+    def _put_record(self, bin_id: str, payload: Dict[str, Any]):
+        self._record_cache.pop(bin_id, None)
+        headers = {**self._headers, 'X-Versioning': 'true'} if self.conditional_fetch else self._headers
+        response = self._session.put(f"{self.base_url}/{bin_id}", headers=headers, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+
+    def _get_optional_document(self, bin_id: str) -> Optional[Dict[str, Any]]:
+        """A secondary bin's record, or ``None`` when the bin does not exist yet."""
+        try:
+            document = self._get_record(bin_id)
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise # Never guess: replaying without the journal would silently drop saved edits
+        return document if isinstance(document, dict) else None
+
+    def _get_journal_document(self) -> Optional[Dict[str, Any]]:
+        return self._get_optional_document(self.journal_bin_id)
+
+    def load_archive(self) -> Optional[Dict[str, Any]]:
+        if not self.archive_bin_id:
+            return None
+        with self._lock:
+            return self._get_optional_document(self.archive_bin_id)
+
+    def _write_archive(self, archive_patches: List[Dict[str, Any]]):
+        """Adds archived records to the archive bin before the hot save drops them, so a failure in between
+        leaves them in both places (the hot copy wins on load) rather than in neither."""
+        if not self.archive_bin_id:
+            raise ValueError("Archiving needs an archive bin.")
+        document = self._get_optional_document(self.archive_bin_id) or archive.empty_archive()
+        for patch in archive_patches:
+            archive.add_to_archive(document, patch)
+        self._put_record(self.archive_bin_id, document)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self._get_record(self.bin_id)
+            if not isinstance(record, dict) or not record:
+                return record or None
+            snapshot_meta = {k: record.pop(k) for k in SNAPSHOT_META_KEYS if k in record}
+            if self.journal_bin_id:
+                self.journal = PatchJournal.from_document(snapshot_meta, self._get_journal_document(), self.compact_every)
+                for entry in self.journal.entries:
+                    apply_patch(record, entry)
+            return record
+
+    def load_if_exists(self) -> Optional[Dict[str, Any]]:
+        try:
+            return self.load()
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None # Created by the first save
+            raise
+
+    def save_snapshot(self, record: Dict[str, Any]):
+        with self._lock:
+            if self.journal is None:
+                self._put_record(self.bin_id, record)
+                self._bump_revision()
+                return
+            self._put_record(self.bin_id, {**record, **self.journal.snapshot_meta()})
+            self._bump_revision()
+            self.journal.mark_compacted()
+            try:
+                self._put_record(self.journal_bin_id, self.journal.to_document())
+            except requests.exceptions.RequestException:
+                pass # Entries at or below snapshot_seq are ignored on load
+
+    def save_patches(self, patch_list: List[Dict[str, Any]], snapshot: Optional[Dict[str, Any]] = None):
+        with self._lock:
+            archive_patches = [patch for patch in patch_list if patch.get("op") == "archive_records"]
+            if archive_patches:
+                self._write_archive(archive_patches)
+            if self.journal is None:
+                if snapshot is None:
+                    raise ValueError("JSONBin without a journal bin can only save full snapshots.")
+                self._put_record(self.bin_id, snapshot)
+                self._bump_revision()
+                return
+            self.journal.append(patch_list)
+            try:
+                if snapshot is not None:
+                    self.save_snapshot(snapshot)
+                else:
+                    self._put_record(self.journal_bin_id, self.journal.to_document())
+                    self._bump_revision()
+            except Exception:
+                self.journal.rollback(len(patch_list))
+                raise
+
+    def wants_snapshot(self, pending_patches: int) -> bool:
+        if self.journal is None:
+            return True
+        return not self.journal.anchored or len(self.journal.entries) + pending_patches >= self.compact_every
+
+
+# ---------------------------- JSONBIN.IO, SHARDED ----------------------------
+TODO_SHARD = "todos" # Holds todo_data, the document's other top-level keys, and subjects without a shard of their own
+SHARDED_MARKER_KEY = "sharded" # Written to ``bin_id`` once every shard holds the document
+_TODO_OPS = frozenset(("append_todo", "delete_todos", "set_todo_status"))
+
+
+class ShardedJsonBinBackend(JsonBinBackend):
+    """The document split over one bin per subject plus a ``TODO_SHARD`` bin.
+
+    Every shard is versioned by its own bin (each PUT bumps its version count).
+    A load fetches the shards concurrently and, with ``conditional_fetch``,
+    re-downloads only shards whose version changed. A patch save fetches the
+    current content of just the shards its patches touch, applies the patches
+    and uploads those shards; the others are neither serialised nor sent.
+
+    ``bin_id`` holds the single-bin document of a store written before
+    sharding. The first snapshot writes every shard and only then replaces
+    that document with a ``SHARDED_MARKER_KEY`` marker, so a snapshot that
+    fails partway leaves the single-bin document in charge. Loads read
+    ``bin_id`` together with the shards and merge the shards only when the
+    marker is there. Size the session's connection pool for ``pool_size``
+    concurrent requests.
+    """
+
+    name = "JSONBin (sharded)"
+
+    def __init__(self, api_key: str, bin_id: str, shard_bin_ids: Dict[str, str],
+                 base_url: str = "https://api.jsonbin.io/v3/b", timeout: Union[float, Timeout] = (5, 15),
+                 session: Optional[requests.Session] = None, conditional_fetch: bool = True, archive_bin_id: Optional[str] = None):
+        super().__init__(api_key, bin_id, None, base_url, timeout, conditional_fetch=conditional_fetch, archive_bin_id=archive_bin_id,
+                         session=session or create_session(pool_maxsize=self.pool_size(shard_bin_ids)))
+        if TODO_SHARD not in shard_bin_ids:
+            raise ValueError(f"Sharded JSONBin storage needs a {TODO_SHARD!r} shard.")
+        self.shard_bin_ids = dict(shard_bin_ids)
+        self._sharded = False # Set once a load finds the marker or a snapshot writes it
+
+    @staticmethod
+    def pool_size(shard_bin_ids: Dict[str, str]) -> int:
+        """Requests a load runs at once: every shard and ``bin_id``."""
+        return len(shard_bin_ids) + 1
+
+    def _run_concurrently(self, fn: Callable[[str], Any], shard_names: Iterable[str]) -> Dict[str, Any]:
+        shard_names = list(shard_names)
+        if len(shard_names) <= 1:
+            return {name: fn(name) for name in shard_names}
+        with ThreadPoolExecutor(max_workers=len(shard_names)) as pool:
+            futures = {name: pool.submit(fn, name) for name in shard_names}
+            return {name: future.result() for name, future in futures.items()}
+
+    def _fetch_shards(self, shard_names: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        shards = self._run_concurrently(lambda name: self._get_optional_document(self.shard_bin_ids[name]), shard_names)
+        return {name: shard or {} for name, shard in shards.items()}
+
+    def _put_shards(self, shards: Dict[str, Dict[str, Any]]):
+        self._run_concurrently(lambda name: self._put_record(self.shard_bin_ids[name], shards[name]), shards)
+
+    def _merge(self, shards: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        record = {k: v for k, v in shards.get(TODO_SHARD, {}).items() if k != "subject_chapters_data"}
+        subjects = dict(shards.get(TODO_SHARD, {}).get("subject_chapters_data", {}))
+        for name, shard in shards.items():
+            if name != TODO_SHARD:
+                subjects[name] = shard.get("subject_chapters_data", {}).get(name, [])
+        record["subject_chapters_data"] = subjects
+        record.setdefault("todo_data", [])
+        return record
+
+    def _split(self, record: Dict[str, Any], shard_names: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        subjects = record.get("subject_chapters_data", {})
+        shards = {}
+        for name in shard_names:
+            if name == TODO_SHARD:
+                shards[name] = {**{k: v for k, v in record.items() if k != "subject_chapters_data"},
+                                "subject_chapters_data": {s: c for s, c in subjects.items() if s not in self.shard_bin_ids}}
+            else:
+                shards[name] = {"subject_chapters_data": {name: subjects.get(name, [])}}
+        return shards
+
+    def _patch_shards(self, patch: Dict[str, Any]) -> Set[str]:
+        """Shards a patch changes."""
+        def shard_of(subject: str) -> str:
+            return subject if subject in self.shard_bin_ids else TODO_SHARD
+        op = patch.get("op")
+        if op in _TODO_OPS:
+            return {TODO_SHARD}
+        if op == "archive_records": # The archive summary lives in the todo shard
+            return {shard_of(entry["subject"]) for entry in patch["chapters"]} | {TODO_SHARD}
+        if "subject" in patch:
+            return {shard_of(patch["subject"])}
+        return set(self.shard_bin_ids)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            fetched = self._run_concurrently(
+                lambda name: self._get_record(self.bin_id) if name is None else self._get_optional_document(self.shard_bin_ids[name]),
+                [None, *self.shard_bin_ids])
+            record = fetched.pop(None)
+            self._sharded = isinstance(record, dict) and record.get(SHARDED_MARKER_KEY) is True
+            if not self._sharded:
+                return record or None # Not sharded yet: the single-bin document
+            return self._merge({name: shard or {} for name, shard in fetched.items()})
+
+    def save_snapshot(self, record: Dict[str, Any]):
+        with self._lock:
+            self._put_shards(self._split(record, self.shard_bin_ids))
+            if not self._sharded: # Every shard is written; only now may loads stop reading the single-bin document
+                self._put_record(self.bin_id, {SHARDED_MARKER_KEY: True})
+                self._sharded = True
+            self._bump_revision()
+
+    def save_patches(self, patch_list: List[Dict[str, Any]], snapshot: Optional[Dict[str, Any]] = None):
+        with self._lock:
+            archive_patches = [patch for patch in patch_list if patch.get("op") == "archive_records"]
+            if archive_patches:
+                self._write_archive(archive_patches)
+            if snapshot is not None or not self._sharded:
+                if snapshot is None:
+                    raise ValueError("The first save to sharded JSONBin storage must be a full snapshot.")
+                self.save_snapshot(snapshot)
+                return
+            dirty = set().union(*(self._patch_shards(patch) for patch in patch_list))
+            if not dirty:
+                return
+            document = self._merge(self._fetch_shards(dirty))
+            for patch in patch_list:
+                apply_patch(document, patch)
+            self._put_shards(self._split(document, dirty))
+            self._bump_revision()
+
+    def wants_snapshot(self, pending_patches: int) -> bool:
+        return not self._sharded
+
+
+# ---------------------------- SQLITE ----------------------------
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chapters (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    subject TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    uid TEXT,
+    chapter_name TEXT,
+    entry_datetime TEXT,
+    exams_appeared INTEGER,
+    exam_status TEXT,
+    time_spent INTEGER,
+    archived INTEGER NOT NULL DEFAULT 0,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_chapters_subject_position ON chapters(subject, position);
+CREATE TABLE IF NOT EXISTS reminders (
+    chapter_id INTEGER NOT NULL REFERENCES chapters(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    reminder_id INTEGER,
+    type TEXT,
+    time TEXT,
+    status TEXT,
+    revised_at TEXT,
+    extra TEXT,
+    PRIMARY KEY (chapter_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_reminders_time ON reminders(time);
+CREATE TABLE IF NOT EXISTS todos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    position INTEGER NOT NULL,
+    uid TEXT,
+    task TEXT,
+    status TEXT,
+    timestamp TEXT,
+    archived INTEGER NOT NULL DEFAULT 0,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_todos_position ON todos(position);
+"""
+# Columns added after the first release: (table, column, declaration). Their indexes are created after the migration.
+_SQLITE_ADDED_COLUMNS = (("chapters", "uid", "TEXT"), ("todos", "uid", "TEXT"), ("reminders", "revised_at", "TEXT"),
+                         ("chapters", "archived", "INTEGER NOT NULL DEFAULT 0"), ("todos", "archived", "INTEGER NOT NULL DEFAULT 0"))
+_SQLITE_ADDED_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_chapters_uid ON chapters(uid);
+CREATE INDEX IF NOT EXISTS idx_todos_uid ON todos(uid);
+CREATE INDEX IF NOT EXISTS idx_chapters_archived ON chapters(archived);
+CREATE INDEX IF NOT EXISTS idx_todos_archived ON todos(archived);
+"""
+
+_CHAPTER_COLUMNS = ("uid", "chapter_name", "entry_datetime", "exams_appeared", "exam_status", "time_spent")
+_REMINDER_COLUMNS = ("reminder_id", "type", "time", "status", "revised_at")
+_TODO_COLUMNS = ("uid", "task", "status", "timestamp")
+
+
+def _split_extra(record: Dict[str, Any], columns: tuple, skip: tuple = ()) -> Optional[str]:
+    extra = {k: v for k, v in record.items() if k not in columns and k not in skip}
+    return json.dumps(extra) if extra else None
+
+
+def _merge_extra(row: sqlite3.Row, columns: tuple) -> Dict[str, Any]:
+    record = {column: row[column] for column in columns}
+    if row["extra"]:
+        record.update(json.loads(row["extra"]))
+    return record
+
+
+class SqliteBackend(StorageBackend):
+    """Local SQLite file in WAL mode; each patch touches only the rows it changes.
+    Archived chapters and todos stay in their tables with ``archived = 1``."""
+
+    name = "SQLite"
+    supports_archive = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SQLITE_SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        for table, column, declaration in _SQLITE_ADDED_COLUMNS:
+            existing = {row["name"] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+        self._conn.executescript(_SQLITE_ADDED_INDEXES)
+
+    # ---------------- Reads ----------------
+    def _load_tier(self, archived: int) -> Dict[str, Any]:
+        reminders_by_chapter: Dict[int, List[Dict]] = {}
+        for row in self._conn.execute("SELECT r.* FROM reminders r JOIN chapters c ON c.id = r.chapter_id "
+                                      "WHERE c.archived = ? ORDER BY r.chapter_id, r.position", (archived,)):
+            reminders_by_chapter.setdefault(row["chapter_id"], []).append(_merge_extra(row, _REMINDER_COLUMNS))
+        subject_chapters_data: Dict[str, List[Dict]] = {}
+        for row in self._conn.execute("SELECT * FROM chapters WHERE archived = ? ORDER BY subject, position", (archived,)):
+            chapter = _merge_extra(row, _CHAPTER_COLUMNS)
+            chapter["reminders"] = reminders_by_chapter.get(row["id"], [])
+            subject_chapters_data.setdefault(row["subject"], []).append(chapter)
+        todo_data = [_merge_extra(row, _TODO_COLUMNS)
+                     for row in self._conn.execute("SELECT * FROM todos WHERE archived = ? ORDER BY position", (archived,))]
+        return {"subject_chapters_data": subject_chapters_data, "todo_data": todo_data}
+
+    def _archive_summary(self) -> Dict[str, Any]:
+        summary = archive.empty_summary()
+        for row in self._conn.execute("SELECT c.subject, COUNT(DISTINCT c.id) AS chapters, COUNT(r.chapter_id) AS reminders, "
+                                      "COALESCE(SUM(r.status = ?), 0) AS revised FROM chapters c "
+                                      "LEFT JOIN reminders r ON r.chapter_id = c.id WHERE c.archived = 1 GROUP BY c.subject",
+                                      (ReminderStatus.REVISED.value,)):
+            summary["subjects"][row["subject"]] = {"chapters": row["chapters"], "reminders": row["reminders"], "revised": row["revised"]}
+        summary["todos"] = self._conn.execute("SELECT COUNT(*) FROM todos WHERE archived = 1").fetchone()[0]
+        return summary
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self._load_tier(0)
+            record[archive.ARCHIVE_SUMMARY_KEY] = self._archive_summary()
+        return record
+
+    def load_archive(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._load_tier(1)
+
+    def _chapter_id(self, patch: Dict[str, Any]) -> Optional[int]:
+        """Row id of the chapter a patch targets, by uid (or by position for patches from older versions).
+        ``None`` when no chapter has the uid, so replaying a batch after its delete is skipped like in ``apply_patch``."""
+        if "chapter_uid" in patch:
+            row = self._conn.execute("SELECT id FROM chapters WHERE uid = ?", (patch["chapter_uid"],)).fetchone()
+            return row["id"] if row is not None else None
+        row = self._conn.execute("SELECT id FROM chapters WHERE subject = ? AND archived = 0 ORDER BY position LIMIT 1 OFFSET ?",
+                                 (patch["subject"], patch["chapter_index"])).fetchone()
+        if row is None:
+            raise KeyError(f"No chapter #{patch['chapter_index']} in {patch['subject']}")
+        return row["id"]
+
+    def _todo_id_by_uid(self, todo_uid: str) -> Optional[int]:
+        row = self._conn.execute("SELECT id FROM todos WHERE uid = ?", (todo_uid,)).fetchone()
+        return row["id"] if row is not None else None
+
+    def _todo_id_by_position(self, todo_index: int) -> int:
+        row = self._conn.execute("SELECT id FROM todos WHERE archived = 0 ORDER BY position LIMIT 1 OFFSET ?", (todo_index,)).fetchone()
+        if row is None:
+            raise KeyError(f"No todo #{todo_index}")
+        return row["id"]
+
+    # ---------------- Writes ----------------
+    def _insert_chapter(self, subject: str, chapter: Dict[str, Any], position: Optional[int] = None):
+        if position is None:
+            position = self._conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM chapters WHERE subject = ?",
+                                          (subject,)).fetchone()[0]
+        cursor = self._conn.execute(
+            "INSERT INTO chapters (subject, position, uid, chapter_name, entry_datetime, exams_appeared, exam_status, time_spent, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (subject, position, *(chapter.get(c) for c in _CHAPTER_COLUMNS), _split_extra(chapter, _CHAPTER_COLUMNS, ("reminders",))))
+        self._conn.executemany(
+            "INSERT INTO reminders (chapter_id, position, reminder_id, type, time, status, revised_at, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(cursor.lastrowid, r_idx, *(reminder.get(c) for c in _REMINDER_COLUMNS), _split_extra(reminder, _REMINDER_COLUMNS))
+             for r_idx, reminder in enumerate(chapter.get("reminders", []))])
+
+    def _insert_reminder(self, chapter_id: int, reminder: Dict[str, Any]):
+        position = self._conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM reminders WHERE chapter_id = ?",
+                                      (chapter_id,)).fetchone()[0]
+        self._conn.execute(
+            "INSERT INTO reminders (chapter_id, position, reminder_id, type, time, status, revised_at, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (chapter_id, position, *(reminder.get(c) for c in _REMINDER_COLUMNS), _split_extra(reminder, _REMINDER_COLUMNS)))
+
+    def _insert_todo(self, todo: Dict[str, Any], position: Optional[int] = None):
+        if position is None:
+            position = self._conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM todos").fetchone()[0]
+        self._conn.execute("INSERT INTO todos (position, uid, task, status, timestamp, extra) VALUES (?, ?, ?, ?, ?, ?)",
+                           (position, *(todo.get(c) for c in _TODO_COLUMNS), _split_extra(todo, _TODO_COLUMNS)))
+
+    def _apply_patch(self, patch: Dict[str, Any]):
+        """Replays like ``apply_patch``: appends of existing records and changes to missing ones are no-ops."""
+        op = patch.get("op")
+        if op == "append_chapter":
+            uid = patch["chapter"].get("uid")
+            if uid is None or self._conn.execute("SELECT 1 FROM chapters WHERE uid = ?", (uid,)).fetchone() is None:
+                self._insert_chapter(patch["subject"], patch["chapter"])
+        elif op == "delete_chapter": # Positions are only used for ordering, so the gap is left as is
+            chapter_id = self._chapter_id(patch)
+            if chapter_id is not None:
+                self._conn.execute("DELETE FROM chapters WHERE id = ?", (chapter_id,))
+        elif op == "set_reminder_status":
+            chapter_id = self._chapter_id(patch)
+            if chapter_id is None:
+                return
+            if "reminder_id" in patch:
+                self._conn.execute("UPDATE reminders SET status = ?, revised_at = ? WHERE chapter_id = ? AND reminder_id = ?",
+                                   (patch["status"], patch.get("revised_at"), chapter_id, patch["reminder_id"]))
+            else:
+                self._conn.execute("UPDATE reminders SET status = ?, revised_at = ? WHERE chapter_id = ? AND position = ?",
+                                   (patch["status"], patch.get("revised_at"), chapter_id, patch["reminder_index"]))
+        elif op == "append_reminder":
+            chapter_id = self._chapter_id(patch)
+            if chapter_id is not None and self._conn.execute(
+                    "SELECT 1 FROM reminders WHERE chapter_id = ? AND reminder_id = ?",
+                    (chapter_id, patch["reminder"].get("reminder_id"))).fetchone() is None:
+                self._insert_reminder(chapter_id, patch["reminder"])
+        elif op == "delete_reminder": # Positions are only used for ordering, so the gap is left as is
+            self._conn.execute("DELETE FROM reminders WHERE chapter_id = ? AND reminder_id = ?",
+                               (self._chapter_id(patch), patch["reminder_id"]))
+        elif op == "set_chapter_fields":
+            chapter_id = self._chapter_id(patch)
+            for field, value in patch["fields"].items():
+                if field not in _CHAPTER_COLUMNS:
+                    raise ValueError(f"Unsupported chapter field: {field!r}")
+                if chapter_id is not None:
+                    self._conn.execute(f"UPDATE chapters SET {field} = ? WHERE id = ?", (value, chapter_id))
+        elif op == "append_todo":
+            uid = patch["todo"].get("uid")
+            if uid is None or self._conn.execute("SELECT 1 FROM todos WHERE uid = ?", (uid,)).fetchone() is None:
+                self._insert_todo(patch["todo"])
+        elif op == "delete_todos":
+            if "todo_uids" in patch:
+                self._conn.executemany("DELETE FROM todos WHERE uid = ?", [(todo_uid,) for todo_uid in patch["todo_uids"]])
+            else:
+                todo_ids = [self._todo_id_by_position(index) for index in patch["indices"]]
+                self._conn.executemany("DELETE FROM todos WHERE id = ?", [(todo_id,) for todo_id in todo_ids])
+        elif op == "set_todo_status":
+            todo_id = self._todo_id_by_uid(patch["todo_uid"]) if "todo_uid" in patch else self._todo_id_by_position(patch["todo_index"])
+            if todo_id is not None:
+                self._conn.execute("UPDATE todos SET status = ? WHERE id = ?", (patch["status"], todo_id))
+        elif op == "archive_records":
+            self._conn.executemany("UPDATE chapters SET archived = 1 WHERE uid = ?",
+                                   [(entry["chapter"]["uid"],) for entry in patch["chapters"]])
+            self._conn.executemany("UPDATE todos SET archived = 1 WHERE uid = ?", [(todo["uid"],) for todo in patch["todos"]])
+        else:
+            raise ValueError(f"Unknown patch op: {op!r}")
+
+    def _write_snapshot(self, record: Dict[str, Any]):
+        """Replaces the hot tier; archived rows are kept. Runs inside the caller's transaction."""
+        self._conn.execute("DELETE FROM chapters WHERE archived = 0") # Cascades to reminders
+        self._conn.execute("DELETE FROM todos WHERE archived = 0")
+        for subject, chapters in record.get("subject_chapters_data", {}).items():
+            for position, chapter in enumerate(chapters):
+                self._insert_chapter(subject, chapter, position)
+        for position, todo in enumerate(record.get("todo_data", [])):
+            self._insert_todo(todo, position)
+
+    def save_snapshot(self, record: Dict[str, Any]):
+        with self._lock:
+            with self._conn:
+                self._write_snapshot(record)
+            self._bump_revision()
+
+    def save_patches(self, patch_list: List[Dict[str, Any]], snapshot: Optional[Dict[str, Any]] = None):
+        if snapshot is not None:
+            with self._lock:
+                with self._conn: # Archive flags and snapshot commit together
+                    for patch in patch_list:
+                        if patch.get("op") == "archive_records": # Flag them first, or the snapshot would delete them
+                            self._apply_patch(patch)
+                    self._write_snapshot(snapshot)
+                self._bump_revision()
+            return
+        with self._lock:
+            with self._conn: # One transaction per batch
+                for patch in patch_list:
+                    self._apply_patch(patch)
+            self._bump_revision()
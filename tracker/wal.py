@@ -0,0 +1,145 @@
+"""Durable local write-ahead log of save batches, for offline-first saving.
+
+Every batch (encoded patches; logs written by older versions may also carry
+a full snapshot) is appended as one JSON line and fsynced before the save counts as
+done, so an edit survives a lost connection, a failed request and a restart.
+Each batch gets the next sequence number; once the remote store has the batch
+an ``{"ack": seq}`` line is appended. On open the log is read back and every
+batch after the last ack is pending again. A torn last line (a crash
+mid-write) is ignored: that batch was never acknowledged to the user.
+
+``reconcile`` applies the pending batches on top of a freshly loaded remote
+document, so a session started while batches are still unsent sees them. A
+batch that reached the remote store just before a crash (but was never acked)
+is sent and applied again; that is harmless because ``apply_patch`` skips
+appends of records that are already there and changes to records that are
+gone (see ``tracker.patches``).
+"""
+import copy
+import json
+import os
+import threading
+from typing import Dict, List, Any, Optional
+
+from tracker.patches import apply_patch
+
+
+class WalEntry:
+    __slots__ = ("seq", "patches", "snapshot")
+
+    def __init__(self, seq: int, patches: List[Dict[str, Any]], snapshot: Optional[Dict[str, Any]] = None):
+        self.seq = seq
+        self.patches = patches
+        self.snapshot = snapshot
+
+
+def _event(entry: WalEntry) -> Dict[str, Any]:
+    event = {"seq": entry.seq, "patches": entry.patches}
+    if entry.snapshot is not None:
+        event["snapshot"] = entry.snapshot
+    return event
+
+
+class WriteAheadLog:
+    def __init__(self, path: str, compact_every: int = 200):
+        self.path = path
+        self.compact_every = compact_every # Acknowledged batches kept in the file before it is rewritten
+        self._lock = threading.Lock()
+        self._pending: List[WalEntry] = []
+        self._acked_seq = 0
+        self._last_seq = 0
+        self._acked_in_file = 0
+        self._read()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return
+        entries: List[WalEntry] = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    break # Torn write at the end of the file
+                if "ack" in event:
+                    self._acked_seq = max(self._acked_seq, event["ack"])
+                else:
+                    entries.append(WalEntry(event["seq"], event.get("patches", []), event.get("snapshot")))
+                    self._last_seq = max(self._last_seq, event["seq"])
+        self._last_seq = max(self._last_seq, self._acked_seq)
+        self._pending = [entry for entry in entries if entry.seq > self._acked_seq]
+        self._acked_in_file = len(entries) - len(self._pending)
+        if self._acked_in_file >= self.compact_every:
+            self._rewrite()
+
+    def _write_line(self, event: Dict[str, Any]):
+        self._file.write(json.dumps(event) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _rewrite(self):
+        """Replaces the file with the ack pointer and the pending batches only."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"ack": self._acked_seq}) + "\n")
+            for entry in self._pending:
+                f.write(json.dumps(_event(entry)) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._acked_in_file = 0
+
+    # ---------------- Writer side ----------------
+    def append(self, patch_list: List[Dict[str, Any]], snapshot: Optional[Dict[str, Any]] = None) -> WalEntry:
+        """Durably records one batch; raises ``OSError`` when the disk write fails."""
+        with self._lock:
+            entry = WalEntry(self._last_seq + 1, list(patch_list), snapshot)
+            self._write_line(_event(entry))
+            self._last_seq = entry.seq
+            self._pending.append(entry)
+            return entry
+
+    def ack(self, seq: int):
+        """Marks every batch up to ``seq`` as stored remotely."""
+        with self._lock:
+            if seq <= self._acked_seq:
+                return
+            self._write_line({"ack": seq})
+            acked = [entry for entry in self._pending if entry.seq <= seq]
+            self._pending = [entry for entry in self._pending if entry.seq > seq]
+            self._acked_seq = seq
+            self._acked_in_file += len(acked)
+            if self._acked_in_file >= self.compact_every:
+                self._file.close()
+                self._rewrite()
+                self._file = open(self.path, "a", encoding="utf-8")
+
+    # ---------------- Reader side ----------------
+    def pending(self) -> List[WalEntry]:
+        with self._lock:
+            return list(self._pending)
+
+    @property
+    def revision(self) -> tuple:
+        """``(last seq, acked seq)``; changes whenever a batch is logged or acknowledged."""
+        with self._lock:
+            return self._last_seq, self._acked_seq
+
+    def reconcile(self, record: Optional[Dict[str, Any]], through_seq: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """The remote ``record`` with the pending batches applied in sequence order: all of them, or only those
+        up to ``through_seq``. A batch carrying a snapshot replaces the document."""
+        for entry in self.pending():
+            if through_seq is not None and entry.seq > through_seq:
+                break
+            if entry.snapshot is not None:
+                record = copy.deepcopy(entry.snapshot)
+                continue
+            if not isinstance(record, dict):
+                continue
+            for patch in entry.patches:
+                try:
+                    apply_patch(record, patch)
+                except (KeyError, IndexError, ValueError):
+                    pass # A positional patch from an older version whose record was deleted remotely
+        return record
@@ -0,0 +1,203 @@
+"""Write-behind save queue: edits are applied locally at once and flushed by a background thread."""
+import copy
+import datetime
+import threading
+import time
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from tracker.storage import StorageBackend
+from tracker.wal import WriteAheadLog
+
+# flush_fn(patches, snapshot, last_seq) persists a batch; it must raise on failure and must not call Streamlit.
+# last_seq is the write-ahead log seq of the batch's newest submission (None without a log).
+FlushFn = Callable[[List[Dict], Optional[Dict], Optional[int]], None]
+
+
+class WriteBehindQueue:
+    """Coalesces submitted patches and flushes them once edits have been quiet for ``debounce_seconds``.
+
+    Each submission may carry a full, already-encoded snapshot of the document
+    *after* its patches. A flush sends everything up to the newest snapshot as
+    one snapshot write (older snapshots are superseded), otherwise the patches
+    alone. Failed batches go back to the front of the queue and are retried
+    after ``retry_seconds``; nothing is dropped. With ``max_failures``, a batch
+    that fails that many times in a row with the same error, which
+    ``is_transient`` does not accept as passing, stops being retried: the queue
+    goes to the ``"stalled"`` state and keeps everything until ``retry`` is
+    called.
+
+    With a ``wal`` every submission is written to the local write-ahead log
+    before ``submit`` returns, acknowledged there once flushed, and batches
+    still pending in the log when the queue is created are flushed first.
+    """
+
+    def __init__(self, flush_fn: FlushFn, debounce_seconds: float = 2.0, retry_seconds: float = 10.0,
+                 wal: Optional[WriteAheadLog] = None, max_failures: Optional[int] = None,
+                 is_transient: Callable[[Exception], bool] = lambda error: False):
+        self._flush_fn = flush_fn
+        self.debounce_seconds = debounce_seconds
+        self.retry_seconds = retry_seconds
+        self.max_failures = max_failures
+        self._is_transient = is_transient
+        self._wal = wal
+        self._cond = threading.Condition()
+        self._entries: List[Tuple[List[Dict], Optional[Dict], Optional[int]]] = [] # (patches, snapshot, WAL seq)
+        self._worker: Optional[threading.Thread] = None
+        self._last_submit = 0.0
+        self._retry_at = 0.0
+        self._flush_requested = False
+        self._state = "idle"
+        self._last_error: Optional[str] = None
+        self._failures = 0 # Consecutive non-transient failures with ``_last_error``
+        self._last_flush_at: Optional[datetime.datetime] = None
+        self._flushed_patches = 0
+        if wal is not None:
+            self._entries = [(entry.patches, entry.snapshot, entry.seq) for entry in wal.pending()]
+            if self._entries: # Left over from an earlier run: send without waiting for new edits
+                with self._cond:
+                    self._state = "pending"
+                    self._start_worker()
+
+    def _start_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="write-behind-flush", daemon=True)
+            self._worker.start()
+
+    @property
+    def wal(self) -> Optional[WriteAheadLog]:
+        return self._wal
+
+    # ---------------- Producer side (script thread) ----------------
+    def submit(self, patch_list: List[Dict], snapshot: Optional[Dict] = None):
+        """Queues a batch; with a WAL it is on disk when this returns (``OSError`` if it could not be written)."""
+        with self._cond:
+            seq = self._wal.append(patch_list, snapshot).seq if self._wal is not None else None
+            self._entries.append((list(patch_list), snapshot, seq))
+            self._last_submit = time.monotonic()
+            if self._state == "stalled":
+                return # Queued behind the stalled batch until ``retry``
+            if self._state != "error":
+                self._state = "pending"
+            self._start_worker()
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Skips the debounce and blocks until the queue drains. Returns False on timeout, or at once while stalled."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._retry_at = 0.0
+            self._cond.notify_all()
+            while self._entries or self._state == "flushing":
+                if self._state == "stalled":
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def retry(self):
+        """Sends a stalled queue again, at once."""
+        with self._cond:
+            if self._state != "stalled":
+                return
+            self._failures = 0
+            self._retry_at = 0.0
+            self._flush_requested = True
+            self._state = "error"
+            self._start_worker()
+            self._cond.notify_all()
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return sum(len(patch_list) for patch_list, _, _ in self._entries)
+
+    def status(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "state": self._state,
+                "pending": self.pending_count(),
+                "last_error": self._last_error,
+                "last_flush_at": self._last_flush_at,
+                "flushed_patches": self._flushed_patches,
+            }
+
+    # ---------------- Worker side ----------------
+    def _take_batch(self) -> Tuple[List[Tuple[List[Dict], Optional[Dict], Optional[int]]], List[Dict], Optional[Dict]]:
+        last_snapshot_pos = max((i for i, (_, snap, _) in enumerate(self._entries) if snap is not None), default=-1)
+        cut = last_snapshot_pos + 1 if last_snapshot_pos >= 0 else len(self._entries)
+        batch_entries = self._entries[:cut]
+        del self._entries[:cut]
+        batch_patches = [patch for patch_list, _, _ in batch_entries for patch in patch_list]
+        snapshot = batch_entries[-1][1] if last_snapshot_pos >= 0 else None
+        return batch_entries, batch_patches, snapshot
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._state == "stalled":
+                        self._worker = None
+                        self._cond.notify_all()
+                        return
+                    if not self._entries:
+                        self._flush_requested = False
+                        if self._state != "error":
+                            self._state = "idle"
+                        self._worker = None
+                        self._cond.notify_all()
+                        return
+                    now = time.monotonic()
+                    wait = self._retry_at - now if self._retry_at > now else 0.0
+                    if not self._flush_requested:
+                        wait = max(wait, self.debounce_seconds - (now - self._last_submit))
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                batch_entries, batch_patches, snapshot = self._take_batch()
+                self._state = "flushing"
+
+            batch_seqs = [seq for _, _, seq in batch_entries if seq is not None]
+            try:
+                self._flush_fn(batch_patches, snapshot, max(batch_seqs, default=None))
+            except Exception as e:
+                with self._cond:
+                    self._entries[:0] = batch_entries
+                    if self._is_transient(e):
+                        self._failures = 0
+                    else:
+                        self._failures = self._failures + 1 if str(e) == self._last_error else 1
+                    self._last_error = str(e)
+                    stalled = self.max_failures is not None and self._failures >= self.max_failures
+                    self._state = "stalled" if stalled else "error"
+                    self._retry_at = time.monotonic() + self.retry_seconds
+                    self._cond.notify_all()
+                continue
+
+            if batch_seqs:
+                try:
+                    self._wal.ack(max(batch_seqs))
+                except OSError:
+                    pass # The batch is stored remotely; replaying it later is harmless
+            with self._cond:
+                self._flushed_patches += len(batch_patches)
+                self._last_flush_at = datetime.datetime.now()
+                self._last_error = None
+                self._failures = 0
+                self._retry_at = 0.0
+                self._state = "pending" if self._entries else "idle"
+                self._cond.notify_all()
+
+
+def flush_offline_batch(backend: StorageBackend, wal: WriteAheadLog, empty_record: Dict[str, Any],
+                        patch_list: List[Dict], snapshot: Optional[Dict], last_seq: Optional[int] = None):
+    """``FlushFn`` for offline-first saving, where batches may come from an earlier run. Batches are logged
+    without a snapshot, and the backend may not have loaded yet (a JSONBin journal is read on load). When it
+    needs a snapshot, that is rebuilt from the remote data (``empty_record`` for an empty or missing bin) and
+    the log up to this batch (``last_seq``), so edits of later batches are not sent ahead of their own flush."""
+    if snapshot is None and backend.wants_snapshot(len(patch_list)):
+        record = backend.load_if_exists()
+        if backend.wants_snapshot(len(patch_list)):
+            snapshot = wal.reconcile(record or copy.deepcopy(empty_record), through_seq=last_seq)
+    backend.save_patches(patch_list, snapshot)